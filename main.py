@@ -1,71 +1,91 @@
+import os
 import sys
+import signal
+import argparse
+import multiprocessing
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QLabel, QVBoxLayout, QApplication
-from qfluentwidgets import (
-    StyleSheetBase,
-    Theme,
-    qconfig,
-    FluentWindow,
-    setTheme,
-    FluentIcon,
-    SubtitleLabel,
-    NavigationItemPosition,
-)
-from enum import Enum
+# Only what the forward to a running window needs; the GUI is imported
+# once we know this launch has to start it.
+from utils import instance, profiling
 
-from tab.HomeTab import HomeTab
-from tab.ListTab import ListTab
-from tab.SettingsTab import SettingsTab
 
+def parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """Split our own options from the arguments passed on to Qt."""
+    parser = argparse.ArgumentParser(prog="PyShopDL")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="deterministic",
+        choices=profiling.MODES,
+        help="profile the GUI and worker threads, stats go to profiles/",
+    )
+    parser.add_argument(
+        "--add",
+        nargs="+",
+        default=[],
+        metavar="WORKSHOP_ID",
+        help="add workshop IDs to the queue (of the running window, if any)",
+    )
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="serve the local HTTP API (also enabled by api_enabled in config.json)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window; implies --api",
+    )
+    args, qt_args = parser.parse_known_args(argv[1:])
+    return args, argv[:1] + qt_args
 
-class StyleSheet(StyleSheetBase, Enum):
-    WINDOW = "window"
-    def path(self, theme=Theme.AUTO):
-        theme = qconfig.theme if theme == Theme.AUTO else theme
-        return f"qss/{theme.value.lower()}/{self.value}.qss"
 
-class Window(FluentWindow):
-    def __init__(self, parent=None):
-        super().__init__(parent)
+if __name__ == "__main__":
+    # Content hashing uses a process pool; needed for the frozen .exe.
+    multiprocessing.freeze_support()
+    args, qt_argv = parse_args(sys.argv)
 
-        self.setObjectName("Window")
-        self.setWindowTitle("PyShopDL")
+    # Another window is already open: hand it our IDs instead of starting.
+    if instance.send_to_running(args.add):
+        sys.exit(0)
 
-        self.home_tab = HomeTab(self)
-        self.list_tab = ListTab(self)
-        self.settings_tab = SettingsTab(self)
+    if args.headless:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
-        self.addSubInterface(
-            self.home_tab,
-            icon=FluentIcon.HOME.icon(Theme.AUTO),
-            text="Home",
-            position=NavigationItemPosition.TOP,
-        )
-        self.addSubInterface(
-            self.list_tab,
-            icon=FluentIcon.LIBRARY.icon(Theme.AUTO),
-            text="Downloader",
-            position=NavigationItemPosition.TOP,
-        )
-        self.addSubInterface(
-            self.settings_tab,
-            icon=FluentIcon.SETTING.icon(Theme.AUTO),
-            text="Settings",
-            position=NavigationItemPosition.BOTTOM,
-        )
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from qfluentwidgets import Theme, setTheme
 
-        StyleSheet.WINDOW.apply(self)
-        qconfig.themeChangedFinished.connect(lambda: StyleSheet.WINDOW.apply(self))
+    from tab.MainWindow import Window, start_api
+    from utils import tracing
 
+    tracing.configure()
+    profiling.configure(args.profile)
+    app = QApplication(qt_argv)
+
+    server = instance.InstanceServer(parent=app)
+    server.listen()
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
     setTheme(Theme.AUTO)
 
     window = Window()
     window.resize(900, 600)
-    window.show()
+    if not args.headless:
+        window.show()
+    server.received.connect(window.handle_forwarded)
+    if args.add:
+        window.list_tab.add_workshop_ids(args.add)
+
+    api_server = start_api(window, force=args.api or args.headless)
+    if api_server is not None:
+        app.aboutToQuit.connect(api_server.stop)
+
+    if args.headless:
+        # Qt's loop never returns to Python on its own; tick so Ctrl+C works.
+        signal.signal(signal.SIGINT, lambda *_: app.quit())
+        interrupt_timer = QTimer(app)
+        interrupt_timer.timeout.connect(lambda: None)
+        interrupt_timer.start(500)
     sys.exit(app.exec())
     
 # SteamDepotDownloader> .\DepotDownloaderMod.exe -app 294100 -pubfile 2222935097
\ No newline at end of file
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+
+from PySide6.QtCore import QModelIndex, QObject, Signal
+
+from tab.QueueModel import QueueItem
+from utils.api import EventHub, Snapshot
+
+
+def _row(item: QueueItem, eta: float | None = None) -> dict:
+    return {
+        "key": item.key,
+        "workshop_id": item.workshop_id,
+        "name": item.name,
+        "size_bytes": item.size_bytes,
+        "app_id": item.app_id,
+        "app_name": item.app_name,
+        "status": item.status,
+        "progress": item.progress,
+        "eta": eta,
+        "message": item.status_tip,
+        "usage": item.usage,
+        "folder": item.folder,
+        "history": [{"time": stamp, "text": text} for stamp, text in item.history],
+    }
+
+
+class ApiBridge(QObject):
+    """Connects the download queue to the local API server.
+
+    Lives on the GUI thread. It mirrors the queue model into a
+    :class:`Snapshot` as rows change, publishes status and progress
+    events, and runs API commands on the GUI thread through a queued
+    signal.
+    """
+
+    _command = Signal(object)  # (future, name, args)
+
+    def __init__(self, list_tab, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.list_tab = list_tab
+        self.model = list_tab.model
+        self.snapshot = Snapshot()
+        self.hub = EventHub()
+
+        for item in self.model.items():
+            self.snapshot.put(item.key, _row(item, self.model.eta_of(item)))
+
+        self.model.rowsInserted.connect(self._rows_inserted)
+        self.model.rowsAboutToBeRemoved.connect(self._rows_removed)
+        self.model.rowsMoved.connect(self._reorder)
+        self.model.layoutChanged.connect(self._reorder)
+        self.model.changed.connect(self._rows_changed)
+        self._command.connect(self._run_command)
+
+    # ---- called from the API thread ----------------------------------------
+
+    def submit(self, name: str, args: dict) -> Future:
+        future: Future = Future()
+        self._command.emit((future, name, args))
+        return future
+
+    # ---- GUI thread --------------------------------------------------------
+
+    def _run_command(self, command: tuple[Future, str, dict]) -> None:
+        future, name, args = command
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self._execute(name, args))
+        except Exception as e:  # noqa: BLE001
+            future.set_exception(e)
+
+    def _execute(self, name: str, args: dict):
+        tab = self.list_tab
+        if name == "add":
+            return {"added": tab.add_workshop_ids(args["ids"])}
+        if name == "start":
+            tab.start_download_queue()
+        elif name == "pause":
+            tab.set_paused(True)
+        elif name == "resume":
+            tab.set_paused(False)
+        elif name in ("remove", "top", "move", "retry", "cancel"):
+            key = args["key"]
+            if self.model.item(key) is None:
+                raise KeyError(key)
+            if name == "remove":
+                tab.remove_item(key)
+            elif name == "top":
+                tab.move_item_to_top(key)
+            elif name == "move":
+                index = args["index"]
+                if not 0 <= index < self.model.rowCount():
+                    raise ValueError(f"index out of range: {index} (queue has {self.model.rowCount()} rows)")
+                tab.move_item(key, index)
+            elif name == "cancel":
+                tab.cancel_item(key)
+            else:
+                tab.retry_item(key)
+        else:
+            raise ValueError(f"unknown command: {name}")
+
+        self.snapshot.set_state(paused=tab.paused)
+        return None
+
+    def _rows_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
+        for row in range(first, last + 1):
+            key = self.model.key_at(row)
+            item = self.model.item(key)
+            self.snapshot.put(key, _row(item, self.model.eta_of(item)))
+            self.hub.publish("added", key=key, workshop_id=item.workshop_id)
+        if last < self.model.rowCount() - 1:
+            self._reorder()
+
+    def _rows_removed(self, parent: QModelIndex, first: int, last: int) -> None:
+        for row in range(first, last + 1):
+            key = self.model.key_at(row)
+            self.snapshot.remove(key)
+            self.hub.publish("removed", key=key)
+
+    def _reorder(self, *args) -> None:
+        self.snapshot.set_order([item.key for item in self.model.items()])
+
+    def _rows_changed(self, keys: list) -> None:
+        for key in keys:
+            item = self.model.item(key)
+            previous = self.snapshot.get(key)
+            row = _row(item, self.model.eta_of(item))
+            self.snapshot.put(key, row)
+
+            if previous is None or previous["status"] != row["status"]:
+                self.hub.publish("status", key=key, workshop_id=item.workshop_id, status=row["status"])
+                if row["status"] == "Complete":
+                    self.hub.publish("complete", key=key, workshop_id=item.workshop_id, folder=row["folder"])
+            elif previous["progress"] != row["progress"]:
+                self.hub.publish("progress", key=key, workshop_id=item.workshop_id, progress=row["progress"])
+
+        self.snapshot.set_state(
+            current=self.list_tab.current_download_key(),
+            paused=self.list_tab.paused,
+            eta=self.list_tab.queue_eta(),
+        )
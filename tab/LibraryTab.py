@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import time
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QFile,
+    QModelIndex,
+    QObject,
+    QSortFilterProxyModel,
+    Qt,
+    QThread,
+    QTimer,
+    QUrl,
+    Signal,
+    Slot,
+)
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+from qfluentwidgets import FluentIcon, PushButton, SearchLineEdit
+
+from utils import downloader as depot_downloader
+from utils import profiling
+from utils.library import LibraryEntry, LibraryIndex, ScanResult, scan as scan_library
+from utils.utils import utils
+
+COLUMNS = ["Folder", "Workshop ID", "Game", "Files", "Size", "Modified"]
+COL_FOLDER, COL_ID, COL_GAME, COL_FILES, COL_SIZE, COL_MODIFIED = range(len(COLUMNS))
+
+
+class LibraryModel(QAbstractTableModel):
+    """Read-only table of indexed depot folders."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._entries: list[LibraryEntry] = []
+
+    def set_entries(self, entries: list[LibraryEntry]) -> None:
+        self.beginResetModel()
+        self._entries = entries
+        self.endResetModel()
+
+    def entry_at(self, row: int) -> LibraryEntry:
+        return self._entries[row]
+
+    def entries(self) -> list[LibraryEntry]:
+        return list(self._entries)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self._entries)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        entry = self._entries[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == COL_FOLDER:
+                return entry.folder.rpartition("/")[2]
+            if column == COL_ID:
+                return entry.workshop_id
+            if column == COL_GAME:
+                return entry.game
+            if column == COL_FILES:
+                return str(entry.files)
+            if column == COL_SIZE:
+                return utils().size(entry.size_bytes)
+            if column == COL_MODIFIED:
+                if not entry.modified:
+                    return ""
+                return time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.modified))
+            return None
+
+        # Numeric columns sort by value, not by their display text.
+        if role == Qt.UserRole:
+            if column == COL_FILES:
+                return entry.files
+            if column == COL_SIZE:
+                return entry.size_bytes
+            if column == COL_MODIFIED:
+                return entry.modified
+            return self.data(index, Qt.DisplayRole).lower()
+
+        if role == Qt.ToolTipRole and column == COL_FOLDER:
+            return entry.folder
+
+        if role == Qt.TextAlignmentRole and column != COL_FOLDER:
+            return int(Qt.AlignCenter)
+
+        return None
+
+
+class _LibraryScanWorker(QObject):
+    """Brings the library index up to date off the GUI thread."""
+
+    finished = Signal(bool, object, object)  # ok, ScanResult or message, entries
+
+    def __init__(self, full: bool, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._full = full
+
+    @Slot()
+    @profiling.profiled("library")
+    def run(self) -> None:
+        try:
+            result, entries = scan_library(full=self._full)
+            self.finished.emit(True, result, entries)
+        except Exception as e:  # noqa: BLE001
+            self.finished.emit(False, f"Library scan failed: {e}", [])
+
+
+class LibraryTab(QWidget):
+    """Everything already downloaded under ``depots/``.
+
+    Rows come from the persisted index, so the tab fills instantly; an
+    incremental scan then runs in the background and only lists the
+    directories that changed since the last one.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("libraryInterface")
+
+        self._index = LibraryIndex()
+        self._current_scan: tuple[QThread, _LibraryScanWorker] | None = None
+        self._rescan_pending = False
+        self._scanned_once = False
+
+        layout = QVBoxLayout(self)
+        layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(8)
+
+        title = QLabel("Library", self)
+        title.setObjectName("LibraryTitle")
+        qss_file = QFile("qss/tab/title.qss")
+        if qss_file.open(QFile.ReadOnly | QFile.Text):
+            title.setStyleSheet(bytes(qss_file.readAll()).decode("utf-8"))
+            qss_file.close()
+
+        controls_layout = QHBoxLayout()
+        controls_layout.setSpacing(8)
+
+        self.filter_input = SearchLineEdit(self)
+        self.filter_input.setPlaceholderText("Filter by folder, ID or game")
+        controls_layout.addWidget(self.filter_input, 1)
+
+        self.rescan_button = PushButton(FluentIcon.SYNC, "Rescan", self)
+        self.rescan_button.setToolTip("Check the depots folder for changes")
+        controls_layout.addWidget(self.rescan_button)
+
+        self.full_rescan_button = PushButton(FluentIcon.SEARCH, "Full Rescan", self)
+        self.full_rescan_button.setToolTip("Read every folder again, ignoring what is indexed")
+        controls_layout.addWidget(self.full_rescan_button)
+
+        self.open_button = PushButton(FluentIcon.FOLDER, "Open Folder", self)
+        controls_layout.addWidget(self.open_button)
+
+        self.model = LibraryModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(Qt.UserRole)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(-1)
+
+        self.table = QTableView(self)
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSortIndicator(COL_FOLDER, Qt.AscendingOrder)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
+        self.table.setShowGrid(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(COL_FOLDER, QHeaderView.Stretch)
+        for column, width in ((COL_ID, 125), (COL_GAME, 160), (COL_FILES, 70), (COL_SIZE, 100), (COL_MODIFIED, 130)):
+            header.setSectionResizeMode(column, QHeaderView.Fixed)
+            self.table.setColumnWidth(column, width)
+
+        self.summary_label = QLabel("", self)
+        self.message_label = QLabel("", self)
+
+        layout.addWidget(title)
+        layout.addLayout(controls_layout)
+        layout.addWidget(self.table, 1)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.message_label)
+
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter_text)
+        self.filter_input.textChanged.connect(self._filter_timer.start)
+
+        self.rescan_button.clicked.connect(lambda: self.rescan())
+        self.full_rescan_button.clicked.connect(lambda: self.rescan(full=True))
+        self.open_button.clicked.connect(self._open_selected)
+        self.table.doubleClicked.connect(self._open_selected)
+
+        self._show_entries(self._index.entries())
+
+    def showEvent(self, event) -> None:  # type: ignore[override]
+        super().showEvent(event)
+        if not self._scanned_once:
+            self.rescan()
+
+    # ==== Index ==============================================================
+
+    def record_download(self, workshop_id: str, folder: str) -> None:
+        """A download finished into ``folder``; pick it up on the next scan."""
+
+        self._index.record_folder(folder, workshop_id)
+        if self._scanned_once:
+            self.rescan()
+
+    def rescan(self, full: bool = False) -> None:
+        if self._current_scan is not None:
+            # Changes made while scanning are picked up right after.
+            self._rescan_pending = True
+            return
+
+        self._scanned_once = True
+        self.message_label.setText("Scanning depots...")
+
+        thread = QThread(self)
+        worker = _LibraryScanWorker(full)
+        worker.moveToThread(thread)
+        self._current_scan = (thread, worker)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        worker.finished.connect(worker.deleteLater)
+        worker.finished.connect(self._handle_scan_finished)
+
+        thread.start()
+
+    def _handle_scan_finished(self, ok: bool, result, entries: list) -> None:
+        self._current_scan = None
+        if ok:
+            result: ScanResult
+            if result.listed or result.removed or not self.model.rowCount():
+                self._show_entries(entries)
+            self.message_label.setText(
+                f"Checked {result.directories} folders, re-read {result.listed}"
+            )
+        else:
+            self.message_label.setText(result)
+
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self.rescan()
+
+    def _show_entries(self, entries: list[LibraryEntry]) -> None:
+        self.model.set_entries(entries)
+        total = sum(entry.size_bytes for entry in entries)
+        self.summary_label.setText(f"{len(entries)} items, {utils().size(total)}")
+
+    # ==== Actions ============================================================
+
+    def _apply_filter_text(self) -> None:
+        self.proxy.setFilterFixedString(self.filter_input.text().strip())
+
+    def _open_selected(self, *_args) -> None:
+        folder = depot_downloader.get_depots_dir()
+        rows = self.table.selectionModel().selectedRows()
+        if rows:
+            entry = self.model.entry_at(self.proxy.mapToSource(rows[0]).row())
+            folder = folder / entry.folder
+        if not folder.is_dir():
+            folder = depot_downloader.get_depots_dir()
+            folder.mkdir(parents=True, exist_ok=True)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(folder)))
@@ -1,92 +1,531 @@
 import os
+import time
 import asyncio
-
-from PySide6.QtCore import Qt, QObject, Signal, Slot, QThread
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Collection
+
+from PySide6.QtCore import Qt, QObject, QSize, Signal, Slot, QThread, QTimer, QUrl
+from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
+    QFileDialog,
     QLabel,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QLineEdit,
     QHeaderView,
     QAbstractItemView,
 )
-from qfluentwidgets import PushButton, PrimaryPushButton, FluentIcon
+from qfluentwidgets import PushButton, PrimaryPushButton, PillPushButton, SearchLineEdit, FluentIcon
 from PySide6.QtCore import QFile
 from utils.metadata import Metadata
 from utils import downloader as depot_downloader
-from utils.workshop import WorkshopDownloader, WorkshopJob
+from utils.config import Config
+from utils.diskspace import DiskAdmission
+from utils.utils import utils
+from utils.workshop import (
+    WorkshopDownloader,
+    WorkshopJob,
+    detect_phase,
+    MIN_ID_DIGITS,
+    is_completion_line,
+    parse_progress,
+    parse_workshop_id,
+    terminate_process,
+)
+from utils import governor, profiling, tracing
+from utils.verify import HashIndex, verify_item
+from utils.archive import ArchiveStage
+from utils.dedupe import dedupe, unshare
+from utils.detailstore import DetailStore
+from utils.dependencies import Resolution, resolve as resolve_dependencies
+from utils.eta import EtaModel, HistoryStore, format_duration
+from utils.appnames import AppNameIndex, refresh as refresh_app_names
+from utils.joblog import JobLog, prune as prune_job_logs
+from utils.httpdownload import DirectFile, DownloadStopped, HttpDownloader
+from utils.watchdog import DEFAULT_GROWTH_TIMEOUT, DEFAULT_OUTPUT_TIMEOUT, StallWatchdog
+from utils.queuefile import QueueRecord, iter_records, write_records
+from tab.QueueModel import (
+    QueueModel,
+    QueueFilterProxy,
+    COL_NO,
+    COL_THUMB,
+    COL_ID,
+    COL_NAME,
+    COL_SIZE,
+    COL_APP,
+    COL_GAME,
+    COL_STATUS,
+    COL_ETA,
+    COL_ACTION,
+    FACETS,
+)
+from tab.LogViewer import LogViewer
+from tab.RowActions import RowActionDelegate
+from tab.Thumbnails import THUMB_SIZE, ThumbnailCache
 from PySide6.QtWidgets import QGraphicsBlurEffect
 
 
 class _MetadataFetchWorker(QObject):
-    finished = Signal(str, str, str)  # name, size, app_id
-    failed = Signal(str)         # error message
+    finished = Signal(int, str, str, str, object)  # key, name, size, app_id, details
+    failed = Signal(int, str)         # key, error message
 
-    def __init__(self, workshop_id: str, parent: QObject | None = None) -> None:
+    def __init__(self, key: int, workshop_id: str, parent: QObject | None = None) -> None:
         super().__init__(parent)
+        self._key = key
         self._workshop_id = workshop_id
 
     @Slot()
+    @profiling.profiled("metadata")
     def run(self) -> None:
         try:
             metadata = Metadata()
-            name, size, app_id = asyncio.run(metadata.getData(self._workshop_id))
-            self.finished.emit(name, size, app_id)
+            details = asyncio.run(metadata.get(self._workshop_id))
+            name, size, app_id = metadata.describe(details)
+            self.finished.emit(self._key, name, size, app_id, details)
         except Exception as e:  # noqa: BLE001
-            self.failed.emit(str(e))
+            self.failed.emit(self._key, str(e))
 
 
 class _DownloadWorker(QObject):
     """Worker that runs a single Workshop download using WorkshopDownloader."""
 
-    finished = Signal(bool, str)  # success, error message
+    finished = Signal(int, bool, str)  # key, success, error message
+    progress = Signal(int, float)      # key, percent
+    stopped = Signal(int, str)         # key, reason passed to stop()
+    note = Signal(int, str)            # key, entry for the job history
+    usage = Signal(int, str)           # key, CPU/RSS of the process
 
-    def __init__(self, app_id: str, workshop_name: str, workshop_id: str, parent: QObject | None = None) -> None:
+    def __init__(
+        self,
+        key: int,
+        app_id: str,
+        workshop_name: str,
+        workshop_id: str,
+        validate: bool = False,
+        game_name: str = "",
+        direct: DirectFile | None = None,
+        log: JobLog | None = None,
+        parent: QObject | None = None,
+    ) -> None:
         super().__init__(parent)
+        self._key = key
         self._app_id = app_id
         self._workshop_id = workshop_id
         self._workshop_name = workshop_name
+        self._validate = validate
+        self._game_name = game_name
+        self._direct = direct
+        self._log = log
+        self._lock = threading.Lock()
+        self._proc = None
+        self._stop_reason: str | None = None
+        self._stop_event = threading.Event()
+
+    @property
+    def key(self) -> int:
+        return self._key
+
+    def stop(self, reason: str) -> None:
+        """Terminate the download; called from the GUI thread.
+
+        ``run`` then emits ``stopped`` with ``reason`` instead of
+        ``finished``.
+        """
+
+        with self._lock:
+            if self._stop_reason is not None:
+                return
+            self._stop_reason = reason
+            proc = self._proc
+        self._stop_event.set()
+        if proc is not None:
+            terminate_process(proc)
 
     @Slot()
+    @profiling.profiled("download")
     def run(self) -> None:
+        span = tracing.span("download.job", "download", workshop_id=self._workshop_id).start()
+        if self._log is not None:
+            self._log.open()
+        success, error = self._run()
+        if self._log is not None:
+            if self._stop_reason is not None:
+                self._log.write(f"Stopped: {self._stop_reason}")
+            elif error:
+                self._log.write(f"Failed: {error}")
+            self._log.close()
+        span.end(success=success, stopped=self._stop_reason)
+        if self._stop_reason is not None:
+            self.stopped.emit(self._key, self._stop_reason)
+        else:
+            self.finished.emit(self._key, success, error)
+
+    def _run(self) -> tuple[bool, str]:
         try:
             downloader = WorkshopDownloader()
-            job = WorkshopJob(app_id=self._app_id, pubfile_id=self._workshop_id, app_name=self._workshop_name)
-            proc = downloader.run_job(job)
+            job = WorkshopJob(
+                app_id=self._app_id,
+                pubfile_id=self._workshop_id,
+                app_name=self._workshop_name,
+                validate=self._validate,
+                game_name=self._game_name,
+            )
+
+            # DepotDownloaderMod writes into existing files in place, which
+            # would leak into every deduplicated hardlink of them.
+            target = downloader.exe_dir / downloader.target_dir(job)
+            if target.is_dir():
+                unshare(target)
+
+            if self._direct is not None:
+                return self._download_direct(target)
+
+            retries = max(int(Config().get("stall_retries", 2)), 0)
+            for attempt in range(retries + 1):
+                if self._stop_reason is not None:
+                    return False, ""
+
+                stall = self._attempt(downloader, job, target)
+                if stall is None:
+                    return True, ""
+
+                retrying = attempt < retries
+                self._note(f"Stalled: {stall}" + ("; restarting" if retrying else ""))
+
+            return False, f"Stalled {retries + 1} times; last: {stall}"
+        except Exception as e:  # noqa: BLE001
+            return False, str(e)
+
+    def _emit_usage(self, cpu: float, rss: int) -> None:
+        # Sampler thread; the signal is queued to the GUI thread.
+        self.usage.emit(self._key, f"CPU {cpu:.0f}%, RSS {rss / (1024 * 1024):.0f} MB")
+
+    def _note(self, text: str) -> None:
+        if self._log is not None:
+            self._log.write(text)
+        self.note.emit(self._key, text)
+
+    def _download_direct(self, target: Path) -> tuple[bool, str]:
+        """Fetch an item with a ``file_url`` over HTTP, without the exe."""
+
+        self._note(f"Direct download: {self._direct.filename}")
+        last_percent = -1
+
+        def progress(done: int, total: int) -> None:
+            nonlocal last_percent
+            if total and int(done * 100 / total) != last_percent:
+                last_percent = int(done * 100 / total)
+                self.progress.emit(self._key, done * 100.0 / total)
+
+        try:
+            HttpDownloader.shared().download(self._direct, target, progress, self._stop_event)
+        except DownloadStopped:
+            return False, ""
+        return True, ""
+
+    def _attempt(self, downloader: WorkshopDownloader, job: WorkshopJob, target: Path) -> str | None:
+        """Run DepotDownloaderMod once; return why it stalled, or None."""
+
+        proc = downloader.run_job(job)
+        with self._lock:
+            self._proc = proc
+            stop_now = self._stop_reason is not None
+        if stop_now:
+            terminate_process(proc)
+        if self._log is not None and downloader.skipped_limits:
+            self._log.write("Limits not applied: " + ", ".join(downloader.skipped_limits))
+
+        completed_marker_found = False
+        last_percent = -1
+        phase_name = "startup"
+        phase_span = tracing.span("phase.startup", "download").start()
+
+        watchdog = StallWatchdog(
+            proc,
+            target,
+            output_timeout=float(Config().get("stall_timeout_seconds", DEFAULT_OUTPUT_TIMEOUT)),
+            growth_timeout=float(Config().get("stall_growth_seconds", DEFAULT_GROWTH_TIMEOUT)),
+        )
+        gate = governor.PhaseGate(
+            proc,
+            governor.DiskSlot(),
+            on_wait=lambda: watchdog.touch(hold=True),
+            should_stop=lambda: self._stop_reason is not None,
+        )
+        sampler = governor.ProcessSampler(proc.pid, self._emit_usage)
+        with watchdog, sampler:
+            try:
+                if proc.stdout is not None:
+                    for line in proc.stdout:
+                        watchdog.touch()
+                        line = line.strip()
+                        if self._log is not None:
+                            self._log.write(line)
+                        phase = detect_phase(line)
+                        if phase is not None and phase != phase_name:
+                            phase_span.end()
+                            phase_name = phase
+                            phase_span = tracing.span(f"phase.{phase}", "download").start()
+                            gate.phase(phase)
+                        percent = parse_progress(line)
+                        # Whole percents only, so the GUI is not flooded.
+                        if percent is not None and int(percent) != last_percent:
+                            last_percent = int(percent)
+                            self.progress.emit(self._key, percent)
+                        if is_completion_line(line):
+                            completed_marker_found = True
+
+                proc.wait()
+            finally:
+                gate.close()
+        phase_span.end(returncode=proc.returncode)
+
+        if gate.waited >= 1:
+            self._note(f"Waited {gate.waited:.0f} s for a disk slot")
+        if gate.unthrottled:
+            self._note("Disk slot still busy, continued without one")
+        if sampler.samples:
+            summary = sampler.summary()
+            self.usage.emit(self._key, summary)
+            if self._log is not None:
+                self._log.write(f"Resources: {summary}")
+
+        if watchdog.stalled is not None and self._stop_reason is None:
+            return watchdog.stalled
+
+        if proc.returncode != 0 and not completed_marker_found:
+            message = f"Process exited with code {proc.returncode}"
+            if self._log is not None and self._log.last_line:
+                message += f": {self._log.last_line}"
+            raise RuntimeError(message)
+
+        return None
+
+
+class _VerifyWorker(QObject):
+    """Worker that hashes a downloaded item into the content-hash index."""
+
+    finished = Signal(int, bool, str)  # key, ok, message
+
+    def __init__(
+        self,
+        key: int,
+        workshop_id: str,
+        folder: str,
+        record: bool,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._key = key
+        self._workshop_id = workshop_id
+        self._folder = folder
+        self._record = record
+
+    @Slot()
+    @profiling.profiled("verify")
+    def run(self) -> None:
+        try:
+            # Hashing reads every file of the item: a disk-heavy phase.
+            with governor.DiskSlot():
+                index = HashIndex()
+                try:
+                    result = verify_item(self._workshop_id, Path(self._folder), index, record=self._record)
+                finally:
+                    index.close()
+
+            if result.ok:
+                self.finished.emit(self._key, True, f"{result.files} files, {result.hashed} hashed")
+            elif result.files == 0 and not result.missing:
+                self.finished.emit(self._key, False, "No files were downloaded")
+            else:
+                self.finished.emit(
+                    self._key,
+                    False,
+                    f"{len(result.changed)} changed, {len(result.missing)} missing",
+                )
+        except Exception as e:  # noqa: BLE001
+            self.finished.emit(self._key, False, str(e))
 
-            completed_marker_found = False
 
-            if proc.stdout is not None:
-                for line in proc.stdout:
-                    line = line.strip()
-                    # Heuristic: consider download complete when Steam disconnects
-                    # or when the total downloaded line appears.
-                    if (
-                        "Disconnected from Steam" in line
-                        or line.startswith("Total downloaded:")
-                    ):
-                        completed_marker_found = True
+class _DedupeWorker(QObject):
+    """Worker that links identical files across depot folders."""
 
-            proc.wait()
+    finished = Signal(bool, str)  # ok, message
 
-            if proc.returncode != 0 and not completed_marker_found:
-                raise RuntimeError(f"Process exited with code {proc.returncode}")
+    def __init__(self, folders: list[str] | None, mode: str,
+                 busy: Callable[[], Collection[str]], parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._folders = folders
+        self._mode = mode
+        self._busy = busy
 
-            self.finished.emit(True, "")
+    @Slot()
+    @profiling.profiled("dedupe")
+    def run(self) -> None:
+        try:
+            # Held per folder and size group, not for the whole pass.
+            result = dedupe(
+                folders=self._folders,
+                mode=self._mode,
+                slot=governor.DiskSlot(),
+                busy=self._busy,
+            )
+            self.finished.emit(
+                True,
+                f"Dedupe: {result.linked} files linked, "
+                f"{utils().size(result.saved_bytes)} saved",
+            )
+        except Exception as e:  # noqa: BLE001
+            self.finished.emit(False, f"Dedupe failed: {e}")
+
+
+class _AppNamesRefreshWorker(QObject):
+    """Downloads the Steam app list into the local app name index."""
+
+    finished = Signal(bool, str)  # ok, message
+
+    @Slot()
+    @profiling.profiled("appnames")
+    def run(self) -> None:
+        try:
+            count = refresh_app_names()
+            self.finished.emit(True, f"{count} apps")
         except Exception as e:  # noqa: BLE001
             self.finished.emit(False, str(e))
 
 
+class _DependencyWorker(QObject):
+    """Resolves the required items of a batch of queue rows."""
+
+    finished = Signal(object, object)  # root keys, Resolution
+    failed = Signal(object, str)       # root keys, error message
+
+    def __init__(self, roots: dict[int, str], known: set[str], parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._roots = roots
+        self._known = known
+
+    @Slot()
+    @profiling.profiled("dependencies")
+    def run(self) -> None:
+        try:
+            resolution = asyncio.run(resolve_dependencies(list(self._roots.values()), self._known))
+            self.finished.emit(list(self._roots), resolution)
+        except Exception as e:  # noqa: BLE001
+            self.failed.emit(list(self._roots), str(e))
+
+
+# Metadata requests running at once; the rest wait in a backlog.
+MAX_ACTIVE_FETCHES = 8
+
+# Rows inserted per event-loop turn while importing a queue file.
+IMPORT_CHUNK_SIZE = 500
+
+# Rows whose metadata arrives within this window share one dependency lookup.
+DEPENDENCY_BATCH_MS = 300
+
+# Job logs kept in memory for viewing; older ones are read back from disk.
+KEPT_JOB_LOGS = 20
+
+# Typing pause after which the ID in the input is looked up ahead of Add.
+PREFETCH_DELAY_MS = 350
+
+# Metadata results arriving within this window are stored in one transaction.
+DETAILS_FLUSH_MS = 500
+
+# With nothing running, held rows are checked against free space this often.
+HELD_RECHECK_MS = 10_000
+
+
+def _top_folder(folder: Path) -> str:
+    """The top-level depot folder of ``folder``, the unit dedupe works on.
+
+    That is the game folder when downloads are grouped by game.
+    """
+
+    try:
+        return folder.relative_to(depot_downloader.get_depots_dir()).parts[0]
+    except (ValueError, IndexError):
+        return folder.name
+
+
 class ListTab(QWidget):
+    _archive_finished = Signal(int, bool, str)  # key, ok, message
+    completed = Signal(str, str)  # workshop id, folder of a finished download
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("listInterface")
         self._active_fetches: dict[int, tuple[QThread, _MetadataFetchWorker]] = {}
+        self._fetch_backlog: deque[tuple[str, int]] = deque()  # workshop id, key
+        self._import_records = None
+        self._import_seen: set[str] = set()
+        self._import_counts = [0, 0]  # added, skipped
+        # Rows added by the running import, sorted by priority.
+        self._import_priorities: list[int] = []
+        self._import_keys: list[int] = []
+        self._import_timer = QTimer(self)
+        self._import_timer.setInterval(0)
+        self._import_timer.timeout.connect(self._import_next_chunk)
         self._download_queue: list[int] = []
+        self._paused = False
         self._current_download: tuple[QThread, _DownloadWorker] | None = None
+        # Top-level depot folders of running downloads; read by dedupe passes.
+        self._writing_folders: dict[int, str] = {}
+        self._verify_queue: list[tuple[int, bool]] = []  # key, record
+        self._current_verify: tuple[QThread, _VerifyWorker] | None = None
+        self._validate_keys: set[int] = set()
+        self._archive_stage: ArchiveStage | None = None
+        self._archive_finished.connect(self._handle_archive_finished)
+        self._dedupe_queue: list[list[str] | None] = []
+        self._current_dedupe: tuple[QThread, _DedupeWorker] | None = None
+        self._app_names = AppNameIndex()
+        self._details = DetailStore()
+        self._details.prune()
+        self._details_timer = QTimer(self)
+        self._details_timer.setSingleShot(True)
+        self._details_timer.setInterval(DETAILS_FLUSH_MS)
+        self._details_timer.timeout.connect(self._details.flush)
+        self._job_logs: OrderedDict[int, JobLog] = OrderedDict()
+        # Speculative lookup of the ID being typed. Each lookup gets a new
+        # generation; results of an older one are dropped unless Add
+        # adopted it for a row.
+        self._prefetch_generation = 0
+        self._prefetch_id: str | None = None
+        self._prefetch_result: tuple | None = None  # name, size, app id, details
+        self._prefetches: dict[int, tuple[QThread, _MetadataFetchWorker]] = {}
+        self._prefetch_adopted: dict[int, int] = {}  # generation -> row key
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self._start_prefetch)
+        prune_job_logs()
+        self._eta = EtaModel(HistoryStore())
+        self._run_timing: dict[int, list[float]] = {}  # key -> [started, first progress]
+        self._eta_skip: set[int] = set()  # stopped mid-run; a partial run is no sample
+        self._queue_eta_base = 0.0
+        self._eta_signature: tuple | None = None
+        self._app_names_refresh: tuple[QThread, _AppNamesRefreshWorker] | None = None
+        self._app_names_checked = False
+        self._app_names_refreshed = False
+        self._dependency_roots: dict[int, str] = {}
+        self._dependencies_resolved: set[str] = set()  # ids whose requirements were looked up
+        self._dependency_waiters: set[int] = set()  # queue these once their metadata is in
+        self._current_resolve: tuple[QThread, _DependencyWorker] | None = None
+        self._dependency_timer = QTimer(self)
+        self._dependency_timer.setSingleShot(True)
+        self._dependency_timer.setInterval(DEPENDENCY_BATCH_MS)
+        self._dependency_timer.timeout.connect(self._start_dependency_resolution)
+        self._admission = DiskAdmission(
+            depot_downloader.get_depots_dir(),
+            margin_bytes=int(Config().get("disk_margin_mb", 512)) * 1024 * 1024,
+        )
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -108,7 +547,7 @@ class ListTab(QWidget):
         controls_layout.setSpacing(8)
 
         self.workshop_input = QLineEdit(self.content_widget)
-        self.workshop_input.setPlaceholderText("Workshop ID")
+        self.workshop_input.setPlaceholderText("Workshop ID or URL")
 
         self.add_button = PrimaryPushButton(FluentIcon.ADD, "Add", self.content_widget)
         h = self.add_button.sizeHint().height()
@@ -116,54 +555,156 @@ class ListTab(QWidget):
         
         self.download_button = PushButton(FluentIcon.DOWNLOAD, "Download", self.content_widget)
         self.download_button.setToolTip("Download Files")
+
+        self.verify_button = PushButton(FluentIcon.CERTIFICATE, "Verify", self.content_widget)
+        self.verify_button.setToolTip("Re-check completed downloads against the hash index")
         
         controls_layout.addWidget(self.workshop_input, 1)
         controls_layout.addWidget(self.add_button)
         controls_layout.addWidget(self.download_button)
-        self.list_widget = QTableWidget(self.content_widget)
-        self.list_widget.verticalHeader().setVisible(False)
-        self.list_widget.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
-        self.list_widget.setShowGrid(False)
-        self.list_widget.setAlternatingRowColors(True)
-        self.list_widget.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.list_widget.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.list_widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
-
-        self.list_widget.setColumnCount(7)
-        self.list_widget.setHorizontalHeaderLabels([
-            "No",
-            "Workshop ID",
-            "Workshop Name",
-            "Size",
-            "App ID",
-            "Status",
-            "Action",
-        ])
-
-        header = self.list_widget.horizontalHeader()
+        controls_layout.addWidget(self.verify_button)
+
+        self.pause_button = PushButton(FluentIcon.PAUSE, "Pause", self.content_widget)
+        self.pause_button.setToolTip("Pause or resume the download queue")
+        controls_layout.addWidget(self.pause_button)
+
+        self.dedupe_button = PushButton(FluentIcon.BROOM, "Dedupe", self.content_widget)
+        self.dedupe_button.setToolTip("Link identical files across all depot folders")
+        controls_layout.addWidget(self.dedupe_button)
+
+        self.import_button = PushButton(FluentIcon.FOLDER_ADD, "Import", self.content_widget)
+        self.import_button.setToolTip("Add rows from a .jsonl or .csv queue file")
+        controls_layout.addWidget(self.import_button)
+
+        self.export_button = PushButton(FluentIcon.SAVE, "Export", self.content_widget)
+        self.export_button.setToolTip("Save the queue as .jsonl or .csv")
+        controls_layout.addWidget(self.export_button)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(8)
+
+        self.filter_input = SearchLineEdit(self.content_widget)
+        self.filter_input.setPlaceholderText("Filter by ID, name, app, game or status")
+        filter_layout.addWidget(self.filter_input, 1)
+
+        self.facet_buttons: dict[str | None, PillPushButton] = {}
+        for facet in (None, *FACETS):
+            button = PillPushButton(facet or "All", self.content_widget)
+            button.setCheckable(True)
+            button.clicked.connect(lambda _=False, f=facet: self._set_facet(f))
+            filter_layout.addWidget(button)
+            self.facet_buttons[facet] = button
+        self.facet_buttons[None].setChecked(True)
+
+        # Filter once typing pauses instead of on every keystroke.
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter_text)
+        self.filter_input.textChanged.connect(self._filter_timer.start)
+        self.filter_input.searchSignal.connect(self._apply_filter_text)
+        self.filter_input.clearSignal.connect(self._apply_filter_text)
+
+        self.model = QueueModel(self)
+        self.model.flushed.connect(self._update_usage_label)
+        self.model.flushed.connect(self._update_facet_counts)
+        self.model.rowsInserted.connect(self._update_facet_counts)
+        self.model.flushed.connect(self._schedule_queue_eta)
+
+        self._held_timer = QTimer(self)
+        self._held_timer.setSingleShot(True)
+        self._held_timer.setInterval(HELD_RECHECK_MS)
+        self._held_timer.timeout.connect(self._start_next_download)
+
+        self._queue_eta_timer = QTimer(self)
+        self._queue_eta_timer.setSingleShot(True)
+        self._queue_eta_timer.setInterval(250)
+        self._queue_eta_timer.timeout.connect(self._update_queue_eta)
+
+        # The running ETA counts down between progress lines.
+        self._running_eta_timer = QTimer(self)
+        self._running_eta_timer.setInterval(1000)
+        self._running_eta_timer.timeout.connect(self._update_running_eta)
+
+        self.proxy = QueueFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.list_view = QTableView(self.content_widget)
+        self.list_view.setModel(self.proxy)
+        self.list_view.setSortingEnabled(True)
+        self.list_view.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.list_view.verticalHeader().setVisible(False)
+        self.list_view.verticalHeader().setDefaultSectionSize(THUMB_SIZE + 6)
+        self.list_view.setIconSize(QSize(THUMB_SIZE, THUMB_SIZE))
+        self.list_view.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
+        self.list_view.setShowGrid(False)
+        self.list_view.setAlternatingRowColors(True)
+        self.list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setMouseTracking(True)
+
+        self.action_delegate = RowActionDelegate(self.list_view)
+        self.action_delegate.triggered.connect(self.handle_row_action)
+        self.list_view.setItemDelegateForColumn(COL_ACTION, self.action_delegate)
+        self.list_view.entered.connect(self._handle_view_entered)
+
+        self.thumbnails = ThumbnailCache(self._preview_url, self._visible_keys, self)
+        self.thumbnails.ready.connect(self.model.thumbnail_ready)
+        self.model.thumbnails = self.thumbnails
+
+        header = self.list_view.horizontalHeader()
         
-        header.setSectionResizeMode(0, QHeaderView.Fixed)
-        header.setSectionResizeMode(1, QHeaderView.Fixed)
-        header.setSectionResizeMode(2, QHeaderView.Stretch)
-        header.setSectionResizeMode(3, QHeaderView.Fixed)
-        header.setSectionResizeMode(4, QHeaderView.Fixed)
-        header.setSectionResizeMode(5, QHeaderView.Fixed)
-        header.setSectionResizeMode(6, QHeaderView.Fixed)
-
-        self.list_widget.setColumnWidth(0, 50)
-        self.list_widget.setColumnWidth(1, 125)
-        self.list_widget.setColumnWidth(3, 100)
-        self.list_widget.setColumnWidth(4, 100)
-        self.list_widget.setColumnWidth(5, 100)
-        self.list_widget.setColumnWidth(6, 100)
+        header.setSectionResizeMode(COL_NO, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_THUMB, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_ID, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_NAME, QHeaderView.Stretch)
+        header.setSectionResizeMode(COL_SIZE, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_APP, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_GAME, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_STATUS, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_ETA, QHeaderView.Fixed)
+        header.setSectionResizeMode(COL_ACTION, QHeaderView.Fixed)
+
+        self.list_view.setColumnWidth(COL_NO, 50)
+        self.list_view.setColumnWidth(COL_THUMB, THUMB_SIZE + 24)
+        self.list_view.setColumnWidth(COL_ID, 125)
+        self.list_view.setColumnWidth(COL_SIZE, 100)
+        self.list_view.setColumnWidth(COL_APP, 100)
+        self.list_view.setColumnWidth(COL_GAME, 160)
+        self.list_view.setColumnWidth(COL_STATUS, 100)
+        self.list_view.setColumnWidth(COL_ETA, 80)
+        self.list_view.setColumnWidth(COL_ACTION, RowActionDelegate.width())
 
         content_layout.addWidget(title)
         content_layout.addLayout(controls_layout)
-        content_layout.addWidget(self.list_widget)
+        content_layout.addLayout(filter_layout)
+        content_layout.addWidget(self.list_view)
+
+        footer_layout = QHBoxLayout()
+        self.usage_label = QLabel("", self.content_widget)
+        self.usage_label.setObjectName("ListUsageLabel")
+        footer_layout.addWidget(self.usage_label, 1)
+
+        self.eta_label = QLabel("", self.content_widget)
+        self.eta_label.setObjectName("ListEtaLabel")
+        footer_layout.addWidget(self.eta_label)
+
+        self.message_label = QLabel("", self.content_widget)
+        self.message_label.setObjectName("ListMessageLabel")
+        footer_layout.addWidget(self.message_label)
+        content_layout.addLayout(footer_layout)
 
         layout.addWidget(self.content_widget)
         self.add_button.clicked.connect(self.add_workshop)
+        self.workshop_input.returnPressed.connect(self.add_workshop)
+        self.workshop_input.textChanged.connect(self._handle_input_changed)
         self.download_button.clicked.connect(self.start_download_queue)
+        self.verify_button.clicked.connect(self.start_verify_completed)
+        self.dedupe_button.clicked.connect(lambda: self._queue_dedupe(None))
+        self.pause_button.clicked.connect(lambda: self.set_paused(not self._paused))
+        self.import_button.clicked.connect(lambda: self.import_queue())
+        self.export_button.clicked.connect(lambda: self.export_queue())
 
         self._blur_effect = QGraphicsBlurEffect(self.content_widget)
         self._blur_effect.setBlurRadius(15)
@@ -190,86 +731,248 @@ class ListTab(QWidget):
         overlay_layout.addWidget(lock_label)
         depot_exe_path = self._get_depot_exe_path()
         self._set_locked(not os.path.exists(depot_exe_path))
+        self._update_usage_label()
+        self._update_facet_counts()
 
     def add_workshop(self):
-        workshop_id = self.workshop_input.text().strip()
-        if not workshop_id:
+        text = self.workshop_input.text().strip()
+        if not text:
             return
 
         if self.lock_overlay.isVisible():
             return
 
-        # default value fbefore metadata fetched
-        name_text = "Loading..."
-        size_text = "Loading..."
+        workshop_id = parse_workshop_id(text) or text
+        key = self.model.add(workshop_id)
 
-        row_number = self.list_widget.rowCount() + 1
-        row = self.list_widget.rowCount()
-        self.list_widget.insertRow(row)
+        if workshop_id == self._prefetch_id and self._prefetch_result is not None:
+            # Looked up while typing: the row is Ready right away.
+            self._handle_metadata_success(key, *self._prefetch_result)
+        elif workshop_id == self._prefetch_id and self._prefetch_generation in self._prefetches:
+            self._prefetch_adopted[self._prefetch_generation] = key
+        else:
+            self._start_metadata_fetch(workshop_id, key)
 
-        no_item = QTableWidgetItem(str(row_number))
-        no_item.setFlags(no_item.flags() & ~Qt.ItemIsEditable)
-        self.list_widget.setItem(row, 0, no_item)
+        self.workshop_input.clear()
 
-        id_item = QTableWidgetItem(workshop_id)
-        self.list_widget.setItem(row, 1, id_item)
+    # ==== Prefetch ===========================================================
+
+    def _handle_input_changed(self, text: str) -> None:
+        if parse_workshop_id(text) != self._prefetch_id:
+            self._drop_prefetch()
+        self._prefetch_timer.start()
+
+    def _drop_prefetch(self) -> None:
+        self._prefetch_generation += 1
+        self._prefetch_id = None
+        self._prefetch_result = None
+
+    def _start_prefetch(self) -> None:
+        workshop_id = parse_workshop_id(self.workshop_input.text())
+        if (
+            workshop_id is None
+            or len(workshop_id) < MIN_ID_DIGITS
+            or workshop_id == self._prefetch_id
+            or self.lock_overlay.isVisible()
+            or self.model.find(workshop_id) is not None
+        ):
+            return
 
-        name_item = QTableWidgetItem(name_text)
-        self.list_widget.setItem(row, 2, name_item)
+        self._drop_prefetch()
+        self._prefetch_id = workshop_id
+        generation = self._prefetch_generation
 
-        size_item = QTableWidgetItem(size_text)
-        self.list_widget.setItem(row, 3, size_item)
-        
-        app_item = QTableWidgetItem("Loading...")
-        self.list_widget.setItem(row, 4, app_item)
+        thread = QThread(self)
+        worker = _MetadataFetchWorker(generation, workshop_id)
+        worker.moveToThread(thread)
+        self._prefetches[generation] = (thread, worker)
+        thread.started.connect(worker.run)
+
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+
+        thread.finished.connect(thread.deleteLater)
+        worker.finished.connect(worker.deleteLater)
+        worker.failed.connect(worker.deleteLater)
 
-        status_item = QTableWidgetItem("Loading...")
-        self.list_widget.setItem(row, 5, status_item)
+        worker.finished.connect(self._handle_prefetch_success)
+        worker.failed.connect(self._handle_prefetch_error)
 
-        no_item.setTextAlignment(Qt.AlignCenter)
-        id_item.setTextAlignment(Qt.AlignCenter)
-        name_item.setTextAlignment(Qt.AlignCenter)
-        status_item.setTextAlignment(Qt.AlignCenter)
-        size_item.setTextAlignment(Qt.AlignCenter)
-        app_item.setTextAlignment(Qt.AlignCenter)
+        thread.start()
 
-        delete_button = PushButton(FluentIcon.DELETE, "Delete", self.list_widget)
-        delete_button.setToolTip("Hapus baris ini")
-        self.list_widget.setCellWidget(row, 6, delete_button)
+    def _handle_prefetch_success(self, generation: int, name: str, size: str, app_id: str, details: dict) -> None:
+        self._prefetches.pop(generation, None)
+        key = self._prefetch_adopted.pop(generation, None)
+        if key is not None:
+            self._handle_metadata_success(key, name, size, app_id, details)
+        elif generation == self._prefetch_generation:
+            self._prefetch_result = (name, size, app_id, details)
+
+    def _handle_prefetch_error(self, generation: int, error_message: str) -> None:
+        self._prefetches.pop(generation, None)
+        key = self._prefetch_adopted.pop(generation, None)
+        if key is not None:
+            self._handle_metadata_error(key, error_message)
+        elif generation == self._prefetch_generation:
+            # Nothing to reuse; Add fetches again and reports the error.
+            self._prefetch_id = None
+
+    def add_workshop_ids(self, ids: list[str]) -> int:
+        """Add several IDs with one insert, skipping ones already queued."""
 
-        delete_button.clicked.connect(self.handle_delete_clicked)
-        self.workshop_input.clear()
-        self._start_metadata_fetch(workshop_id, row)
+        if self.lock_overlay.isVisible():
+            return 0
+
+        existing = {item.workshop_id for item in self.model.items()}
+        new_ids = []
+        for workshop_id in ids:
+            workshop_id = workshop_id.strip()
+            if workshop_id.isdigit() and workshop_id not in existing:
+                existing.add(workshop_id)
+                new_ids.append(workshop_id)
+
+        keys = self.model.add_many([{"workshop_id": workshop_id} for workshop_id in new_ids])
+        for workshop_id, key in zip(new_ids, keys):
+            self._start_metadata_fetch(workshop_id, key)
+        return len(keys)
+
+    def handle_row_action(self, key: int, action: str) -> None:
+        if action == "delete":
+            self.remove_item(key)
+        elif action == "retry":
+            self.retry_item(key)
+        elif action == "open":
+            self.open_item_folder(key)
+        elif action == "top":
+            self.move_item_to_top(key)
+        elif action == "cancel":
+            self.cancel_item(key)
+        elif action == "log":
+            self.view_item_log(key)
+
+    def _handle_view_entered(self, index) -> None:
+        if index.column() != COL_ACTION:
+            self.action_delegate.clear_hover()
+            self.list_view.viewport().update()
+
+    def _apply_filter_text(self) -> None:
+        self._filter_timer.stop()
+        self.proxy.set_filter_text(self.filter_input.text())
+
+    def _set_facet(self, facet: str | None) -> None:
+        for name, button in self.facet_buttons.items():
+            button.setChecked(name == facet)
+        self.proxy.set_facet(facet)
+
+    def _update_facet_counts(self) -> None:
+        counts = self.model.facet_counts()
+        self.facet_buttons[None].setText(f"All ({self.model.rowCount()})")
+        for facet, total in counts.items():
+            self.facet_buttons[facet].setText(f"{facet} ({total})")
+
+    def remove_item(self, key: int):
+        if self.model.item(key) is None:
+            return
+
+        if key in self._download_queue:
+            self._download_queue.remove(key)
+        if key == self.current_download_key():
+            self._current_download[1].stop("cancel")
+        self._job_logs.pop(key, None)
+        self.model.remove(key)
 
-    def handle_delete_clicked(self):
-        button = self.sender()
-        if not button:
+    def retry_item(self, key: int) -> None:
+        """Fetch metadata again, or queue the download again after an error."""
+
+        item = self.model.item(key)
+        if item is None or item.status != "Error":
             return
 
-        for row in range(self.list_widget.rowCount()):
-            if self.list_widget.cellWidget(row, 6) is button:
-                self.remove_row(row)
-                break
+        if item.app_id in ("", "None", "Loading..."):
+            self.model.update(key, status="Loading...", status_tip="")
+            self._start_metadata_fetch(item.workshop_id, key)
+            return
+
+        self.model.update(key, status="Queue", status_tip="")
+        self._download_queue.append(key)
+        tracing.begin_async("queue.wait", str(key), "scheduler")
+        self._start_next_download()
+
+    def open_item_folder(self, key: int) -> None:
+        item = self.model.item(key)
+        folder = Path(item.folder) if item is not None and item.folder else None
+        if folder is None or not folder.is_dir():
+            folder = depot_downloader.get_depots_dir()
+            folder.mkdir(parents=True, exist_ok=True)
+
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(folder)))
 
-    def remove_row(self, row: int):
-        if row < 0 or row >= self.list_widget.rowCount():
+    def view_item_log(self, key: int) -> None:
+        item = self.model.item(key)
+        if item is None:
             return
+        viewer = LogViewer(item.workshop_id, self._job_logs.get(key), self)
+        viewer.setAttribute(Qt.WA_DeleteOnClose)
+        viewer.show()
 
-        self.list_widget.removeRow(row)
-        self.renumber_rows()
+    def move_item_to_top(self, key: int) -> None:
+        """Move a row to the top of the table and the front of the queue."""
 
-    def renumber_rows(self):
-        for i in range(self.list_widget.rowCount()):
-            item = self.list_widget.item(i, 0)
-            if item is not None:
-                item.setText(str(i + 1))
+        self.model.move_to_top(key)
+        if key not in self._download_queue:
+            return
+
+        self._download_queue.remove(key)
+        self._download_queue.insert(0, key)
+
+        # Optionally suspend the running download for this one; it is
+        # resumed right after, continuing from the chunks it already has.
+        running = self.current_download_key()
+        if running is not None and running != key and Config().get("preempt_downloads", False):
+            tracing.instant("scheduler.preempt", "scheduler", key=running, by=key)
+            self._current_download[1].stop("preempt")
+
+    def move_item(self, key: int, row: int) -> None:
+        """Move a row to ``row`` of the table.
+
+        A queued row takes the matching place in the download queue: ahead
+        of the queued rows now below it.
+        """
+
+        self.model.move(key, row)
+        if key not in self._download_queue:
+            return
+
+        self._download_queue.remove(key)
+        row = self.model.row_of(key)
+        position = next(
+            (i for i, queued in enumerate(self._download_queue) if self.model.row_of(queued) > row),
+            len(self._download_queue),
+        )
+        self._download_queue.insert(position, key)
+
+    def cancel_item(self, key: int) -> None:
+        """Stop a running download or take a row out of the queue."""
+
+        if key == self.current_download_key():
+            self._current_download[1].stop("cancel")
+            return
+
+        if key in self._download_queue:
+            self._download_queue.remove(key)
+            tracing.end_async("queue.wait", str(key), "scheduler", cancelled=True)
+            self.model.update(key, status="Ready", status_tip="Cancelled")
 
     # ==== Metadata Request ==================================================
-    def _start_metadata_fetch(self, workshop_id: str, row: int) -> None:
+    def _start_metadata_fetch(self, workshop_id: str, key: int) -> None:
+        if len(self._active_fetches) >= MAX_ACTIVE_FETCHES:
+            self._fetch_backlog.append((workshop_id, key))
+            return
+
         thread = QThread(self)
-        worker = _MetadataFetchWorker(workshop_id)
+        worker = _MetadataFetchWorker(key, workshop_id)
         worker.moveToThread(thread)
-        self._active_fetches[row] = (thread, worker)
+        self._active_fetches[key] = (thread, worker)
         thread.started.connect(worker.run)
 
         worker.finished.connect(thread.quit)
@@ -279,16 +982,185 @@ class ListTab(QWidget):
         worker.finished.connect(worker.deleteLater)
         worker.failed.connect(worker.deleteLater)
 
-        worker.finished.connect(
-            lambda name, size, app_id, wid=workshop_id, r=row: self._handle_metadata_success(
-                r, wid, name, size, app_id
+        worker.finished.connect(self._handle_metadata_success)
+        worker.failed.connect(self._handle_metadata_error)
+
+        thread.start()
+
+    def _start_next_fetch(self) -> None:
+        while self._fetch_backlog and len(self._active_fetches) < MAX_ACTIVE_FETCHES:
+            workshop_id, key = self._fetch_backlog.popleft()
+            if self.model.item(key) is not None:
+                self._start_metadata_fetch(workshop_id, key)
+
+    # ==== Import / export ====================================================
+
+    def export_queue(self, path: str | None = None) -> None:
+        """Write every row, in table order, to a .jsonl or .csv file."""
+
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Export queue",
+                "queue.jsonl",
+                "JSON lines (*.jsonl);;CSV (*.csv)",
             )
-        )
-        worker.failed.connect(
-            lambda error, wid=workshop_id, r=row: self._handle_metadata_error(r, wid, error)
+            if not path:
+                return
+            if not Path(path).suffix:
+                path += ".jsonl"
+
+        records = (
+            QueueRecord(
+                workshop_id=item.workshop_id,
+                name=item.name if item.fetched_at else "",
+                size_bytes=item.size_bytes,
+                app_id=item.app_id if item.fetched_at else "",
+                app_name=item.app_name,
+                status=item.status,
+                priority=row,
+                fetched_at=item.fetched_at,
+            )
+            for row, item in enumerate(self.model.items())
         )
 
-        thread.start()
+        try:
+            count = write_records(path, records)
+        except (OSError, ValueError) as e:
+            self.message_label.setText(f"Export failed: {e}")
+            return
+        self.message_label.setText(f"Exported {count} rows to {Path(path).name}")
+
+    def import_queue(self, path: str | None = None) -> None:
+        """Append the rows of a queue file, a chunk per event-loop turn.
+
+        Rows whose metadata is recent enough are added as Ready right away;
+        the others are fetched again like a manually added ID. Imported
+        rows are ordered by their ``priority``, keeping file order among
+        equal ones, after the rows already in the table.
+        """
+
+        if self.lock_overlay.isVisible() or self._import_records is not None:
+            return
+
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(
+                self,
+                "Import queue",
+                "",
+                "Queue files (*.jsonl *.ndjson *.csv)",
+            )
+            if not path:
+                return
+
+        try:
+            records = iter_records(path)
+            # Opens the file, so errors surface here rather than mid-import.
+            first = next(records, None)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            self.message_label.setText(f"Import failed: {e}")
+            return
+
+        if first is None:
+            self.message_label.setText("Nothing to import")
+            return
+
+        self._import_records = chain([first], records)
+        self._import_seen = {item.workshop_id for item in self.model.items()}
+        self._import_counts = [0, 0]
+        self._import_priorities = []
+        self._import_keys = []
+        self.import_button.setEnabled(False)
+        self._import_timer.start()
+
+    def _import_next_chunk(self) -> None:
+        now = time.time()
+        entries: list[tuple[int, dict, bool]] = []  # priority, row, needs metadata
+        done = False
+
+        try:
+            for _ in range(IMPORT_CHUNK_SIZE):
+                record = next(self._import_records, None)
+                if record is None:
+                    done = True
+                    break
+
+                if record.workshop_id in self._import_seen:
+                    self._import_counts[1] += 1
+                    continue
+                self._import_seen.add(record.workshop_id)
+
+                if record.has_metadata and not record.is_stale(now):
+                    status = record.status if record.status in ("Complete", "Error") else "Ready"
+                    entries.append((record.priority, {
+                        "workshop_id": record.workshop_id,
+                        "name": record.name,
+                        "size_bytes": record.size_bytes,
+                        "app_id": record.app_id,
+                        "app_name": record.app_name or self._app_names.lookup(record.app_id),
+                        "status": status,
+                        "fetched_at": record.fetched_at,
+                    }, False))
+                else:
+                    entries.append((record.priority, {"workshop_id": record.workshop_id}, True))
+        except (OSError, UnicodeDecodeError) as e:
+            self.message_label.setText(f"Import stopped: {e}")
+            done = True
+
+        self._insert_imported(entries)
+
+        added, skipped = self._import_counts
+        if not done:
+            self.message_label.setText(f"Importing... {added} rows")
+            return
+
+        self._import_timer.stop()
+        self._import_records = None
+        self._import_seen = set()
+        self._import_priorities = []
+        self._import_keys = []
+        self.import_button.setEnabled(True)
+        self._update_usage_label()
+        text = f"Imported {added} rows"
+        if skipped:
+            text += f" ({skipped} already in the queue)"
+        self.message_label.setText(text)
+
+    def _insert_imported(self, entries: list[tuple[int, dict, bool]]) -> None:
+        """Add a chunk of imported rows in priority order.
+
+        A file exported by :meth:`export_queue` is already in order, so the
+        whole chunk is appended at once; otherwise each run of rows goes
+        in front of the first row imported earlier with a higher priority.
+        """
+
+        entries.sort(key=lambda entry: entry[0])  # stable: file order among equals
+        groups: list[tuple[int, list]] = []  # position in _import_keys, entries
+        for entry in entries:
+            position = bisect_right(self._import_priorities, entry[0])
+            if groups and groups[-1][0] == position:
+                groups[-1][1].append(entry)
+            else:
+                groups.append((position, [entry]))
+
+        # From the back, so the positions of earlier groups stay valid.
+        fetch: list[tuple[str, int]] = []
+        for position, group in reversed(groups):
+            row = None
+            if position < len(self._import_keys):
+                row = self.model.row_of(self._import_keys[position])
+            keys = self.model.add_many([fields for _, fields, _ in group], row)
+            self._import_priorities[position:position] = [priority for priority, _, _ in group]
+            self._import_keys[position:position] = keys
+            fetch[:0] = [
+                (fields["workshop_id"], key)
+                for (_, fields, needs_metadata), key in zip(group, keys)
+                if needs_metadata
+            ]
+            self._import_counts[0] += len(keys)
+
+        for workshop_id, key in fetch:
+            self._start_metadata_fetch(workshop_id, key)
 
     # ==== Download Queue =====================================================
 
@@ -298,58 +1170,165 @@ class ListTab(QWidget):
         if self.lock_overlay.isVisible():
             return
 
+        self._paused = False
+        self._update_pause_button()
+
         # If already downloading, do nothing
         if self._current_download is not None:
             return
 
         self._download_queue.clear()
 
-        for row in range(self.list_widget.rowCount()):
-            status_item = self.list_widget.item(row, 5)
-            if status_item is None:
-                continue
-
-            status_text = status_item.text()
-            if status_text in ("Ready", "Error", "Queue"):
-                self._download_queue.append(row)
-                status_item.setText("Queue")
+        for item in self.model.items():
+            if item.status in ("Ready", "Error", "Queue", "Held", "Paused"):
+                self._download_queue.append(item.key)
+                self.model.update(item.key, status="Queue")
+                tracing.begin_async("queue.wait", str(item.key), "scheduler")
 
         if not self._download_queue:
             return
 
         self._start_next_download()
 
-    def _start_next_download(self) -> None:
-        if not self._download_queue:
-            self._current_download = None
-            return
+    @property
+    def paused(self) -> bool:
+        return self._paused
 
-        row = self._download_queue.pop(0)
-        if row < 0 or row >= self.list_widget.rowCount():
-            self._start_next_download()
-            return
+    def current_download_key(self) -> int | None:
+        if self._current_download is None:
+            return None
+        return self._current_download[1].key
 
-        app_item = self.list_widget.item(row, 4)
-        id_item = self.list_widget.item(row, 1)
-        status_item = self.list_widget.item(row, 5)
+    def set_paused(self, paused: bool) -> None:
+        """Pause or resume the download queue.
 
-        if not (app_item and id_item and status_item):
+        Pausing also stops the running download; it goes back to the front
+        of the queue and resumes from its downloaded chunks later.
+        """
+
+        self._paused = paused
+        self._update_pause_button()
+
+        if paused:
+            if self._current_download is not None:
+                self._current_download[1].stop("pause")
+        else:
             self._start_next_download()
+
+    def _update_pause_button(self) -> None:
+        self.pause_button.setText("Resume" if self._paused else "Pause")
+        self.pause_button.setIcon(FluentIcon.PLAY if self._paused else FluentIcon.PAUSE)
+
+    def _start_next_download(self) -> None:
+        """Start the first queued row whose size fits on the depots volume.
+
+        Rows that do not fit stay in the queue as "Held" and are checked
+        again whenever a running download finishes and frees its reservation,
+        or every ``HELD_RECHECK_MS`` while nothing runs, so space freed
+        outside the app is picked up. Behind a held row, the fitting row
+        with the shortest predicted download goes first, so the held one is
+        looked at again soonest.
+        """
+
+        self._held_timer.stop()
+        if self._current_download is not None or self._paused:
             return
 
-        app_id = (app_item.text() or "").strip()
-        workshop_id = (id_item.text() or "").strip()
-        workshop_name = (self.list_widget.item(row, 2).text() or "").strip()
+        held = False
+        backfill: list[int] = []
+        for key in list(self._download_queue):
+            item = self.model.item(key)
+            if item is None:
+                self._download_queue.remove(key)
+                continue
+
+            if not self._admission.fits(item.size_bytes):
+                tracing.instant("scheduler.hold", "scheduler", key=key, size=item.size_bytes)
+                self.model.update(key, status="Held")
+                held = True
+                continue
+
+            if held:
+                backfill.append(key)
+                continue
+
+            if self._admit(key):
+                break
+        else:
+            backfill.sort(key=self._predict_seconds)
+            for key in backfill:
+                if self._admit(key):
+                    break
+
+        if held and self._current_download is None:
+            self._held_timer.start()
+        self._update_usage_label()
+
+    def _admit(self, key: int) -> bool:
+        item = self.model.item(key)
+        tracing.instant("scheduler.admit", "scheduler", key=key, size=item.size_bytes)
+        self._download_queue.remove(key)
+        return self._launch_download(key)
+
+    def _predict_seconds(self, key: int) -> float:
+        item = self.model.item(key)
+        return self._eta.predict(item.app_id, item.size_bytes) if item is not None else 0.0
+
+    def _launch_download(self, key: int) -> bool:
+        item = self.model.item(key)
+        if item is None:
+            return False
+
+        app_id = (item.app_id or "").strip()
+        workshop_id = (item.workshop_id or "").strip()
+        workshop_name = (item.name or "").strip()
 
         if not app_id or app_id == "None" or not workshop_id:
-            status_item.setText("Error")
-            self._start_next_download()
-            return
+            self.model.update(key, status="Error")
+            return False
+
+        if not self._admission.reserve(key, item.size_bytes):
+            self.model.update(key, status="Held")
+            self._download_queue.insert(0, key)
+            return False
+
+        validate = key in self._validate_keys
+        downloader = WorkshopDownloader()
+        job = WorkshopJob(
+            app_id=app_id,
+            app_name=workshop_name,
+            pubfile_id=workshop_id,
+            game_name=item.app_name,
+        )
+
+        folder = downloader.exe_dir / downloader.target_dir(job)
+        self.model.update(
+            key,
+            status="Process",
+            status_tip="",
+            progress=0.0,
+            folder=str(folder),
+        )
+        self._writing_folders[key] = _top_folder(folder)
+        tracing.end_async("queue.wait", str(key), "scheduler", workshop_id=workshop_id)
 
-        status_item.setText("Process")
+        log = JobLog(workshop_id)
+        self._job_logs[key] = log
+        self._job_logs.move_to_end(key)
+        while len(self._job_logs) > KEPT_JOB_LOGS:
+            self._job_logs.popitem(last=False)
 
         thread = QThread(self)
-        worker = _DownloadWorker(app_id, workshop_name, workshop_id)
+        worker = _DownloadWorker(
+            key,
+            app_id,
+            workshop_name,
+            workshop_id,
+            validate,
+            item.app_name,
+            DirectFile.from_details(self._details.get(workshop_id)),
+            log,
+        )
         worker.moveToThread(thread)
 
         self._current_download = (thread, worker)
@@ -359,33 +1338,239 @@ class ListTab(QWidget):
         thread.finished.connect(thread.deleteLater)
         worker.finished.connect(worker.deleteLater)
 
-        worker.finished.connect(
-            lambda success, error, r=row: self._handle_download_finished(
-                r, success, error
-            )
-        )
+        # Bound slot (not a lambda) so the handler runs on the GUI thread.
+        worker.finished.connect(self._handle_download_finished)
+        worker.progress.connect(self._handle_download_progress)
+        worker.stopped.connect(thread.quit)
+        worker.stopped.connect(worker.deleteLater)
+        worker.stopped.connect(self._handle_download_stopped)
+        worker.note.connect(self._handle_download_note)
+        worker.usage.connect(self._handle_download_usage)
 
         thread.start()
-
-    def _handle_download_finished(self, row: int, success: bool, error_message: str) -> None:
+        self._run_timing[key] = [time.monotonic(), 0.0]
+        self._running_eta_timer.start()
+        self._update_running_eta()
+        return True
+
+    def _handle_download_progress(self, key: int, percent: float) -> None:
+        timing = self._run_timing.get(key)
+        if timing is not None and not timing[1]:
+            timing[1] = time.monotonic()
+        self.model.update(key, progress=percent)
+        self._update_running_eta()
+
+    def _handle_download_note(self, key: int, text: str) -> None:
+        item = self.model.item(key)
+        if item is not None:
+            self.model.update(key, status_tip=text, history=item.history + ((time.time(), text),))
+
+    def _handle_download_usage(self, key: int, text: str) -> None:
+        if self.model.item(key) is not None:
+            self.model.update(key, usage=text)
+
+    def _handle_download_stopped(self, key: int, reason: str) -> None:
         self._current_download = None
+        self._writing_folders.pop(key, None)
+        self._admission.release(key)
+        self._run_timing.pop(key, None)
+        self._eta_skip.add(key)
+
+        if self.model.item(key) is not None:
+            if reason == "cancel":
+                self.model.update(key, status="Ready", status_tip="Cancelled")
+            else:
+                # Paused or preempted: back into the queue, behind the
+                # item that preempted it.
+                position = 1 if reason == "preempt" and self._download_queue else 0
+                self._download_queue.insert(position, key)
+                tracing.begin_async("queue.wait", str(key), "scheduler")
+                tip = "Paused" if reason == "pause" else "Suspended for a higher-priority item"
+                self.model.update(key, status="Paused", status_tip=tip)
 
-        if row < 0 or row >= self.list_widget.rowCount():
-            self._start_next_download()
-            return
+        self._start_next_download()
 
-        status_item = self.list_widget.item(row, 5)
-        if status_item is None:
+    def _handle_download_finished(self, key: int, success: bool, error_message: str) -> None:
+        self._current_download = None
+        self._writing_folders.pop(key, None)
+        self._admission.release(key)
+        timing = self._run_timing.pop(key, None)
+        resumed = key in self._eta_skip
+        self._eta_skip.discard(key)
+
+        item = self.model.item(key)
+        if item is None:
             self._start_next_download()
             return
 
-        if success:
-            status_item.setText("Complete")
+        if success and timing is not None and not resumed:
+            now = time.monotonic()
+            started, first_progress = timing
+            self._eta.record(
+                item.workshop_id,
+                item.app_id,
+                item.size_bytes,
+                now - started,
+                (first_progress or now) - started,
+            )
+
+        if not success:
+            self.model.update(key, status="Error", status_tip=error_message)
+        elif Config().get("verify_downloads", True):
+            self.model.update(key, status="Verifying")
+            self._queue_verify(key, record=True)
         else:
-            status_item.setText("Error")
+            self.model.update(key, status="Complete")
+            self._run_post_processing(key)
 
         self._start_next_download()
 
+    # ==== Verification =======================================================
+
+    def start_verify_completed(self) -> None:
+        """Re-verify every completed row against its recorded hashes."""
+
+        for item in self.model.items():
+            if item.status == "Complete":
+                self._validate_keys.discard(item.key)
+                self.model.update(item.key, status="Verifying")
+                self._queue_verify(item.key, record=False)
+
+    def _queue_verify(self, key: int, record: bool) -> None:
+        self._verify_queue.append((key, record))
+        if self._current_verify is None:
+            self._start_next_verify()
+
+    def _start_next_verify(self) -> None:
+        self._current_verify = None
+
+        while self._verify_queue:
+            key, record = self._verify_queue.pop(0)
+            item = self.model.item(key)
+            if item is None or not item.folder:
+                continue
+
+            thread = QThread(self)
+            worker = _VerifyWorker(key, item.workshop_id, item.folder, record)
+            worker.moveToThread(thread)
+
+            self._current_verify = (thread, worker)
+
+            thread.started.connect(worker.run)
+            worker.finished.connect(thread.quit)
+            thread.finished.connect(thread.deleteLater)
+            worker.finished.connect(worker.deleteLater)
+
+            worker.finished.connect(self._handle_verify_finished)
+
+            thread.start()
+            return
+
+    def _handle_verify_finished(self, key: int, ok: bool, message: str) -> None:
+        if self.model.item(key) is not None:
+            if ok:
+                self._validate_keys.discard(key)
+                self.model.update(key, status="Complete", status_tip=message)
+                self._run_post_processing(key)
+            elif key not in self._validate_keys and Config().get("verify_validate_retry", True):
+                # Re-download just this item once, letting
+                # DepotDownloaderMod re-check every chunk it has.
+                self._validate_keys.add(key)
+                self.model.update(key, status="Queue", status_tip=message)
+                self._download_queue.append(key)
+                tracing.begin_async("queue.wait", str(key), "scheduler")
+                self._start_next_download()
+            else:
+                self.model.update(key, status="Error", status_tip=message)
+
+        self._start_next_verify()
+
+    # ==== Post-processing ====================================================
+
+    def _run_post_processing(self, key: int) -> None:
+        """Optional stages for a row that just became Complete."""
+
+        item = self.model.item(key)
+        if item is not None and item.folder:
+            self.completed.emit(item.workshop_id, item.folder)
+
+        self._queue_archive(key)
+
+        if Config().get("dedupe_completed", False):
+            item = self.model.item(key)
+            if item is not None and item.folder:
+                self._queue_dedupe([_top_folder(Path(item.folder))])
+
+    def _queue_dedupe(self, folders: list[str] | None) -> None:
+        """Queue a dedupe pass; ``None`` rescans the whole depots folder."""
+
+        self._dedupe_queue.append(folders)
+        if self._current_dedupe is None:
+            self._start_next_dedupe()
+
+    def _start_next_dedupe(self) -> None:
+        self._current_dedupe = None
+        if not self._dedupe_queue:
+            self.dedupe_button.setEnabled(True)
+            return
+
+        folders = self._dedupe_queue.pop(0)
+        self.dedupe_button.setEnabled(False)
+
+        thread = QThread(self)
+        # A snapshot copy, safe to take from the worker thread.
+        worker = _DedupeWorker(folders, Config().get("dedupe_mode", "auto"),
+                               lambda: set(self._writing_folders.values()))
+        worker.moveToThread(thread)
+
+        self._current_dedupe = (thread, worker)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        worker.finished.connect(worker.deleteLater)
+        worker.finished.connect(self._handle_dedupe_finished)
+
+        thread.start()
+
+    def _handle_dedupe_finished(self, ok: bool, message: str) -> None:
+        self.dedupe_button.setToolTip(message)
+        self._start_next_dedupe()
+
+    # ==== Archive ============================================================
+
+    def _queue_archive(self, key: int) -> None:
+        """Pack a completed row's folder in the background if enabled."""
+
+        if not Config().get("archive_completed", False):
+            return
+
+        item = self.model.item(key)
+        if item is None or not item.folder:
+            return
+
+        if self._archive_stage is None:
+            self._archive_stage = ArchiveStage(
+                max_workers=Config().get("archive_workers", 2),
+                fmt=Config().get("archive_format", "zip"),
+            )
+
+        future = self._archive_stage.submit(item.workshop_id, Path(item.folder))
+
+        def _done(f, k=key) -> None:
+            # Runs on a pool thread; the signal hops back to the GUI thread.
+            try:
+                target = f.result()
+                self._archive_finished.emit(k, True, str(target) if target else "unchanged")
+            except Exception as e:  # noqa: BLE001
+                self._archive_finished.emit(k, False, str(e))
+
+        future.add_done_callback(_done)
+
+    def _handle_archive_finished(self, key: int, ok: bool, message: str) -> None:
+        prefix = "Archive" if ok else "Archive failed"
+        self.model.update(key, status_tip=f"{prefix}: {message}")
+
     def _set_locked(self, locked: bool) -> None:
         if locked:
             self.content_widget.setGraphicsEffect(self._blur_effect)
@@ -402,6 +1587,106 @@ class ListTab(QWidget):
             self.download_button.setEnabled(True)
             self.lock_overlay.hide()
 
+    # ==== Thumbnails =========================================================
+
+    def _preview_url(self, workshop_id: str) -> str | None:
+        """Preview URL of an item, "" if it has none, None if unknown yet."""
+
+        details = self._details.get(workshop_id)
+        if details is None:
+            return None
+        return str(details.get("preview_url") or "")
+
+    def _visible_keys(self) -> set[int]:
+        """Keys of the rows currently inside the viewport."""
+
+        view = self.list_view
+        top = view.rowAt(0)
+        if top < 0:
+            return set()
+        bottom = view.rowAt(view.viewport().height() - 1)
+        if bottom < 0:
+            bottom = self.proxy.rowCount() - 1
+        return {self.proxy.index(row, COL_NO).data(Qt.UserRole) for row in range(top, bottom + 1)}
+
+    # ==== ETA ================================================================
+
+    def queue_eta(self) -> float | None:
+        """Predicted seconds until the running and queued downloads are done."""
+
+        if self._current_download is None and not self._download_queue:
+            return None
+        return self._queue_eta_base + self.model.eta_offset
+
+    def _schedule_queue_eta(self) -> None:
+        if not self._queue_eta_timer.isActive():
+            self._queue_eta_timer.start()
+
+    def _update_queue_eta(self) -> None:
+        """Give each waiting row its predicted finish time, counted from
+        the end of the running download."""
+
+        signature = (tuple(self._download_queue), self.current_download_key(), self._eta.version)
+        if signature == self._eta_signature:
+            return
+        self._eta_signature = signature
+
+        total = 0.0
+        for key in self._download_queue:
+            item = self.model.item(key)
+            if item is None:
+                continue
+            total += self._eta.predict(item.app_id, item.size_bytes)
+            # Skip sub-second changes, which would only cause repaints.
+            if abs(item.eta - total) >= 1.0:
+                self.model.update(key, eta=total)
+        self._queue_eta_base = total
+        self._update_eta_label()
+
+    def _update_running_eta(self) -> None:
+        key = self.current_download_key()
+        item = self.model.item(key) if key is not None else None
+        timing = self._run_timing.get(key) if key is not None else None
+
+        if item is None or timing is None:
+            self._running_eta_timer.stop()
+            self.model.eta_offset = 0.0
+        else:
+            now = time.monotonic()
+            started, first_progress = timing
+            remaining = self._eta.remaining(
+                item.app_id,
+                item.size_bytes,
+                item.progress,
+                now - started,
+                now - first_progress if first_progress else 0.0,
+            )
+            self.model.eta_offset = remaining
+            self.model.update(key, eta=remaining)
+
+        # Waiting rows read the offset when painted; no need to touch them.
+        self.list_view.viewport().update()
+        self._update_eta_label()
+
+    def _update_eta_label(self) -> None:
+        eta = self.queue_eta()
+        self.eta_label.setText("" if eta is None else f"Queue ETA: {format_duration(eta)}")
+
+    def _update_usage_label(self) -> None:
+        """Show how much the pending queue will write against free space."""
+
+        pending = sum(
+            item.size_bytes
+            for item in self.model.items()
+            if item.status in ("Ready", "Queue", "Held", "Paused")
+        )
+
+        projected, free = self._admission.projected_usage(pending)
+        text = f"Projected usage: {utils().size(projected)} / {utils().size(free)} free"
+        if projected > self._admission.available_bytes() + self._admission.reserved_bytes():
+            text += " (not enough disk space, some items will be held)"
+        self.usage_label.setText(text)
+
     def _get_depot_exe_path(self) -> str:
         install_dir = depot_downloader.get_install_dir()
         return str(install_dir / depot_downloader.EXE_NAME)
@@ -419,68 +1704,198 @@ class ListTab(QWidget):
 
     def _handle_metadata_success(
         self,
-        row: int,
-        workshop_id: str,
+        key: int,
         name: str,
         size: str,
         app_id: str,
+        details: dict,
     ) -> None:
-        self._active_fetches.pop(row, None)
-        if row < 0 or row >= self.list_widget.rowCount():
+        self._active_fetches.pop(key, None)
+        self._start_next_fetch()
+        item = self.model.item(key)
+        if item is None:
             return
 
-        id_item = self.list_widget.item(row, 1)
-        if id_item is None or id_item.text() != workshop_id:
+        app_name = self._app_names.lookup(app_id) if app_id else ""
+        if app_id and not app_name:
+            self._refresh_app_names()
+        elif not self._app_names_checked and self._app_names.is_stale():
+            self._refresh_app_names()
+        self._app_names_checked = True
+
+        self.model.update(
+            key,
+            name=name or "None",
+            size_bytes=int(details.get("file_size") or 0),
+            app_id=app_id or "None",
+            app_name=app_name,
+            status="Ready",
+            fetched_at=time.time(),
+        )
+        self._details.put(item.workshop_id, details)
+        if not self._details_timer.isActive():
+            self._details_timer.start()
+        self.thumbnails.forget(item.workshop_id)
+
+        if key in self._dependency_waiters:
+            self._dependency_waiters.discard(key)
+            self._queue_dependency(key)
+        if (
+            item.workshop_id not in self._dependencies_resolved
+            and Config().get("resolve_dependencies", False)
+        ):
+            self._dependency_roots[key] = item.workshop_id
+            self._dependency_timer.start()
+
+    # ==== Dependencies =======================================================
+
+    def _start_dependency_resolution(self) -> None:
+        if self._current_resolve is not None or not self._dependency_roots:
             return
 
-        name_item = self.list_widget.item(row, 2)
-        size_item = self.list_widget.item(row, 3)
-        app_item = self.list_widget.item(row, 4)
-        status_item = self.list_widget.item(row, 5)
-
-        if not (name_item and size_item and app_item and status_item):
+        roots, self._dependency_roots = self._dependency_roots, {}
+        roots = {key: workshop_id for key, workshop_id in roots.items() if self.model.item(key) is not None}
+        if not roots:
             return
+        self._dependencies_resolved.update(roots.values())
+        known = {item.workshop_id for item in self.model.items()}
 
-        name_item.setText(name or "None")
-        size_item.setText(size or "0MB")
-        app_item.setText(app_id or "None")
-        status_item.setText("Ready")
+        thread = QThread(self)
+        worker = _DependencyWorker(roots, known)
+        worker.moveToThread(thread)
+        self._current_resolve = (thread, worker)
 
-    def _handle_metadata_error(
-        self,
-        row: int,
-        workshop_id: str,
-        error_message: str,
-    ) -> None:
-        self._active_fetches.pop(row, None)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        worker.finished.connect(worker.deleteLater)
+        worker.failed.connect(worker.deleteLater)
+        worker.finished.connect(self._handle_dependencies_resolved)
+        worker.failed.connect(self._handle_dependencies_failed)
+
+        thread.start()
+
+    def _handle_dependencies_resolved(self, root_keys: list, resolution: Resolution) -> None:
+        self._current_resolve = None
+        self._dependencies_resolved.update(resolution.requires)
+
+        existing = {item.workshop_id for item in self.model.items()}
+        new_ids = [workshop_id for workshop_id in resolution.order if workshop_id not in existing]
+        if new_ids:
+            # One block above the first dependent, already in dependency order.
+            rows = [row for row in map(self.model.row_of, root_keys) if row is not None]
+            waiting = any(
+                key in self._download_queue or key == self.current_download_key()
+                for key in root_keys
+            )
+            keys = self.model.add_many(
+                [
+                    {
+                        "workshop_id": workshop_id,
+                        "status_tip": "Required by " + ", ".join(resolution.required_by(workshop_id)),
+                    }
+                    for workshop_id in new_ids
+                ],
+                min(rows) if rows else None,
+            )
+            for workshop_id, key in zip(new_ids, keys):
+                if waiting:
+                    self._dependency_waiters.add(key)
+                self._start_metadata_fetch(workshop_id, key)
+
+            text = f"Added {len(new_ids)} required items"
+        else:
+            text = ""
 
-        if row < 0 or row >= self.list_widget.rowCount():
+        if resolution.cycles:
+            cycle = " \u2192 ".join(resolution.cycles[0])
+            text = (text + "; " if text else "") + f"dependency cycle: {cycle}"
+        if text:
+            self.message_label.setText(text)
+
+        self._start_dependency_resolution()
+
+    def _handle_dependencies_failed(self, root_keys: list, error_message: str) -> None:
+        self._current_resolve = None
+        # Let a later metadata refresh try these again.
+        for key in root_keys:
+            item = self.model.item(key)
+            if item is not None:
+                self._dependencies_resolved.discard(item.workshop_id)
+        self.message_label.setText(f"Could not resolve required items: {error_message}")
+        self._start_dependency_resolution()
+
+    def _queue_dependency(self, key: int) -> None:
+        """Queue a required item that was added while its dependent was
+        already queued, ahead of the first queued row below it."""
+
+        row = self.model.row_of(key)
+        if row is None:
             return
+        position = len(self._download_queue)
+        for index, queued in enumerate(self._download_queue):
+            queued_row = self.model.row_of(queued)
+            if queued_row is not None and queued_row > row:
+                position = index
+                break
+        self._download_queue.insert(position, key)
+        self.model.update(key, status="Queue")
+        tracing.begin_async("queue.wait", str(key), "scheduler")
+        self._start_next_download()
+
+    # ==== App names ==========================================================
+
+    def _refresh_app_names(self) -> None:
+        """Download the app list in the background, at most once per session."""
 
-        id_item = self.list_widget.item(row, 1)
-        if id_item is None or id_item.text() != workshop_id:
+        if self._app_names_refresh is not None or self._app_names_refreshed:
             return
 
-        name_item = self.list_widget.item(row, 2)
-        size_item = self.list_widget.item(row, 3)
-        app_item = self.list_widget.item(row, 4)
-        status_item = self.list_widget.item(row, 5)
+        thread = QThread(self)
+        worker = _AppNamesRefreshWorker()
+        worker.moveToThread(thread)
+        self._app_names_refresh = (thread, worker)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        worker.finished.connect(worker.deleteLater)
+        worker.finished.connect(self._handle_app_names_refreshed)
+
+        thread.start()
 
-        if not (name_item and size_item and app_item and status_item):
+    def _handle_app_names_refreshed(self, ok: bool, message: str) -> None:
+        self._app_names_refresh = None
+        self._app_names_refreshed = True
+        if not ok:
+            # Names stay empty; the App ID column still identifies the game.
             return
 
-        if name_item.text() == "Loading...":
-            name_item.setText("None")
-        if size_item.text() == "Loading...":
-            size_item.setText("0MB")
-        if app_item.text() == "Loading...":
-            app_item.setText("None")
+        self._app_names.invalidate()
+        for item in self.model.items():
+            if item.app_name or not item.app_id.isdigit():
+                continue
+            app_name = self._app_names.lookup(item.app_id)
+            if app_name:
+                self.model.update(item.key, app_name=app_name)
 
-        status_item.setText("Error")
+    def _handle_metadata_error(
+        self,
+        key: int,
+        error_message: str,
+    ) -> None:
+        self._active_fetches.pop(key, None)
+        self._start_next_fetch()
 
-    def _find_row_by_workshop_id(self, workshop_id: str) -> int | None:
-        for row in range(self.list_widget.rowCount()):
-            item = self.list_widget.item(row, 1)
-            if item is not None and item.text() == workshop_id:
-                return row
-        return None
+        item = self.model.item(key)
+        if item is None:
+            return
+
+        self.model.update(
+            key,
+            name="None" if item.name == "Loading..." else item.name,
+            app_id="None" if item.app_id == "Loading..." else item.app_id,
+            status="Error",
+            status_tip=error_message,
+        )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QTimer, QUrl
+from PySide6.QtGui import QDesktopServices, QFontDatabase
+from PySide6.QtWidgets import QDialog, QHBoxLayout, QLabel, QPlainTextEdit, QVBoxLayout
+from qfluentwidgets import FluentIcon, PushButton
+
+from utils.joblog import RING_LINES, JobLog, log_path, read_tail
+
+REFRESH_INTERVAL_MS = 500
+
+
+class LogViewer(QDialog):
+    """Shows the output of a download job, following it while it runs.
+
+    A live job is read from its in-memory ring buffer; otherwise the tail
+    of the log file is shown. The view holds at most ``RING_LINES`` lines
+    either way.
+    """
+
+    def __init__(self, workshop_id: str, log: JobLog | None, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"Log of {workshop_id}")
+        self.resize(760, 480)
+
+        self._log = log
+        self._count = 0
+        self._path = log.path if log is not None else log_path(workshop_id)
+
+        layout = QVBoxLayout(self)
+
+        self.text = QPlainTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(RING_LINES)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        buttons = QHBoxLayout()
+        self.info_label = QLabel("", self)
+        open_button = PushButton(FluentIcon.DOCUMENT, "Open Log File", self)
+        open_button.clicked.connect(self._open_file)
+        close_button = PushButton("Close", self)
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(self.info_label, 1)
+        buttons.addWidget(open_button)
+        buttons.addWidget(close_button)
+
+        layout.addWidget(self.text, 1)
+        layout.addLayout(buttons)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self._refresh)
+
+        if log is not None:
+            self._refresh()
+            self._timer.start()
+        else:
+            lines = read_tail(self._path)
+            self.text.setPlainText("\n".join(lines) if lines else "No log recorded for this item.")
+            self.info_label.setText(str(self._path))
+
+    def _refresh(self) -> None:
+        lines, self._count = self._log.lines_since(self._count)
+        if lines:
+            at_bottom = self.text.verticalScrollBar().value() == self.text.verticalScrollBar().maximum()
+            self.text.appendPlainText("\n".join(lines))
+            if at_bottom:
+                self.text.verticalScrollBar().setValue(self.text.verticalScrollBar().maximum())
+        self.info_label.setText(f"{self._count} lines, latest {min(self._count, RING_LINES)} shown")
+
+    def _open_file(self) -> None:
+        if self._log is not None:
+            self._log.flush()
+        if self._path.exists():
+            QDesktopServices.openUrl(QUrl.fromLocalFile(str(self._path)))
+
+    def closeEvent(self, event) -> None:  # type: ignore[override]
+        self._timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+from enum import Enum
+
+from qfluentwidgets import (
+    StyleSheetBase,
+    Theme,
+    qconfig,
+    FluentWindow,
+    FluentIcon,
+    NavigationItemPosition,
+)
+
+from tab.HomeTab import HomeTab
+from tab.ListTab import ListTab
+from tab.LibraryTab import LibraryTab
+from tab.SettingsTab import SettingsTab
+from tab.ApiBridge import ApiBridge
+from utils import api
+from utils.config import Config
+
+
+class StyleSheet(StyleSheetBase, Enum):
+    WINDOW = "window"
+    def path(self, theme=Theme.AUTO):
+        theme = qconfig.theme if theme == Theme.AUTO else theme
+        return f"qss/{theme.value.lower()}/{self.value}.qss"
+
+
+class Window(FluentWindow):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.setObjectName("Window")
+        self.setWindowTitle("PyShopDL")
+
+        self.home_tab = HomeTab(self)
+        self.list_tab = ListTab(self)
+        self.library_tab = LibraryTab(self)
+        self.settings_tab = SettingsTab(self)
+
+        self.addSubInterface(
+            self.home_tab,
+            icon=FluentIcon.HOME.icon(Theme.AUTO),
+            text="Home",
+            position=NavigationItemPosition.TOP,
+        )
+        self.addSubInterface(
+            self.list_tab,
+            icon=FluentIcon.LIBRARY.icon(Theme.AUTO),
+            text="Downloader",
+            position=NavigationItemPosition.TOP,
+        )
+        self.addSubInterface(
+            self.library_tab,
+            icon=FluentIcon.FOLDER.icon(Theme.AUTO),
+            text="Library",
+            position=NavigationItemPosition.TOP,
+        )
+        self.addSubInterface(
+            self.settings_tab,
+            icon=FluentIcon.SETTING.icon(Theme.AUTO),
+            text="Settings",
+            position=NavigationItemPosition.BOTTOM,
+        )
+
+        self.list_tab.completed.connect(self.library_tab.record_download)
+
+        StyleSheet.WINDOW.apply(self)
+        qconfig.themeChangedFinished.connect(lambda: StyleSheet.WINDOW.apply(self))
+
+    def handle_forwarded(self, ids: list) -> None:
+        """IDs sent by a second launch; also brings this window forward."""
+        if ids:
+            self.list_tab.add_workshop_ids(ids)
+            self.switchTo(self.list_tab)
+
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+
+def start_api(window: Window, force: bool = False) -> api.ApiServer | None:
+    """Start the local API if enabled; return the running server."""
+    try:
+        config = Config()
+    except Exception:  # noqa: BLE001
+        config = None
+
+    enabled = force or bool(config and config.get("api_enabled", False))
+    if not enabled:
+        return None
+
+    bridge = ApiBridge(window.list_tab, window)
+    server = api.ApiServer(
+        bridge.submit,
+        bridge.snapshot,
+        bridge.hub,
+        token=api.load_token(config.get("api_token") if config else None),
+        port=int(config.get("api_port", api.DEFAULT_PORT)) if config else api.DEFAULT_PORT,
+    )
+    try:
+        server.start()
+    except OSError as e:
+        print(f"Local API not started: {e}", file=sys.stderr)
+        return None
+
+    print(f"Local API listening on {server.url}", file=sys.stderr)
+    return server
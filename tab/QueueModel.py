@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from itertools import count
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    QTimer,
+    Signal,
+)
+
+from utils.eta import format_duration
+from utils.metadata import Metadata
+
+COLUMNS = [
+    "No",
+    "Preview",
+    "Workshop ID",
+    "Workshop Name",
+    "Size",
+    "App ID",
+    "App",
+    "Status",
+    "ETA",
+    "Action",
+]
+COL_NO, COL_THUMB, COL_ID, COL_NAME, COL_SIZE, COL_APP, COL_GAME, COL_STATUS, COL_ETA, COL_ACTION = range(len(COLUMNS))
+
+# ~30 Hz: changes made within one frame are painted together.
+FLUSH_INTERVAL_MS = 33
+
+# Sort order of the Status column.
+STATUS_RANK = {
+    "Loading...": 0,
+    "Ready": 1,
+    "Queue": 2,
+    "Held": 3,
+    "Paused": 4,
+    "Process": 5,
+    "Verifying": 6,
+    "Complete": 7,
+    "Error": 8,
+}
+
+# Quick filters shown above the table and the statuses each one covers.
+FACETS = {
+    "Ready": ("Ready",),
+    "Queue": ("Queue", "Held", "Paused", "Process", "Verifying"),
+    "Error": ("Error",),
+    "Complete": ("Complete",),
+}
+
+# Rows that show an ETA. Waiting rows store their offset behind the
+# running download; the model adds that download's remaining time.
+ETA_STATUSES = ("Queue", "Held", "Paused")
+
+# Latest job history entries shown in the status tooltip.
+HISTORY_TOOLTIP_LINES = 5
+
+# Fields that feed the lowercase search text of an item.
+SEARCH_FIELDS = ("workshop_id", "name", "app_id", "app_name", "status")
+
+# Values repeated across many rows; interned so rows share one string.
+INTERNED_FIELDS = ("app_id", "app_name", "status")
+
+
+def _int_or(text: str, default: int = -1) -> int:
+    return int(text) if text.isdigit() else default
+
+
+# Raw values the view sorts on (bytes, numeric ids, status rank). The
+# "No" column sorts by queue position.
+SORT_KEYS = {
+    COL_ID: lambda i: _int_or(i.workshop_id),
+    COL_NAME: lambda i: i.name.lower(),
+    COL_SIZE: lambda i: i.size_bytes,
+    COL_APP: lambda i: _int_or(i.app_id),
+    COL_GAME: lambda i: i.app_name.lower(),
+    COL_STATUS: lambda i: STATUS_RANK.get(i.status, len(STATUS_RANK)),
+    COL_ETA: lambda i: i.eta,
+}
+
+
+def _intern(fields: dict) -> dict:
+    for name in INTERNED_FIELDS:
+        value = fields.get(name)
+        if type(value) is str:
+            fields[name] = sys.intern(value)
+    return fields
+
+
+@dataclass(slots=True)
+class QueueItem:
+    """One row of the download queue.
+
+    Only what the table shows is kept here; the raw metadata of an item
+    lives in :class:`utils.detailstore.DetailStore`.
+    """
+
+    key: int
+    workshop_id: str
+    name: str = "Loading..."
+    size_bytes: int = 0
+    app_id: str = "Loading..."
+    app_name: str = ""
+    status: str = "Loading..."
+    status_tip: str = ""
+    progress: float = 0.0
+    folder: str = ""
+    fetched_at: float = 0.0
+    history: tuple = ()  # (timestamp, text) pairs
+    usage: str = ""  # CPU/RSS of the download process, live or of the last run
+    eta: float = -1.0  # seconds; see ETA_STATUSES
+    search_text: str = ""
+
+    @property
+    def size_text(self) -> str:
+        if self.status == "Loading...":
+            return "Loading..."
+        return Metadata.format_size(self.size_bytes)
+
+    def reindex(self) -> None:
+        self.search_text = " ".join(getattr(self, name) for name in SEARCH_FIELDS).lower()
+
+
+class QueueModel(QAbstractTableModel):
+    """Table model for the download queue with coalesced repaints.
+
+    Rows are addressed by a stable ``key`` so workers and queues keep
+    pointing at the right item when rows above them are removed.
+    :meth:`update` changes the item right away but only records the row
+    as dirty; a single-shot timer then emits one ``dataChanged`` range per
+    frame for everything that changed in between.
+    """
+
+    flushed = Signal()  # after a batch of updates reached the view
+    changed = Signal(list)  # keys updated in the batch being flushed
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._items: list[QueueItem] = []
+        self._rows: dict[int, int] = {}
+        self._keys = count(1)
+        self._dirty: set[int] = set()
+        # Remaining time of the running download; every waiting row's
+        # ETA is relative to it. Changing it only needs a repaint.
+        self.eta_offset = 0.0
+        # Optional ThumbnailCache for the Preview column.
+        self.thumbnails = None
+        self.status_counts: Counter = Counter()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    # ---- Qt model API ------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = self._items[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == COL_NO:
+                return str(index.row() + 1)
+            if column == COL_ID:
+                return item.workshop_id
+            if column == COL_NAME:
+                return item.name
+            if column == COL_SIZE:
+                return item.size_text
+            if column == COL_APP:
+                return item.app_id
+            if column == COL_GAME:
+                return item.app_name
+            if column == COL_STATUS:
+                if item.status == "Process" and item.progress:
+                    return f"Process {item.progress:.0f}%"
+                return item.status
+            if column == COL_ETA:
+                eta = self.eta_of(item)
+                return "" if eta is None else format_duration(eta)
+            return None
+
+        if role == Qt.DecorationRole and column == COL_THUMB and self.thumbnails is not None:
+            return self.thumbnails.get(item.key, item.workshop_id)
+
+        if role == Qt.TextAlignmentRole and column != COL_ACTION:
+            return int(Qt.AlignCenter)
+
+        if role == Qt.ToolTipRole and column == COL_STATUS:
+            lines = [item.status_tip] if item.status_tip else []
+            if item.usage:
+                lines.append(item.usage)
+            lines += [
+                f"{time.strftime('%H:%M:%S', time.localtime(stamp))}  {text}"
+                for stamp, text in item.history[-HISTORY_TOOLTIP_LINES:]
+            ]
+            return "\n".join(lines) or None
+
+        if role == Qt.UserRole:
+            return item.key
+
+        return None
+
+    # ---- queue API ---------------------------------------------------------
+
+    def add(self, workshop_id: str) -> int:
+        key = next(self._keys)
+        row = len(self._items)
+        item = QueueItem(key=key, workshop_id=workshop_id)
+        item.reindex()
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.append(item)
+        self._rows[key] = row
+        self.endInsertRows()
+
+        self.status_counts[item.status] += 1
+        return key
+
+    def add_many(self, rows: list[dict], row: int | None = None) -> list[int]:
+        """Insert several items with one insert notification.
+
+        Each entry holds :class:`QueueItem` fields other than ``key``.
+        They are appended, or inserted before ``row``.
+        """
+
+        if not rows:
+            return []
+
+        start = len(self._items) if row is None else max(0, min(row, len(self._items)))
+        items = []
+        for fields in rows:
+            item = QueueItem(key=next(self._keys), **_intern(fields))
+            item.reindex()
+            items.append(item)
+
+        self.beginInsertRows(QModelIndex(), start, start + len(items) - 1)
+        self._items[start:start] = items
+        self._reindex(start)
+        self.endInsertRows()
+
+        # "No" of every following row changed.
+        if start + len(items) < len(self._items):
+            self.dataChanged.emit(
+                self.index(start + len(items), COL_NO), self.index(len(self._items) - 1, COL_NO)
+            )
+
+        self.status_counts.update(item.status for item in items)
+        return [item.key for item in items]
+
+    def remove(self, key: int) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            return
+
+        self.status_counts[self._items[row].status] -= 1
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        del self._rows[key]
+        self._dirty.discard(key)
+        self._reindex(row)
+        self.endRemoveRows()
+
+        # "No" of every following row changed.
+        if row < len(self._items):
+            self.dataChanged.emit(
+                self.index(row, COL_NO), self.index(len(self._items) - 1, COL_NO)
+            )
+        self.flushed.emit()
+
+    def move(self, key: int, row: int) -> None:
+        """Move the row of ``key`` so that it ends up at ``row``."""
+
+        old = self._rows.get(key)
+        if old is None:
+            return
+        row = max(0, min(row, len(self._items) - 1))
+        if row == old:
+            return
+
+        # Qt wants the destination as it is before the move.
+        self.beginMoveRows(QModelIndex(), old, old, QModelIndex(), row + 1 if row > old else row)
+        self._items.insert(row, self._items.pop(old))
+        self._reindex(min(old, row))
+        self.endMoveRows()
+
+        # "No" of the rows between the old and new position shifted by one.
+        self.dataChanged.emit(self.index(min(old, row), COL_NO), self.index(max(old, row), COL_NO))
+
+    def move_to_top(self, key: int) -> None:
+        self.move(key, 0)
+
+    def eta_of(self, item: QueueItem) -> float | None:
+        """Seconds until ``item`` is expected to be downloaded, if known."""
+
+        if item.eta < 0:
+            return None
+        if item.status == "Process":
+            return item.eta
+        if item.status in ETA_STATUSES:
+            return item.eta + self.eta_offset
+        return None
+
+    def thumbnail_ready(self, key: int) -> None:
+        row = self._rows.get(key)
+        if row is not None:
+            index = self.index(row, COL_THUMB)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def _reindex(self, start: int = 0) -> None:
+        for row in range(start, len(self._items)):
+            self._rows[self._items[row].key] = row
+
+    def item(self, key: int) -> QueueItem | None:
+        row = self._rows.get(key)
+        return None if row is None else self._items[row]
+
+    def item_at(self, row: int) -> QueueItem:
+        return self._items[row]
+
+    def facet_counts(self) -> dict[str, int]:
+        """Live counts per facet, kept up to date without rescanning rows."""
+
+        return {
+            name: sum(self.status_counts[status] for status in statuses)
+            for name, statuses in FACETS.items()
+        }
+
+    def items(self) -> list[QueueItem]:
+        return list(self._items)
+
+    def row_of(self, key: int) -> int | None:
+        return self._rows.get(key)
+
+    def key_at(self, row: int) -> int | None:
+        if 0 <= row < len(self._items):
+            return self._items[row].key
+        return None
+
+    def find(self, workshop_id: str) -> int | None:
+        for item in self._items:
+            if item.workshop_id == workshop_id:
+                return item.key
+        return None
+
+    def update(self, key: int, **fields) -> None:
+        """Change fields of an item; the view is told on the next flush."""
+
+        item = self.item(key)
+        if item is None:
+            return
+
+        if "status" in fields and fields["status"] != item.status:
+            self.status_counts[item.status] -= 1
+            self.status_counts[fields["status"]] += 1
+
+        for name, value in _intern(fields).items():
+            setattr(item, name, value)
+
+        if any(name in fields for name in SEARCH_FIELDS):
+            item.reindex()
+
+        self._dirty.add(key)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Emit one ``dataChanged`` spanning every row touched since last time."""
+
+        self._flush_timer.stop()
+        keys = [key for key in self._dirty if key in self._rows]
+        self._dirty.clear()
+        if not keys:
+            return
+
+        rows = [self._rows[key] for key in keys]
+        self.changed.emit(keys)
+
+        self.dataChanged.emit(
+            self.index(min(rows), 0),
+            self.index(max(rows), len(COLUMNS) - 1),
+        )
+        self.flushed.emit()
+
+
+class QueueFilterProxy(QSortFilterProxyModel):
+    """Filters the queue by search tokens and a status facet.
+
+    Every token of the filter text must occur in the item's precomputed
+    lowercase search text, so a keystroke costs one substring test per
+    token and row. Sorting only changes the view: the source model's
+    row order is the queue order and stays untouched. :meth:`lessThan`
+    compares raw item values directly, without going through ``data``.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._tokens: list[str] = []
+        self._statuses: tuple[str, ...] | None = None
+
+    def set_filter_text(self, text: str) -> None:
+        tokens = text.lower().split()
+        if tokens != self._tokens:
+            self._tokens = tokens
+            self.invalidateRowsFilter()
+
+    def set_facet(self, facet: str | None) -> None:
+        statuses = FACETS.get(facet) if facet else None
+        if statuses != self._statuses:
+            self._statuses = statuses
+            self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._tokens and self._statuses is None:
+            return True
+
+        item = self.sourceModel().item_at(source_row)
+        if self._statuses is not None and item.status not in self._statuses:
+            return False
+
+        text = item.search_text
+        return all(token in text for token in self._tokens)
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        sort_key = SORT_KEYS.get(left.column())
+        if sort_key is None:
+            return left.row() < right.row()
+        model = self.sourceModel()
+        return sort_key(model.item_at(left.row())) < sort_key(model.item_at(right.row()))
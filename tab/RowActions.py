@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QEvent, QModelIndex, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QToolTip
+from qfluentwidgets import FluentIcon, Theme, isDarkTheme
+
+# (action, icon, tooltip) in the order they are drawn.
+ROW_ACTIONS = [
+    ("top", FluentIcon.UP, "Move to top"),
+    ("retry", FluentIcon.SYNC, "Retry"),
+    ("cancel", FluentIcon.CANCEL, "Cancel download"),
+    ("open", FluentIcon.FOLDER, "Open folder"),
+    ("log", FluentIcon.DOCUMENT, "View log"),
+    ("delete", FluentIcon.DELETE, "Remove this row"),
+]
+
+ICON_SIZE = 16
+BUTTON_SIZE = 24
+SPACING = 4
+
+
+class RowActionDelegate(QStyledItemDelegate):
+    """Paints the per-row action buttons and hit-tests clicks on them.
+
+    Nothing is instantiated per row: the same icons are drawn into every
+    visible cell, so the cost does not grow with the size of the queue.
+    """
+
+    triggered = Signal(int, str)  # key, action
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._hover: tuple[int, str] | None = None
+
+    @staticmethod
+    def width() -> int:
+        return len(ROW_ACTIONS) * (BUTTON_SIZE + SPACING) + SPACING
+
+    def _button_rects(self, cell: QRect) -> list[tuple[str, QRect]]:
+        total = len(ROW_ACTIONS) * BUTTON_SIZE + (len(ROW_ACTIONS) - 1) * SPACING
+        x = cell.x() + max((cell.width() - total) // 2, 0)
+        y = cell.y() + (cell.height() - BUTTON_SIZE) // 2
+        rects = []
+        for action, _, _ in ROW_ACTIONS:
+            rects.append((action, QRect(x, y, BUTTON_SIZE, BUTTON_SIZE)))
+            x += BUTTON_SIZE + SPACING
+        return rects
+
+    def _hit(self, cell: QRect, pos) -> str | None:
+        for action, rect in self._button_rects(cell):
+            if rect.contains(pos):
+                return action
+        return None
+
+    def sizeHint(self, option, index: QModelIndex) -> QSize:
+        return QSize(self.width(), BUTTON_SIZE + 2 * SPACING)
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        key = index.data(Qt.UserRole)
+        theme = Theme.DARK if isDarkTheme() else Theme.LIGHT
+        hover_color = QColor(255, 255, 255, 24) if isDarkTheme() else QColor(0, 0, 0, 18)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        for (action, icon, _), (_, rect) in zip(ROW_ACTIONS, self._button_rects(option.rect)):
+            if self._hover == (key, action):
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(hover_color)
+                painter.drawRoundedRect(rect, 4, 4)
+
+            icon_rect = QRect(0, 0, ICON_SIZE, ICON_SIZE)
+            icon_rect.moveCenter(rect.center())
+            icon.render(painter, icon_rect, theme)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        event_type = event.type()
+        if event_type == QEvent.MouseMove:
+            hover = self._hit(option.rect, event.position().toPoint())
+            key = index.data(Qt.UserRole)
+            new_hover = (key, hover) if hover else None
+            if new_hover != self._hover:
+                self._hover = new_hover
+                view = self.parent()
+                if view is not None and hasattr(view, "viewport"):
+                    view.viewport().update(option.rect)
+            return False
+
+        if event_type == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            action = self._hit(option.rect, event.position().toPoint())
+            if action is not None:
+                self.triggered.emit(int(index.data(Qt.UserRole)), action)
+                return True
+
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index: QModelIndex) -> bool:
+        if event.type() == QEvent.ToolTip:
+            action = self._hit(option.rect, event.pos())
+            for name, _, tooltip in ROW_ACTIONS:
+                if name == action:
+                    QToolTip.showText(event.globalPos(), tooltip, view)
+                    return True
+        return super().helpEvent(event, view, option, index)
+
+    def clear_hover(self) -> None:
+        self._hover = None
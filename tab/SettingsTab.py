@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
 
 from utils.config import Config
 from utils.loader import loader
+from utils import governor, profiling
 
 class SettingsTab(QWidget):
     def __init__(self, parent=None):
@@ -46,6 +47,12 @@ class SettingsTab(QWidget):
 
         self.auto_rename_checkbox = QCheckBox("Auto rename folder to mod name", panel)
         self.allow_multi_thread_checkbox = QCheckBox("Allow Multiple Thread Download", panel)
+        self.verify_checkbox = QCheckBox("Verify files after download", panel)
+        self.archive_checkbox = QCheckBox("Pack completed items into an archive", panel)
+        self.dedupe_checkbox = QCheckBox("Link identical files after each download", panel)
+        self.group_by_game_checkbox = QCheckBox("Put downloads in a folder per game", panel)
+        self.preempt_checkbox = QCheckBox("Moving a queued item to the top interrupts the running download", panel)
+        self.dependencies_checkbox = QCheckBox("Add required items automatically, ahead of the items that need them", panel)
 
         account_layout = QHBoxLayout()
         account_label = QLabel("Account", self)
@@ -64,10 +71,29 @@ class SettingsTab(QWidget):
         account_layout.addWidget(self.account_combo)
         account_layout.addStretch()
 
+        priority_layout = QHBoxLayout()
+        priority_label = QLabel("Download process priority", self)
+        priority_label.setObjectName("PriorityLabel")
+        self.priority_combo = QComboBox(panel)
+        for priority in governor.PRIORITIES:
+            self.priority_combo.addItem(priority.capitalize(), priority)
+        self.priority_combo.setCurrentIndex(self.priority_combo.findData(governor.DEFAULT_PRIORITY))
+        self.priority_combo.setToolTip("CPU and disk priority of DepotDownloaderMod")
+        priority_layout.addWidget(priority_label)
+        priority_layout.addWidget(self.priority_combo)
+        priority_layout.addStretch()
+
         panel_layout.addWidget(title)
         panel_layout.addWidget(self.auto_rename_checkbox)
         panel_layout.addWidget(self.allow_multi_thread_checkbox)
+        panel_layout.addWidget(self.verify_checkbox)
+        panel_layout.addWidget(self.archive_checkbox)
+        panel_layout.addWidget(self.dedupe_checkbox)
+        panel_layout.addWidget(self.group_by_game_checkbox)
+        panel_layout.addWidget(self.preempt_checkbox)
+        panel_layout.addWidget(self.dependencies_checkbox)
         panel_layout.addLayout(account_layout)
+        panel_layout.addLayout(priority_layout)
 
         # --- Bottom bar with Save button ---
         bottom_bar = QHBoxLayout()
@@ -76,6 +102,18 @@ class SettingsTab(QWidget):
         save_button = QPushButton("Save", self)
         save_button.setObjectName("SettingsSaveButton")
         save_button.clicked.connect(self.save_settings)
+
+        # Only shown when started with --profile / PYSHOPDL_PROFILE.
+        self.profile_label = QLabel("", self)
+        self.profile_label.setObjectName("SettingsProfileLabel")
+        self.profile_button = QPushButton("Dump Profile", self)
+        self.profile_button.setObjectName("SettingsProfileButton")
+        self.profile_button.clicked.connect(self.dump_profile)
+        self.profile_label.setVisible(profiling.enabled())
+        self.profile_button.setVisible(profiling.enabled())
+
+        bottom_bar.addWidget(self.profile_label)
+        bottom_bar.addWidget(self.profile_button)
         bottom_bar.addWidget(save_button)
 
         layout.addWidget(panel)
@@ -93,18 +131,64 @@ class SettingsTab(QWidget):
         allow_multi_thread = Config().get("multi_thread", False)
         self.allow_multi_thread_checkbox.setChecked(bool(allow_multi_thread))
 
+        verify_downloads = Config().get("verify_downloads", True)
+        self.verify_checkbox.setChecked(bool(verify_downloads))
+
+        archive_completed = Config().get("archive_completed", False)
+        self.archive_checkbox.setChecked(bool(archive_completed))
+
+        dedupe_completed = Config().get("dedupe_completed", False)
+        self.dedupe_checkbox.setChecked(bool(dedupe_completed))
+
+        group_by_game = Config().get("group_by_game", False)
+        self.group_by_game_checkbox.setChecked(bool(group_by_game))
+
+        preempt_downloads = Config().get("preempt_downloads", False)
+        self.preempt_checkbox.setChecked(bool(preempt_downloads))
+
+        resolve_dependencies = Config().get("resolve_dependencies", False)
+        self.dependencies_checkbox.setChecked(bool(resolve_dependencies))
+
+        process_priority = Config().get("process_priority", governor.DEFAULT_PRIORITY)
+        index = self.priority_combo.findData(process_priority)
+        if index >= 0:
+            self.priority_combo.setCurrentIndex(index)
+
         selected_account = Config().get("account", "Anonymous")
         if selected_account is not None:
             index = self.account_combo.findText(str(selected_account))
             if index >= 0:
                 self.account_combo.setCurrentIndex(index)
 
+    def dump_profile(self):
+        try:
+            path = profiling.dump()
+        except Exception as e:  # noqa: BLE001
+            self.profile_label.setText(f"Profile dump failed: {e}")
+            return
+
+        if path is not None:
+            self.profile_label.setText(f"Profile written to {path}")
+
     def save_settings(self):
-        config = {
+        # Keep keys this tab has no widget for (e.g. "disk_margin_mb").
+        try:
+            config = Config().to_dict()
+        except Exception:
+            config = {}
+
+        config.update({
             "auto_rename": self.auto_rename_checkbox.isChecked(),
             "multi_thread": self.allow_multi_thread_checkbox.isChecked(),
+            "verify_downloads": self.verify_checkbox.isChecked(),
+            "archive_completed": self.archive_checkbox.isChecked(),
+            "dedupe_completed": self.dedupe_checkbox.isChecked(),
+            "group_by_game": self.group_by_game_checkbox.isChecked(),
+            "preempt_downloads": self.preempt_checkbox.isChecked(),
+            "resolve_dependencies": self.dependencies_checkbox.isChecked(),
             "account": self.account_combo.currentText() or None,
-        }
+            "process_priority": self.priority_combo.currentData(),
+        })
 
         try:
             with self.config_path.open("w", encoding="utf-8") as f:
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from utils import downloader as depot_downloader
+from utils.httpdownload import HttpDownloader
+
+THUMB_SIZE = 32
+CACHE_DIR_NAME = "thumbs"
+
+# Decoded pixmaps kept in memory, by their pixel size.
+MEMORY_BUDGET_BYTES = 16 * 1024 * 1024
+# Scaled thumbnails kept on disk; the least recently used go first.
+DISK_BUDGET_BYTES = 64 * 1024 * 1024
+# Steam previews are a few hundred KB; anything much larger is skipped.
+MAX_DOWNLOAD_BYTES = 4 * 1024 * 1024
+# Fetches (disk or network) running at once.
+MAX_CONCURRENT = 4
+FETCH_TIMEOUT_SECONDS = 15.0
+# A row must stay visible this long before its thumbnail is fetched, so
+# rows that only flash past during a fast scroll never start a download.
+DISPATCH_DELAY_MS = 80
+# A failed preview is tried again after this long, doubling per failure,
+# and given up after MAX_ATTEMPTS.
+RETRY_DELAY_SECONDS = 30.0
+MAX_ATTEMPTS = 4
+
+
+class _DiskCache:
+    """Scaled thumbnails as PNG files under ``cache/thumbs``, bounded in bytes."""
+
+    def __init__(self, path: Path, budget: int) -> None:
+        self.path = path
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def _file(self, url: str) -> Path:
+        return self.path / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+    def read(self, url: str) -> bytes | None:
+        file = self._file(url)
+        try:
+            data = file.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(file)  # mtime doubles as last use
+        except OSError:
+            pass
+        return data
+
+    def write(self, url: str, data: bytes) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(entry.stat().st_size for entry in self._entries())
+            file = self._file(url)
+            try:
+                self.path.mkdir(parents=True, exist_ok=True)
+                file.write_bytes(data)
+            except OSError:
+                return
+            self._total += len(data)
+            if self._total > self.budget:
+                self._evict()
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.path) as entries:
+                return [entry for entry in entries if entry.name.endswith(".png")]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        # Down to 90%, so a full cache does not evict on every write.
+        target = self.budget * 9 // 10
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                total -= size
+            except OSError:
+                pass
+        self._total = total
+
+
+class ThumbnailCache(QObject):
+    """Preview images for the queue table, loaded only for visible rows.
+
+    :meth:`get` is called from the model while painting. A miss is only
+    recorded; shortly after, rows that are still visible are fetched on a
+    small thread pool (disk cache first, then the shared HTTP pool),
+    decoded and scaled off the GUI thread, and handed back as ``ready``.
+    """
+
+    ready = Signal(int)  # queue key whose thumbnail is now available
+
+    _decoded = Signal(str, int, object)  # workshop id, key, QImage or None
+
+    def __init__(
+        self,
+        url_for: Callable[[str], str | None],
+        visible_keys: Callable[[], set[int]],
+        parent: QObject | None = None,
+        cache_dir: Path | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._url_for = url_for
+        self._visible_keys = visible_keys
+        self._disk = _DiskCache(
+            cache_dir or depot_downloader.get_cache_dir() / CACHE_DIR_NAME,
+            DISK_BUDGET_BYTES,
+        )
+        self._memory: OrderedDict[str, QPixmap] = OrderedDict()
+        self._memory_bytes = 0
+        self._missing: set[str] = set()  # the item has no preview
+        self._failed: dict[str, tuple[int, float]] = {}  # id -> (failures, retry after)
+        self._wanted: OrderedDict[str, tuple[int, float]] = OrderedDict()  # id -> (key, first asked)
+        self._running: set[str] = set()
+        self._pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT, thread_name_prefix="thumbnail")
+
+        self._dispatch_timer = QTimer(self)
+        self._dispatch_timer.setSingleShot(True)
+        self._dispatch_timer.setInterval(DISPATCH_DELAY_MS)
+        self._dispatch_timer.timeout.connect(self._dispatch)
+        self._decoded.connect(self._store)
+
+    def close(self) -> None:
+        self._wanted.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def forget(self, workshop_id: str) -> None:
+        """The item's details changed: look its preview up again."""
+
+        self._missing.discard(workshop_id)
+        self._failed.pop(workshop_id, None)
+
+    def get(self, key: int, workshop_id: str) -> QPixmap | None:
+        pixmap = self._memory.get(workshop_id)
+        if pixmap is not None:
+            self._memory.move_to_end(workshop_id)
+            return pixmap
+
+        failed = self._failed.get(workshop_id)
+        if failed is not None and (failed[0] >= MAX_ATTEMPTS or time.monotonic() < failed[1]):
+            return None
+
+        if (
+            workshop_id not in self._wanted
+            and workshop_id not in self._missing
+            and workshop_id not in self._running
+        ):
+            self._wanted[workshop_id] = (key, time.monotonic())
+            if not self._dispatch_timer.isActive():
+                self._dispatch_timer.start()
+        return None
+
+    def _dispatch(self) -> None:
+        visible = self._visible_keys()
+        settled = time.monotonic() - DISPATCH_DELAY_MS / 1000
+        for workshop_id, (key, asked) in list(self._wanted.items()):
+            if key not in visible:
+                del self._wanted[workshop_id]
+                continue
+            if asked > settled or len(self._running) >= MAX_CONCURRENT:
+                continue
+            del self._wanted[workshop_id]
+
+            url = self._url_for(workshop_id)
+            if url is None:
+                # Metadata not loaded yet; the row is painted (and asks)
+                # again once it is.
+                continue
+            if not url:
+                self._missing.add(workshop_id)
+                continue
+
+            self._running.add(workshop_id)
+            self._pool.submit(self._load, workshop_id, key, url)
+
+        # Rows that became visible too recently, or did not fit in the
+        # pool, are looked at again.
+        if self._wanted and len(self._running) < MAX_CONCURRENT:
+            self._dispatch_timer.start()
+
+    # ---- worker threads ----------------------------------------------------
+
+    def _load(self, workshop_id: str, key: int, url: str) -> None:
+        image = None
+        try:
+            data = self._disk.read(url)
+            if data is not None:
+                image = QImage.fromData(data)
+            if image is None or image.isNull():
+                data = HttpDownloader.shared().fetch_bytes(url, MAX_DOWNLOAD_BYTES, FETCH_TIMEOUT_SECONDS).result()
+                image = QImage.fromData(data)
+                if image.isNull():
+                    image = None
+                else:
+                    image = image.scaled(THUMB_SIZE, THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    self._disk.write(url, _png_bytes(image))
+        except Exception:  # noqa: BLE001
+            image = None
+        self._decoded.emit(workshop_id, key, image)
+
+    # ---- GUI thread --------------------------------------------------------
+
+    def _store(self, workshop_id: str, key: int, image: QImage | None) -> None:
+        self._running.discard(workshop_id)
+        if image is None:
+            failures = self._failed.get(workshop_id, (0, 0.0))[0] + 1
+            delay = RETRY_DELAY_SECONDS * 2 ** (failures - 1)
+            self._failed[workshop_id] = (failures, time.monotonic() + delay)
+            if failures < MAX_ATTEMPTS:
+                # Repaint the row then, so a visible row asks again.
+                QTimer.singleShot(int(delay * 1000), lambda: self.ready.emit(key))
+        else:
+            self._failed.pop(workshop_id, None)
+            pixmap = QPixmap.fromImage(image)
+            self._memory[workshop_id] = pixmap
+            self._memory_bytes += _cost(pixmap)
+            while self._memory_bytes > MEMORY_BUDGET_BYTES and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= _cost(evicted)
+            self.ready.emit(key)
+
+        if self._wanted:
+            self._dispatch()
+
+
+def _cost(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(pixmap.depth() // 8, 1)
+
+
+def _png_bytes(image: QImage) -> bytes:
+    array = QByteArray()
+    buffer = QBuffer(array)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(array)
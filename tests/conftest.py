@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# The app imports its modules from the repository root, as main.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the app's cache directory (indexes, lock files) at tmp_path."""
+
+    from utils import downloader
+
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(downloader, "get_cache_dir", lambda: cache)
+    return cache
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """One offscreen QApplication for the Qt tests; skips them without PySide6."""
+
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """Process Qt events until ``condition()`` is true; returns its last value."""
+
+    def wait(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+        return condition()
+
+    return wait
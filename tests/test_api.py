@@ -0,0 +1,164 @@
+import asyncio
+import json
+from concurrent.futures import Future
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer, make_mocked_request
+
+from utils.api import ApiServer, EventHub, Snapshot
+
+TOKEN = "secret"
+
+
+def _row(key, status="Ready"):
+    return {"key": key, "workshop_id": str(100 + key), "status": status}
+
+
+@pytest.fixture
+def snapshot():
+    snapshot = Snapshot()
+    for key, status in ((1, "Ready"), (2, "Complete"), (3, "Error")):
+        snapshot.put(key, _row(key, status))
+    return snapshot
+
+
+@pytest.fixture
+def commands():
+    return []
+
+
+@pytest.fixture
+def server(snapshot, commands):
+    def execute(name, args):
+        commands.append((name, args))
+        future = Future()
+        if args.get("key") == 404:
+            future.set_exception(KeyError(404))
+        elif args.get("index", 0) < 0:
+            future.set_exception(ValueError("index out of range"))
+        else:
+            future.set_result(None)
+        return future
+
+    return ApiServer(execute, snapshot, EventHub(), TOKEN)
+
+
+def _run(server, test):
+    async def main():
+        async with TestClient(TestServer(server._make_app())) as client:
+            server.hub.attach(asyncio.get_running_loop())
+            return await test(client)
+
+    return asyncio.run(main())
+
+
+def test_snapshot_keeps_order_and_counts(snapshot):
+    snapshot.set_order([3, 1, 2, 99])
+    assert [row["key"] for row in snapshot.rows()] == [3, 1, 2]
+    assert [row["key"] for row in snapshot.rows({"Ready", "Error"})] == [3, 1]
+
+    snapshot.put(1, _row(1, "Complete"))
+    snapshot.remove(3)
+    snapshot.remove(3)
+    snapshot.set_state(paused=True)
+    status = snapshot.status()
+    assert status == {"total": 2, "counts": {"Complete": 2}, "paused": True, "current": None}
+    assert snapshot.get(3) is None
+
+
+@pytest.mark.parametrize("headers, query", [
+    ({}, ""),
+    ({"Authorization": "Bearer wrong"}, ""),
+    ({"X-PyShopDL-Token": "wrong"}, ""),
+    ({}, "?token=wrong"),
+])
+def test_requests_without_the_token_are_rejected(server, headers, query):
+    async def test(client):
+        response = await client.get(f"/api/status{query}", headers=headers)
+        return response.status
+
+    assert _run(server, test) == 401
+
+
+@pytest.mark.parametrize("headers, query", [
+    ({"Authorization": f"Bearer {TOKEN}"}, ""),
+    ({"X-PyShopDL-Token": TOKEN}, ""),
+    ({}, f"?token={TOKEN}"),
+])
+def test_token_is_accepted_in_any_place(server, headers, query):
+    async def test(client):
+        response = await client.get(f"/api/status{query}", headers=headers)
+        return response.status, await response.json()
+
+    status, body = _run(server, test)
+    assert status == 200
+    assert body["total"] == 3
+
+
+def test_reads_and_commands(server, commands):
+    auth = {"Authorization": f"Bearer {TOKEN}"}
+
+    async def test(client):
+        queue = await (await client.get("/api/queue?status=Ready,Error", headers=auth)).json()
+        completed = await (await client.get("/api/completed", headers=auth)).json()
+        missing = await client.get("/api/items/7", headers=auth)
+        moved = await client.post("/api/items/1/move", json={"index": 0}, headers=auth)
+        bad_move = await client.post("/api/items/1/move", json={"index": "0"}, headers=auth)
+        out_of_range = await client.post("/api/items/1/move", json={"index": -1}, headers=auth)
+        unknown = await client.delete("/api/items/404", headers=auth)
+        return (
+            [row["key"] for row in queue], [row["key"] for row in completed],
+            missing.status, moved.status, bad_move.status, out_of_range.status, unknown.status,
+        )
+
+    assert _run(server, test) == ([1, 3], [2], 404, 200, 400, 400, 404)
+    assert commands == [
+        ("move", {"key": 1, "index": 0}),
+        ("move", {"key": 1, "index": -1}),
+        ("remove", {"key": 404}),
+    ]
+
+
+@pytest.mark.parametrize("sse", [False, True])
+def test_events_are_streamed(server, sse):
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    if sse:
+        headers["Accept"] = "text/event-stream"
+
+    async def test(client):
+        response = await client.get("/api/events", headers=headers)
+        while not server.hub._subscribers:
+            await asyncio.sleep(0.01)
+        server.hub.publish("status", key=1, status="Process")
+        server.hub.publish("removed", key=2)
+        lines = []
+        while len([line for line in lines if line]) < (4 if sse else 2):
+            lines.append((await response.content.readline()).decode().rstrip("\n"))
+        response.close()
+        return response.headers["Content-Type"], [line for line in lines if line]
+
+    content_type, lines = _run(server, test)
+    if sse:
+        assert content_type == "text/event-stream"
+        assert lines[0] == "event: status"
+        message = json.loads(lines[1].removeprefix("data: "))
+    else:
+        assert content_type == "application/x-ndjson"
+        message = json.loads(lines[0])
+        assert json.loads(lines[1])["event"] == "removed"
+    assert (message["event"], message["key"], message["status"]) == ("status", 1, "Process")
+
+
+def test_cancelled_event_stream_ends_and_unsubscribes(server):
+    async def main():
+        server.hub.attach(asyncio.get_running_loop())
+        request = make_mocked_request("GET", "/api/events")
+        task = asyncio.create_task(server._events(request))
+        while not server.hub._subscribers:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return server.hub._subscribers
+
+    assert asyncio.run(main()) == set()
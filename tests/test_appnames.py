@@ -0,0 +1,63 @@
+import pytest
+
+from utils import appnames
+from utils.appnames import AppNameIndex, refresh, safe_folder_name
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = AppNameIndex(tmp_path / "apps.db")
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize(("name", "expected"), [
+    ("Half-Life 2", "Half-Life 2"),
+    ('Mods: "Best" <of> 2/3?', "Mods_ _Best_ _of_ 2_3_"),
+    (" trailing dots. ", "trailing dots"),
+    ("...", "_"),
+])
+def test_safe_folder_name(name, expected):
+    assert safe_folder_name(name) == expected
+
+
+def test_lookup_after_store(index):
+    assert index.lookup("4000") == ""
+    assert index.is_stale()
+
+    assert index.store([(4000, "Garry's Mod"), (294100, "RimWorld")]) == 2
+    assert index.lookup("4000") == "Garry's Mod"
+    assert index.lookup("294100") == "RimWorld"
+    assert index.lookup("abc") == ""
+    assert not index.is_stale()
+
+
+def test_store_replaces_the_whole_list(index):
+    index.store([(1, "Old"), (2, "Gone")])
+    index.store([(1, "New")])
+
+    assert index.lookup("1") == "New"
+    assert index.lookup("2") == ""
+
+
+def test_lookups_are_memoized_until_invalidated(index, tmp_path):
+    assert index.lookup("10") == ""
+
+    other = AppNameIndex(tmp_path / "apps.db")
+    try:
+        other.store([(10, "Counter-Strike")])
+    finally:
+        other.close()
+
+    assert index.lookup("10") == ""
+    index.invalidate()
+    assert index.lookup("10") == "Counter-Strike"
+
+
+def test_refresh_stores_the_fetched_list(index, monkeypatch):
+    async def fetch():
+        return [(70, "Half-Life")]
+
+    monkeypatch.setattr(appnames, "fetch_app_list", fetch)
+    assert refresh(index) == 1
+    assert index.lookup("70") == "Half-Life"
@@ -0,0 +1,68 @@
+import os
+import zipfile
+
+import pytest
+
+from utils.archive import HASH_SUFFIX, archive_path, pack_folder
+from utils.verify import HashIndex, verify_item
+
+
+@pytest.fixture
+def folder(tmp_path, cache_dir):
+    folder = tmp_path / "depots" / "1"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "a.txt").write_text("one")
+    (folder / "sub" / "b.txt").write_text("two")
+    return folder
+
+
+def _rewrite(path, text):
+    st = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_pack_writes_archive_and_hash(folder):
+    target = pack_folder("1", folder)
+
+    assert target == archive_path(folder, "zip")
+    with zipfile.ZipFile(target) as zf:
+        assert sorted(zf.namelist()) == ["1/a.txt", "1/sub/b.txt"]
+    assert target.with_name(target.name + HASH_SUFFIX).is_file()
+    assert not target.with_name(target.name + ".part").exists()
+
+
+def test_unchanged_folder_is_not_packed_again(folder):
+    pack_folder("1", folder)
+    assert pack_folder("1", folder) is None
+
+
+def test_changed_folder_is_packed_again(folder):
+    first = pack_folder("1", folder)
+    digest = first.with_name(first.name + HASH_SUFFIX).read_text()
+
+    _rewrite(folder / "a.txt", "ONE")
+    target = pack_folder("1", folder)
+
+    assert target == first
+    assert target.with_name(target.name + HASH_SUFFIX).read_text() != digest
+    with zipfile.ZipFile(target) as zf:
+        assert zf.read("1/a.txt") == b"ONE"
+
+
+def test_packing_keeps_the_reference_hashes(folder, cache_dir):
+    index = HashIndex()
+    try:
+        verify_item("1", folder, index, record=True)
+        _rewrite(folder / "a.txt", "ONE")
+        pack_folder("1", folder)
+
+        result = verify_item("1", folder, index)
+    finally:
+        index.close()
+    assert result.changed == ["a.txt"]
+
+
+def test_unknown_format_is_rejected(folder):
+    with pytest.raises(ValueError):
+        pack_folder("1", folder, "rar")
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from utils import cluster
+from utils.cluster import Coordinator, JobStore, Worker
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "cluster.db", max_attempts=2)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cluster, "time", SimpleNamespace(time=lambda: now[0], monotonic=time.monotonic))
+    return now
+
+
+def test_claims_in_order_without_duplicates(store):
+    assert store.add([{"workshop_id": "1"}, {"workshop_id": "2"}, {"workshop_id": "x"}]) == [1, 2]
+    assert store.add([{"workshop_id": "1"}]) == []
+
+    assert store.claim("a")["workshop_id"] == "1"
+    assert store.claim("b")["workshop_id"] == "2"
+    assert store.claim("c") is None
+
+
+def test_expired_lease_is_reassigned(store, clock):
+    store.add([{"workshop_id": "1"}])
+    job = store.claim("a", lease_seconds=10)
+
+    clock[0] += 5
+    assert store.heartbeat(job["id"], "a", lease_seconds=10)
+    clock[0] += 9
+    assert store.claim("b") is None  # renewed, still a's
+
+    clock[0] += 2
+    again = store.claim("b", lease_seconds=10)
+    assert (again["id"], again["worker"], again["attempts"]) == (job["id"], "b", 2)
+
+    # The old holder can neither renew nor report any more.
+    assert not store.heartbeat(job["id"], "a")
+    assert not store.finish(job["id"], "a", ok=True)
+    assert store.finish(job["id"], "b", ok=True)
+    assert store.jobs("done")[0]["worker"] == "b"
+
+
+def test_attempts_are_capped(store, clock):
+    store.add([{"workshop_id": "1"}])
+    job = store.claim("a", lease_seconds=1)
+    assert store.finish(job["id"], "a", ok=False, error="boom")
+    assert store.jobs("queued")[0]["error"] == "boom"
+
+    store.claim("b", lease_seconds=1)
+    clock[0] += 2
+    assert store.claim("c") is None
+    failed = store.jobs("failed")[0]
+    assert failed["error"] == "lease expired on b"
+    assert store.status()["counts"]["failed"] == 1
+
+
+async def _serve(store, lease_seconds):
+    runner = web.AppRunner(Coordinator(store, "tok", lease_seconds).make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_workers_pick_up_an_abandoned_lease(store, monkeypatch):
+    monkeypatch.setattr(cluster, "POLL_SECONDS", 0.05)
+    store.add([{"workshop_id": str(100 + i)} for i in range(6)])
+    ran: list[tuple[str, str]] = []
+    release = threading.Event()
+
+    def stuck(job, stop):
+        ran.append(("doomed", job["workshop_id"]))
+        release.wait(10)
+
+    def quick(name):
+        def run(job, stop):
+            ran.append((name, job["workshop_id"]))
+            time.sleep(0.05)
+        return run
+
+    async def main():
+        server, url = await _serve(store, lease_seconds=0.6)
+        try:
+            doomed = asyncio.create_task(Worker(url, "tok", "doomed", runner=stuck).run())
+            while not ran:
+                await asyncio.sleep(0.01)
+            # The worker dies mid-job: no more heartbeats, no result.
+            doomed.cancel()
+            workers = [Worker(url, "tok", f"w{i}", runner=quick(f"w{i}"), idle_exit=1.0) for i in range(3)]
+            await asyncio.gather(*(worker.run() for worker in workers))
+            return workers
+        finally:
+            release.set()
+            await server.cleanup()
+
+    workers = asyncio.run(main())
+
+    jobs = store.jobs()
+    assert [job["status"] for job in jobs] == ["done"] * 6
+    abandoned = next(job for job in jobs if job["workshop_id"] == ran[0][1])
+    assert abandoned["attempts"] == 2
+    assert abandoned["worker"] != "doomed"
+    assert sum(worker.completed for worker in workers) == 6
+
+
+def test_lost_lease_stops_the_runner_and_skips_the_result(store, monkeypatch):
+    monkeypatch.setattr(cluster, "POLL_SECONDS", 0.05)
+    store.add([{"workshop_id": "1"}])
+    stopped = []
+
+    def slow(job, stop):
+        stopped.append(stop.wait(10))
+
+    async def main():
+        server, url = await _serve(store, lease_seconds=0.6)
+        try:
+            worker = Worker(url, "tok", "a", runner=slow, idle_exit=0.3)
+            task = asyncio.create_task(worker.run())
+            while store.status()["workers"] != ["a"]:
+                await asyncio.sleep(0.01)
+            # The job moves to b behind a's back; a's next heartbeat gets 409.
+            with store._transaction() as conn:
+                conn.execute("UPDATE jobs SET lease_expires = 0")
+            assert store.claim("b", lease_seconds=60) is not None
+            await task
+            return worker
+        finally:
+            await server.cleanup()
+
+    worker = asyncio.run(main())
+
+    assert stopped == [True]
+    assert (worker.lost, worker.completed, worker.failed) == (1, 0, 0)
+    job = store.jobs()[0]
+    assert (job["status"], job["worker"]) == ("leased", "b")
+
+
+def test_worker_survives_a_hung_coordinator(monkeypatch):
+    monkeypatch.setattr(cluster, "POLL_SECONDS", 0.05)
+    monkeypatch.setattr(cluster, "REQUEST_TIMEOUT_SECONDS", 0.2)
+    calls = {"claim": 0, "heartbeat": 0, "result": 0}
+
+    async def hang():
+        await asyncio.sleep(5)
+
+    async def claim(request):
+        calls["claim"] += 1
+        if calls["claim"] == 1:
+            await hang()
+        if calls["claim"] == 2:
+            return web.json_response({"id": 1, "workshop_id": "1", "lease_seconds": 0.3})
+        return web.Response(status=204)
+
+    async def heartbeat(request):
+        calls["heartbeat"] += 1
+        await hang()
+
+    async def result(request):
+        calls["result"] += 1
+        await hang()
+
+    async def main():
+        app = web.Application()
+        app.add_routes([
+            web.post("/cluster/claim", claim),
+            web.post("/cluster/jobs/{id}/heartbeat", heartbeat),
+            web.post("/cluster/jobs/{id}/result", result),
+        ])
+        runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            worker = Worker(f"http://127.0.0.1:{port}", "tok", "a",
+                            runner=lambda job, stop: time.sleep(0.8), idle_exit=0.3)
+            await worker.run()
+            return worker
+        finally:
+            await runner.cleanup()
+
+    worker = asyncio.run(main())
+
+    assert worker.completed == 1
+    # Every heartbeat timed out, yet the task kept renewing the lease.
+    assert calls["heartbeat"] >= 2
+    assert calls["result"] == 1
@@ -0,0 +1,149 @@
+import os
+
+import pytest
+
+from utils import dedupe as dedupe_module
+from utils.dedupe import MIN_FILE_SIZE, DedupeIndex, dedupe
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "depots"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DedupeIndex(tmp_path / "dedupe.db")
+    yield index
+    index.close()
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_identical_files_are_linked(root, index):
+    data = os.urandom(MIN_FILE_SIZE)
+    _write(root / "1" / "mod.bin", data)
+    _write(root / "2" / "copy" / "mod.bin", data)
+
+    result = dedupe(root, mode="hardlink", index=index)
+
+    assert (result.scanned, result.hashed, result.linked) == (2, 2, 1)
+    assert result.saved_bytes == MIN_FILE_SIZE
+    assert os.path.samefile(root / "1" / "mod.bin", root / "2" / "copy" / "mod.bin")
+    assert (root / "2" / "copy" / "mod.bin").read_bytes() == data
+
+
+def test_same_size_different_content_stays_apart(root, index):
+    _write(root / "1" / "a.bin", b"a" * MIN_FILE_SIZE)
+    _write(root / "2" / "b.bin", b"b" * MIN_FILE_SIZE)
+
+    result = dedupe(root, mode="hardlink", index=index)
+
+    assert result.hashed == 2
+    assert result.linked == 0
+    assert not os.path.samefile(root / "1" / "a.bin", root / "2" / "b.bin")
+
+
+def test_files_with_a_unique_size_are_never_hashed(root, index):
+    _write(root / "1" / "a.bin", b"a" * MIN_FILE_SIZE)
+    _write(root / "2" / "b.bin", b"a" * (MIN_FILE_SIZE + 1))
+
+    result = dedupe(root, mode="hardlink", index=index)
+    assert (result.scanned, result.hashed, result.linked) == (2, 0, 0)
+
+
+def test_small_files_are_skipped(root, index):
+    _write(root / "1" / "a.txt", b"same")
+    _write(root / "2" / "a.txt", b"same")
+
+    assert dedupe(root, mode="hardlink", index=index).linked == 0
+
+
+def test_groups_by_digest_within_one_size(root, index):
+    one, two = os.urandom(MIN_FILE_SIZE), os.urandom(MIN_FILE_SIZE)
+    for folder, data in (("1", one), ("2", one), ("3", two), ("4", two), ("5", two)):
+        _write(root / folder / "f.bin", data)
+
+    result = dedupe(root, mode="hardlink", index=index)
+
+    assert result.linked == 3
+    assert os.path.samefile(root / "1" / "f.bin", root / "2" / "f.bin")
+    assert os.path.samefile(root / "3" / "f.bin", root / "5" / "f.bin")
+    assert not os.path.samefile(root / "1" / "f.bin", root / "3" / "f.bin")
+
+
+def test_second_pass_is_incremental(root, index, monkeypatch):
+    data = os.urandom(MIN_FILE_SIZE)
+    _write(root / "1" / "f.bin", data)
+    _write(root / "2" / "f.bin", data)
+    dedupe(root, mode="hardlink", index=index)
+
+    # Only the new folder is rescanned; the indexed digests are reused.
+    _write(root / "3" / "f.bin", data)
+    result = dedupe(root, folders=["3"], mode="hardlink", index=index)
+
+    assert (result.scanned, result.hashed, result.linked) == (1, 1, 1)
+    assert os.path.samefile(root / "1" / "f.bin", root / "3" / "f.bin")
+
+    hashed = []
+    monkeypatch.setattr(dedupe_module, "hash_paths", lambda paths, workers=None: hashed.extend(paths) or [])
+    assert dedupe(root, mode="hardlink", index=index).linked == 0
+    assert hashed == []
+
+
+def test_file_changed_since_hashing_is_not_linked(root, index):
+    data = os.urandom(MIN_FILE_SIZE)
+    _write(root / "1" / "f.bin", data)
+    _write(root / "2" / "f.bin", data)
+    # Reflinks (if the filesystem has them at all) keep separate inodes,
+    # so the digests are indexed while the files stay independent.
+    dedupe(root, folders=["1", "2"], mode="reflink", index=index)
+
+    # 2 is rewritten behind the index's back; only 3 is rescanned.
+    changed = os.urandom(MIN_FILE_SIZE)
+    _write(root / "2" / "f.bin", changed)
+    st = (root / "2" / "f.bin").stat()
+    os.utime(root / "2" / "f.bin", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    _write(root / "3" / "f.bin", data)
+    result = dedupe(root, folders=["3"], mode="hardlink", index=index)
+
+    assert result.linked == 1
+    assert (root / "2" / "f.bin").read_bytes() == changed
+    assert os.path.samefile(root / "1" / "f.bin", root / "3" / "f.bin")
+
+
+def test_folder_being_downloaded_is_left_alone(root, index):
+    data = os.urandom(MIN_FILE_SIZE)
+    for folder in ("1", "2", "3"):
+        _write(root / folder / "f.bin", data)
+
+    result = dedupe(root, mode="hardlink", index=index, busy=lambda: {"1"})
+
+    assert result.linked == 1
+    assert os.path.samefile(root / "2" / "f.bin", root / "3" / "f.bin")
+    assert (root / "1" / "f.bin").stat().st_nlink == 1
+
+
+def test_file_that_cannot_be_replaced_is_skipped(root, index, monkeypatch):
+    data = os.urandom(MIN_FILE_SIZE)
+    for folder in ("1", "2", "3"):
+        _write(root / folder / "f.bin", data)
+
+    replace = os.replace
+
+    def locked(src, dst):
+        if "2" in os.path.relpath(dst, root).split(os.sep)[0]:
+            raise PermissionError("in use")
+        replace(src, dst)
+
+    monkeypatch.setattr(dedupe_module.os, "replace", locked)
+    result = dedupe(root, mode="hardlink", index=index)
+
+    assert result.linked == 1
+    assert os.path.samefile(root / "1" / "f.bin", root / "3" / "f.bin")
+    assert not (root / "2" / "f.bin.dedupe").exists()
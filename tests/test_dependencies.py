@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from utils import dependencies
+from utils.dependencies import _dependency_order, resolve
+
+# a requires b and c, b requires d, c requires d; e stands alone.
+GRAPH = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": [], "e": []}
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serves GRAPH instead of Steam; holds the batches that were asked for."""
+
+    graph = dict(GRAPH)
+    calls: list[list[str]] = []
+
+    async def fetch_children(session, ids):
+        calls.append(list(ids))
+        return {workshop_id: graph[workshop_id] for workshop_id in ids if workshop_id in graph}
+
+    monkeypatch.setattr(dependencies, "fetch_children", fetch_children)
+    return graph, calls
+
+
+def test_order_puts_dependencies_first():
+    order, cycles = _dependency_order(["a", "e"], GRAPH)
+
+    assert cycles == []
+    assert sorted(order) == ["a", "b", "c", "d", "e"]
+    for parent, children in GRAPH.items():
+        for child in children:
+            assert order.index(child) < order.index(parent)
+
+
+def test_cycle_is_reported_once_and_broken():
+    order, cycles = _dependency_order(["x"], {"x": ["y"], "y": ["z"], "z": ["x"]})
+
+    assert cycles == [["x", "y", "z", "x"]]
+    assert order == ["z", "y", "x"]
+
+
+def test_self_reference_and_shared_children():
+    order, cycles = _dependency_order(["p", "q"], {"p": ["s"], "q": ["s", "q"], "s": []})
+    assert order == ["s", "p", "q"]
+    assert cycles == [["q", "q"]]
+
+
+def test_resolve_walks_one_batch_per_level(fetched):
+    resolution = asyncio.run(resolve(["a"]))
+
+    assert fetched[1] == [["a"], ["b", "c"], ["d"]]
+    assert resolution.requests == 3
+    assert resolution.order == ["d", "b", "c"]
+    assert resolution.required_by("d") == ["b", "c"]
+
+
+def test_resolve_leaves_out_known_items(fetched):
+    resolution = asyncio.run(resolve(["a"], known=["b"]))
+    assert resolution.order == ["d", "c"]
+
+
+def test_resolve_splits_large_levels(fetched, monkeypatch):
+    monkeypatch.setattr(dependencies, "BATCH_SIZE", 1)
+    resolution = asyncio.run(resolve(["a", "e"]))
+
+    assert fetched[1] == [["a"], ["e"], ["b"], ["c"], ["d"]]
+    assert resolution.order == ["d", "b", "c"]
+
+
+def test_resolve_reports_cycles(fetched):
+    fetched[0]["d"] = ["a"]
+    resolution = asyncio.run(resolve(["a"]))
+
+    assert resolution.cycles == [["a", "b", "d", "a"]]
+    assert resolution.order == ["d", "b", "c"]
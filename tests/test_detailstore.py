@@ -0,0 +1,88 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import detailstore
+from utils.detailstore import DetailStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "details.db"
+
+
+@pytest.fixture
+def store(path):
+    store = DetailStore(path)
+    yield store
+    store.close()
+
+
+def _details(workshop_id):
+    return {"publishedfileid": workshop_id, "title": f"Item {workshop_id}", "description": "x" * 5000}
+
+
+def test_entries_survive_a_reopen(store, path):
+    store.put("1", _details("1"))
+    assert store.get("1") == _details("1")
+    store.close()
+
+    reopened = DetailStore(path)
+    try:
+        assert reopened.get("1") == _details("1")
+        assert reopened.get("2") is None
+    finally:
+        reopened.close()
+
+
+def test_memo_is_bounded(store, monkeypatch):
+    monkeypatch.setattr(detailstore, "MEMO_SIZE", 2)
+    for workshop_id in ("1", "2", "3"):
+        store.put(workshop_id, _details(workshop_id))
+
+    assert list(store._memo) == ["2", "3"]
+    assert store.get("1") == _details("1")
+    assert list(store._memo) == ["3", "1"]
+
+
+def test_unreadable_entry_is_treated_as_missing(store, path):
+    store.put("1", _details("1"))
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE details SET data = ?", (b"not zlib",))
+
+    reopened = DetailStore(path)
+    try:
+        assert reopened.get("1") is None
+    finally:
+        reopened.close()
+
+
+def test_puts_are_written_in_one_flush(store, path):
+    for workshop_id in ("1", "2", "3"):
+        store.put(workshop_id, _details(workshop_id))
+
+    assert store.pending == 3
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM details").fetchone() == (0,)
+    assert store.get("2") == _details("2")
+
+    assert store.flush() == 3
+    assert store.pending == 0
+    assert store.flush() == 0
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM details").fetchone() == (3,)
+
+
+def test_prune_by_age_and_count(store, monkeypatch):
+    now = time.time()
+    for age, workshop_id in ((400, "old"), (30, "a"), (20, "b"), (10, "c")):
+        monkeypatch.setattr(detailstore, "time", SimpleNamespace(time=lambda: now - age))
+        store.put(workshop_id, _details(workshop_id))
+    monkeypatch.setattr(detailstore, "time", SimpleNamespace(time=lambda: now))
+    store.flush()
+
+    assert store.prune(max_age=300, max_entries=2) == 2
+    assert [store.get(i) is not None for i in ("old", "a", "b", "c")] == [False, False, True, True]
@@ -0,0 +1,48 @@
+import shutil
+
+import pytest
+
+from utils.diskspace import DiskAdmission
+
+GB = 1024 ** 3
+
+
+@pytest.fixture
+def admission(tmp_path, monkeypatch):
+    admission = DiskAdmission(tmp_path / "depots", margin_bytes=1 * GB)
+    monkeypatch.setattr(admission, "free_bytes", lambda: 10 * GB)
+    return admission
+
+
+def test_free_bytes_probes_the_nearest_existing_parent(tmp_path):
+    admission = DiskAdmission(tmp_path / "not" / "created" / "yet")
+    assert admission.free_bytes() == shutil.disk_usage(tmp_path).free
+
+
+def test_margin_and_reservations_reduce_what_fits(admission):
+    assert admission.available_bytes() == 9 * GB
+    assert admission.fits(9 * GB)
+    assert not admission.fits(9 * GB + 1)
+
+    assert admission.reserve("a", 6 * GB)
+    assert admission.reserved_bytes() == 6 * GB
+    assert not admission.reserve("b", 4 * GB)
+    assert admission.reserve("b", 3 * GB)
+    assert admission.available_bytes() == 0
+
+    admission.release("a")
+    admission.release("a")
+    assert admission.available_bytes() == 6 * GB
+
+
+def test_unknown_and_negative_sizes_always_fit(admission):
+    admission.reserve("a", 9 * GB)
+    assert admission.fits(0)
+    assert admission.reserve("b", -5)
+    assert admission.reserved_bytes() == 9 * GB
+
+
+def test_projected_usage_adds_reservations(admission):
+    admission.reserve("a", 2 * GB)
+    assert admission.projected_usage(3 * GB) == (5 * GB, 10 * GB)
+    assert admission.projected_usage(-1) == (2 * GB, 10 * GB)
@@ -0,0 +1,74 @@
+import pytest
+
+from utils.eta import (
+    DEFAULT_BYTES_PER_SECOND,
+    DEFAULT_OVERHEAD_SECONDS,
+    MIN_APP_SAMPLES,
+    EtaModel,
+    HistoryStore,
+    format_duration,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.db")
+    yield store
+    store.close()
+
+
+def test_defaults_without_history(store):
+    model = EtaModel(store)
+    assert model.parameters("4000") == (DEFAULT_OVERHEAD_SECONDS, DEFAULT_BYTES_PER_SECOND)
+    assert model.predict("4000", 10 * DEFAULT_BYTES_PER_SECOND) == pytest.approx(DEFAULT_OVERHEAD_SECONDS + 10)
+
+
+def test_fit_from_history(store):
+    model = EtaModel(store)
+    # 10 s overhead, then 1 MB/s.
+    for size in (10, 20, 30):
+        model.record(str(size), "4000", size * MB, 10 + size, 10)
+
+    overhead, rate = model.parameters("4000")
+    assert overhead == pytest.approx(10)
+    assert rate == pytest.approx(MB)
+    assert model.predict("4000", 50 * MB) == pytest.approx(60)
+    assert model.version == 3
+
+
+def test_apps_with_few_runs_use_the_global_fit(store):
+    model = EtaModel(store)
+    for i in range(MIN_APP_SAMPLES):
+        model.record(str(i), "4000", 10 * MB, 20, 10)
+    model.record("x", "294100", 10 * MB, 110, 10)
+
+    assert model.parameters("294100") == model.parameters("other")
+    assert model.parameters("4000") != model.parameters("294100")
+
+
+def test_model_is_rebuilt_from_the_store(store):
+    model = EtaModel(store)
+    for i in range(MIN_APP_SAMPLES):
+        model.record(str(i), "4000", 10 * MB, 15, 5)
+    assert EtaModel(store).parameters("4000") == model.parameters("4000")
+
+
+def test_remaining_moves_towards_the_live_rate(store):
+    model = EtaModel(store)
+    predicted = model.predict("4000", 100 * MB)
+
+    # Too little progress: the prediction alone.
+    assert model.remaining("4000", 100 * MB, 1.0, 5, 1) == pytest.approx(predicted - 5)
+
+    # Half done in 10 s of transfer: halfway between the two estimates.
+    live = 10.0
+    remaining = model.remaining("4000", 100 * MB, 50.0, 30, 10)
+    assert remaining == pytest.approx(0.5 * (predicted - 30) + 0.5 * live)
+    assert model.remaining("4000", 100 * MB, 100.0, 30, 10) == pytest.approx(0)
+
+
+@pytest.mark.parametrize(("seconds", "text"), [(-3, "0s"), (59.4, "59s"), (61, "1m 01s"), (3725, "1h 02m")])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
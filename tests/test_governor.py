@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.governor import DiskSlot, Limits, PhaseGate, apply, parse_cpu_list
+
+
+@pytest.mark.parametrize(("text", "cpus"), [
+    ("0-3,6", [0, 1, 2, 3, 6]),
+    (" 2 , 0-1 ,2", [0, 1, 2]),
+    ("5", [5]),
+    ([1, "3"], [1, 3]),
+    ("", None),
+    (None, None),
+    (",", None),
+    ("a-b", None),
+    ("1,x", None),
+])
+def test_parse_cpu_list(text, cpus):
+    assert parse_cpu_list(text) == cpus
+
+
+def test_disk_slots_are_shared_through_lock_files(tmp_path):
+    first, second, third = (DiskSlot(2, tmp_path) for _ in range(3))
+    assert first.try_acquire() and second.try_acquire()
+    assert not third.try_acquire()
+    assert not third.acquire(keep_waiting=lambda: False)
+
+    second.release()
+    assert third.try_acquire()
+    for slot in (first, third):
+        slot.release()
+
+
+def test_slot_is_reusable_as_a_context_manager(tmp_path):
+    slot = DiskSlot(1, tmp_path)
+    for _ in range(2):
+        with slot:
+            assert slot.held
+            assert not DiskSlot(1, tmp_path).try_acquire()
+        assert not slot.held
+
+
+def test_slot_context_gives_up_after_its_timeout(tmp_path):
+    busy = DiskSlot(1, tmp_path)
+    assert busy.try_acquire()
+    try:
+        started = time.monotonic()
+        with DiskSlot(1, tmp_path, timeout=0.3) as slot:
+            assert not slot.held
+        assert 0.3 <= time.monotonic() - started < 5
+    finally:
+        busy.release()
+
+
+def test_default_limits_leave_the_process_alone():
+    assert (Limits().priority, Limits().io_priority) == ("normal", "normal")
+
+
+def test_apply_to_an_exited_process_does_not_raise():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    skipped = apply(proc.pid, Limits(priority="low", io_priority="low", affinity=[0]))
+    assert skipped
+
+
+@pytest.fixture
+def proc():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def test_gate_takes_and_frees_the_slot_per_phase(proc, tmp_path):
+    gate = PhaseGate(proc, DiskSlot(1, tmp_path), max_wait=5)
+    gate.phase("allocate")
+    assert gate.slot.held
+    gate.phase("download")
+    assert not gate.slot.held
+    assert gate.unthrottled == 0
+
+
+def test_gate_gives_up_waiting_after_max_wait(proc, tmp_path):
+    busy = DiskSlot(1, tmp_path)
+    assert busy.try_acquire()
+    waits = []
+    gate = PhaseGate(proc, DiskSlot(1, tmp_path), on_wait=lambda: waits.append(1), max_wait=0.5)
+    try:
+        gate.phase("allocate")
+    finally:
+        busy.release()
+
+    assert not gate.slot.held
+    assert gate.unthrottled == 1
+    assert 0.5 <= gate.waited < 5
+    assert waits
+    assert proc.poll() is None
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import threading
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from utils import httpdownload
+from utils.httpdownload import DirectFile, DownloadStopped, HttpDownloader, plan_segments
+
+MB = 1024 * 1024
+
+
+class _Server:
+    """A file server on its own event loop that records the ranges asked for."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.ignore_range = False
+        self.ranges: list[str | None] = []
+        self.served = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        header = request.headers.get("Range")
+        self.ranges.append(header)
+        if header and not self.ignore_range:
+            start, _, end = header.removeprefix("bytes=").partition("-")
+            body, status = self.data[int(start):int(end) + 1], 206
+        else:
+            body, status = self.data, 200
+        self.served += len(body)
+        return web.Response(body=body, status=status)
+
+    async def _start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/files/mod.bin", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/files/mod.bin"
+
+    def start(self) -> str:
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def data():
+    return os.urandom(40 * 1024)
+
+
+@pytest.fixture
+def server(data):
+    server = _Server(data)
+    server.url = server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    # Small segments so a 40 KiB file is split like a large one.
+    monkeypatch.setattr(httpdownload, "SEGMENT_MIN_BYTES", 8 * 1024)
+    downloader = HttpDownloader()
+    yield downloader
+    downloader.close()
+
+
+def test_plan_segments_covers_the_file():
+    assert plan_segments(0) == [[0, 0, 0]]
+    assert plan_segments(MB) == [[0, MB, 0]]
+
+    size = 100 * MB + 3
+    segments = plan_segments(size)
+    assert len(segments) == httpdownload.MAX_SEGMENTS
+    assert segments[0][0] == 0 and segments[-1][1] == size
+    assert all(a[1] == b[0] for a, b in zip(segments, segments[1:]))
+    assert all(done == 0 for _, _, done in segments)
+
+
+@pytest.mark.parametrize(("details", "expected"), [
+    (None, None),
+    ({"file_url": ""}, None),
+    ({"file_url": "ftp://host/x.bin"}, None),
+    (
+        {"file_url": "https://host/a/b.bin", "filename": "mods\\Cool Mod.zip", "file_size": "12"},
+        DirectFile("https://host/a/b.bin", 12, "Cool Mod.zip"),
+    ),
+    (
+        {"file_url": "https://host/a/my%20file.bin", "file_size": "n/a"},
+        DirectFile("https://host/a/my%20file.bin", 0, "my file.bin"),
+    ),
+])
+def test_direct_file_from_details(details, expected):
+    assert DirectFile.from_details(details) == expected
+
+
+def test_segmented_download(server, downloader, data, tmp_path):
+    progress = []
+    file = DirectFile(server.url, len(data), "mod.bin")
+
+    target = downloader.download(file, tmp_path, progress=lambda done, total: progress.append((done, total)))
+
+    assert target == tmp_path / "mod.bin"
+    assert target.read_bytes() == data
+    assert len(server.ranges) == 4 and all(server.ranges)
+    assert progress[-1] == (len(data), len(data))
+    assert not (tmp_path / "mod.bin.part").exists()
+    assert not (tmp_path / "mod.bin.part.json").exists()
+
+
+def test_server_ignoring_ranges_falls_back_to_one_stream(server, downloader, data, tmp_path):
+    server.ignore_range = True
+    target = downloader.download(DirectFile(server.url, len(data), "mod.bin"), tmp_path)
+
+    assert target.read_bytes() == data
+    assert server.ranges[-1] is None
+
+
+def test_resume_fetches_only_the_missing_bytes(server, downloader, data, tmp_path):
+    half = len(data) // 2
+    part = tmp_path / "mod.bin.part"
+    part.write_bytes(data[:half] + b"\0" * (len(data) - half))
+    (tmp_path / "mod.bin.part.json").write_text(json.dumps({
+        "url": server.url,
+        "size": len(data),
+        "segments": [[0, len(data), half]],
+    }))
+
+    target = downloader.download(DirectFile(server.url, len(data), "mod.bin"), tmp_path)
+
+    assert target.read_bytes() == data
+    assert server.ranges == [f"bytes={half}-{len(data) - 1}"]
+    assert server.served == len(data) - half
+
+
+def test_state_of_another_file_is_not_resumed(server, downloader, data, tmp_path):
+    (tmp_path / "mod.bin.part").write_bytes(b"x" * len(data))
+    (tmp_path / "mod.bin.part.json").write_text(json.dumps({
+        "url": "http://elsewhere/mod.bin",
+        "size": len(data),
+        "segments": [[0, len(data), len(data)]],
+    }))
+
+    target = downloader.download(DirectFile(server.url, len(data), "mod.bin"), tmp_path)
+    assert target.read_bytes() == data
+
+
+def test_short_response_keeps_the_part_file(server, downloader, data, tmp_path, monkeypatch):
+    monkeypatch.setattr(httpdownload, "SEGMENT_RETRIES", 0)
+    file = DirectFile(server.url, len(data) + 10, "mod.bin")
+
+    with pytest.raises(aiohttp.ClientPayloadError):
+        downloader.download(file, tmp_path)
+
+    assert not (tmp_path / "mod.bin").exists()
+    assert (tmp_path / "mod.bin.part").exists()
+
+
+def test_stop_keeps_the_part_file(server, downloader, data, tmp_path):
+    stop = threading.Event()
+    stop.set()
+
+    with pytest.raises(DownloadStopped):
+        downloader.download(DirectFile(server.url, len(data), "mod.bin"), tmp_path, stop=stop)
+    assert (tmp_path / "mod.bin.part").exists()
+
+
+def test_unknown_size_drops_a_leftover_part(server, downloader, data, tmp_path):
+    (tmp_path / "mod.bin.part").write_bytes(b"stale" * len(data))
+
+    target = downloader.download(DirectFile(server.url, 0, "mod.bin"), tmp_path)
+
+    assert target.read_bytes() == data
+    assert server.ranges == [None]
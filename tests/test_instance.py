@@ -0,0 +1,70 @@
+import socket
+import sys
+import uuid
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from utils.instance import InstanceServer, send_to_running  # noqa: E402
+
+
+@pytest.fixture
+def name():
+    return f"PyShopDL-test-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def server(qapp, name):
+    server = InstanceServer(name)
+    assert server.listen()
+    yield server
+    server.close()
+
+
+def test_nothing_to_forward_to(qapp, name):
+    assert not send_to_running(["1"], name)
+
+
+def test_ids_from_several_launches_arrive_as_one_batch(server, name, wait_until):
+    batches = []
+    server.received.connect(batches.append)
+
+    assert send_to_running(["111", " 222 "], name)
+    assert send_to_running([], name)
+    assert send_to_running(["333"], name)
+
+    assert wait_until(lambda: batches)
+    assert batches == [["111", "222", "333"]]
+
+
+def test_launch_without_ids_only_activates(server, name, wait_until):
+    batches = []
+    server.received.connect(batches.append)
+
+    assert send_to_running([], name)
+    assert wait_until(lambda: batches) == [[]]
+
+
+def test_second_instance_does_not_take_the_name(server, name):
+    other = InstanceServer(name)
+    assert not other.listen()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="named pipes leave no file behind")
+def test_stale_socket_file_is_replaced(qapp, name):
+    first = InstanceServer(name)
+    assert first.listen()
+    path = first._server.fullServerName()
+    first.close()
+
+    # A crashed instance leaves its socket file with nobody listening.
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    second = InstanceServer(name)
+    try:
+        assert second.listen()
+    finally:
+        second.close()
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from utils import joblog
+from utils.joblog import JobLog, prune, read_tail
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = JobLog("111", tmp_path)
+    yield log
+    log.close()
+
+
+def test_lines_since_follows_the_ring(tmp_path, monkeypatch):
+    monkeypatch.setattr(joblog, "RING_LINES", 3)
+    log = JobLog("111", tmp_path)
+
+    for i in range(2):
+        log.write(f"line {i}\r\n")
+    assert log.lines_since(0) == (["line 0", "line 1"], 2)
+    assert log.lines_since(2) == ([], 2)
+
+    for i in range(2, 7):
+        log.write(f"line {i}")
+    # A reader that fell behind gets what is left in the ring.
+    assert log.lines_since(2) == (["line 4", "line 5", "line 6"], 7)
+    assert log.lines_since(5) == (["line 5", "line 6"], 7)
+    assert log.last_line == "line 6"
+
+
+def test_file_rotates_by_bytes(log, monkeypatch):
+    monkeypatch.setattr(joblog, "MAX_FILE_BYTES", 100)
+    log.open()
+    for i in range(40):
+        log.write(f"é{i:02d}")  # 5 bytes plus newline, 4 characters
+    log.close()
+
+    backups = sorted(p.name for p in log.path.parent.iterdir())
+    assert backups == ["111.log", "111.log.1", "111.log.2"]
+    assert all(p.stat().st_size <= 106 for p in log.path.parent.iterdir())
+    assert read_tail(log.path)[-1] == "é39"
+
+
+def test_read_tail_skips_a_partial_first_line(tmp_path):
+    path = tmp_path / "1.log"
+    path.write_text("".join(f"line {i}\n" for i in range(100)))
+
+    lines = read_tail(path, max_bytes=20)
+    assert lines == ["line 98", "line 99"]
+    assert read_tail(tmp_path / "missing.log") == []
+
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_prune_by_age_and_total_size(tmp_path):
+    for name, size, age in (("1.log", 10, 0), ("2.log", 10, 10), ("2.log.1", 10, 20),
+                            ("3.log", 10, 100), ("notes.txt", 10, 100)):
+        (tmp_path / name).write_bytes(b"x" * size)
+        _age(tmp_path / name, age)
+
+    assert prune(tmp_path, max_age=50, max_total=25) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1.log", "2.log", "notes.txt"]
+
+
+def test_prune_keeps_logs_of_running_jobs(tmp_path, log):
+    log.open()
+    log.write("running")
+    log.flush()
+    log.path.with_name("111.log.1").write_text("older run")
+    other = tmp_path / "222.log"
+    other.write_text("done")
+    for path in (log.path, log.path.with_name("111.log.1"), other):
+        _age(path, 1000)
+
+    assert prune(tmp_path, max_age=10) == 1
+    assert log.path.exists() and log.path.with_name("111.log.1").exists()
+    assert not other.exists()
+
+    log.close()
+    assert prune(tmp_path, max_age=10) == 2
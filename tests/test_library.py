@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+
+from utils.library import LibraryIndex
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "depots"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def index(tmp_path, root):
+    index = LibraryIndex(tmp_path / "library.db", root)
+    yield index
+    index.close()
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+def _bump(path):
+    # Make sure the directory mtime moves even on coarse filesystem clocks.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _entries(index):
+    return {entry.folder: (entry.workshop_id, entry.game, entry.files, entry.size_bytes)
+            for entry in index.entries()}
+
+
+def test_items_are_summed_from_their_directories(root, index):
+    _write(root / "111" / "a.bin", 10)
+    _write(root / "111" / "sub" / "b.bin", 5)
+    _write(root / "222" / "c.bin", 7)
+
+    result = index.scan()
+
+    assert (result.directories, result.listed, result.removed) == (4, 4, 0)
+    assert _entries(index) == {"111": ("111", "", 2, 15), "222": ("222", "", 1, 7)}
+
+
+def test_unchanged_rescan_lists_nothing(root, index):
+    _write(root / "111" / "sub" / "a.bin", 10)
+    index.scan()
+
+    result = index.scan()
+    assert (result.directories, result.listed, result.removed) == (3, 0, 0)
+    assert _entries(index) == {"111": ("111", "", 1, 10)}
+
+
+def test_added_and_removed_folders(root, index):
+    _write(root / "111" / "a.bin", 10)
+    _write(root / "222" / "b.bin", 20)
+    index.scan()
+
+    shutil.rmtree(root / "111")
+    _write(root / "333" / "c.bin", 30)
+    _bump(root)
+    result = index.scan()
+
+    assert result.removed == 1
+    assert result.listed == 2  # the root and the new folder
+    assert _entries(index) == {"222": ("222", "", 1, 20), "333": ("333", "", 1, 30)}
+
+
+def test_grouped_downloads_are_items_of_their_game(root, index):
+    _write(root / "Some Game" / "111" / "a.bin", 10)
+    _write(root / "Some Game" / "Cool Mod" / "b.bin", 20)
+    _write(root / "222" / "c.bin", 30)
+
+    index.scan()
+
+    assert _entries(index) == {
+        "222": ("222", "", 1, 30),
+        "Some Game/111": ("111", "Some Game", 1, 10),
+        "Some Game/Cool Mod": ("", "Some Game", 1, 20),
+    }
+
+
+def test_renamed_folder_maps_back_to_its_id(root, index):
+    _write(root / "Cool Mod" / "a.bin", 10)
+    index.scan()
+    assert _entries(index)["Cool Mod"][0] == ""
+
+    index.record_folder(root / "Cool Mod", "111")
+    index.scan()
+    assert _entries(index)["Cool Mod"][0] == "111"
+
+
+def test_record_folder_rereads_files_rewritten_in_place(root, index):
+    _write(root / "111" / "sub" / "a.bin", 10)
+    index.scan()
+
+    # Same names, new sizes: no directory mtime changes.
+    _write(root / "111" / "sub" / "a.bin", 25)
+    assert index.scan().listed == 0
+    assert _entries(index)["111"][3] == 10
+
+    index.record_folder("111", "111")
+    assert index.scan().listed == 2
+    assert _entries(index)["111"][3] == 25
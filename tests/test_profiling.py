@@ -0,0 +1,73 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import profiling
+from utils.profiling import Profiler
+
+
+def _spin(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+    return "done"
+
+
+def _in_thread(fn, *args):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Profiler("tracing", tmp_path)
+
+
+def test_profiled_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(profiling, "_profiler", None)
+    assert profiling.profiled("verify")(_spin)(0) == "done"
+    assert profiling.dump() is None
+
+
+def test_worker_threads_get_a_profile_per_role(tmp_path):
+    profiler = Profiler("deterministic", tmp_path)
+
+    for _ in range(2):
+        assert _in_thread(profiler.run_profiled, "verify", _spin, 0.01) == "done"
+    summary = profiler.dump().read_text()
+
+    assert [p.name.split("-")[-1] for p in tmp_path.glob("*.prof")] == ["verify.prof"]
+    assert "=== verify ===" in summary and "_spin" in summary
+
+
+def test_sampling_attributes_frames_to_thread_roles(tmp_path):
+    profiler = Profiler("sampling", tmp_path)
+    profiler.start()
+    try:
+        _in_thread(profiler.run_profiled, "dedupe", _spin, 0.3)
+    finally:
+        profiler.stop()
+    summary = profiler.dump().read_text()
+
+    assert "=== dedupe (" in summary
+    assert "(_spin)" in summary
+
+
+def test_profiles_that_cannot_start_are_reported(tmp_path, monkeypatch):
+    class Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling, "cProfile", SimpleNamespace(Profile=Busy))
+    profiler = Profiler("deterministic", tmp_path)
+
+    assert _in_thread(profiler.run_profiled, "archive", _spin, 0) == "done"
+    summary = profiler.dump().read_text()
+
+    assert "=== not profiled ===" in summary
+    assert "archive: 1 call(s)" in summary
@@ -0,0 +1,49 @@
+import pytest
+
+from utils.queuefile import METADATA_MAX_AGE_SECONDS, QueueRecord, format_of, iter_records, write_records
+
+RECORDS = [
+    QueueRecord("111", "Über Mod, \"quoted\"", 1024, "294100", "RimWorld", "Ready", 0, 1_700_000_000.5),
+    QueueRecord("222", priority=1),
+]
+
+
+@pytest.mark.parametrize("name", ["queue.jsonl", "queue.csv"])
+def test_round_trip(tmp_path, name):
+    path = tmp_path / name
+    assert write_records(path, iter(RECORDS)) == 2
+    assert list(iter_records(path)) == RECORDS
+    assert not (tmp_path / (name + ".part")).exists()
+
+
+def test_bad_lines_and_plain_ids(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    path.write_text(
+        '333\n'
+        'not json\n'
+        '{"workshop_id": "abc"}\n'
+        '[1, 2]\n'
+        '\n'
+        '{"workshop_id": 444, "size_bytes": "oops"}\n'
+        '{"workshop_id": "555", "name": "ok"}\n',
+        encoding="utf-8",
+    )
+    assert [r.workshop_id for r in iter_records(path)] == ["333", "555"]
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        format_of(tmp_path / "queue.txt")
+
+
+def test_staleness():
+    record = QueueRecord("1", name="n", app_id="4000", fetched_at=1000.0)
+    assert record.has_metadata
+    assert not record.is_stale(now=1000.0 + METADATA_MAX_AGE_SECONDS)
+    assert record.is_stale(now=1000.0 + METADATA_MAX_AGE_SECONDS + 1)
+    assert QueueRecord("1").is_stale()
+
+
+def test_metadata_needs_a_name_and_numeric_app_id():
+    assert not QueueRecord("1", name="n", app_id="None").has_metadata
+    assert not QueueRecord("1", app_id="4000").has_metadata
@@ -0,0 +1,173 @@
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt  # noqa: E402
+
+from tab.QueueModel import (  # noqa: E402
+    COL_ID,
+    COL_NAME,
+    COL_NO,
+    COL_SIZE,
+    COL_STATUS,
+    COLUMNS,
+    QueueFilterProxy,
+    QueueModel,
+)
+
+
+@pytest.fixture
+def model(qapp):
+    return QueueModel()
+
+
+@pytest.fixture
+def proxy(model):
+    proxy = QueueFilterProxy()
+    proxy.setSourceModel(model)
+    return proxy
+
+
+def _fill(model, rows):
+    keys = []
+    for workshop_id, fields in rows:
+        key = model.add(workshop_id)
+        model.update(key, **fields)
+        keys.append(key)
+    model.flush()
+    return keys
+
+
+def _changes(model):
+    seen = []
+    model.dataChanged.connect(
+        lambda top, bottom, *_: seen.append((top.row(), bottom.row(), top.column(), bottom.column()))
+    )
+    return seen
+
+
+def _view(proxy, column=COL_ID):
+    return [proxy.index(row, column).data() for row in range(proxy.rowCount())]
+
+
+def test_updates_within_a_frame_are_painted_together(model, wait_until):
+    keys = [model.add(str(n)) for n in range(5)]
+    seen = _changes(model)
+    flushed = []
+    model.flushed.connect(lambda: flushed.append(True))
+
+    model.update(keys[3], status="Queue")
+    model.update(keys[1], status="Queue")
+    model.update(keys[3], status="Process")
+    assert seen == []  # nothing until the frame ends
+
+    assert wait_until(lambda: flushed)
+    assert seen == [(1, 3, 0, len(COLUMNS) - 1)]
+    assert model.item(keys[3]).status == "Process"
+
+
+def test_flush_skips_rows_removed_in_the_meantime(model):
+    keys = [model.add(str(n)) for n in range(3)]
+    model.update(keys[2], status="Queue")
+    model.remove(keys[2])
+    seen = _changes(model)
+
+    model.flush()
+    assert seen == []
+    assert model.row_of(keys[1]) == 1
+
+
+# ---- search, facets and sorting -------------------------------------------
+
+ROWS = [
+    ("10", {"name": "Blue Tank", "size_bytes": 2048, "status": "Queue"}),
+    ("9", {"name": "Red Tank", "size_bytes": 10, "status": "Error"}),
+    ("300", {"name": "Blue Plane", "size_bytes": 1 << 20, "status": "Held"}),
+    ("42", {"name": "Green Boat", "size_bytes": 512, "status": "Complete"}),
+]
+
+
+def test_every_search_token_must_match(model, proxy):
+    _fill(model, ROWS)
+
+    proxy.set_filter_text("  BLUE tank ")
+    assert _view(proxy) == ["10"]
+
+    proxy.set_filter_text("tank")
+    assert _view(proxy) == ["10", "9"]
+
+    proxy.set_filter_text("")
+    assert proxy.rowCount() == len(ROWS)
+
+
+def test_facet_covers_its_statuses(model, proxy):
+    keys = _fill(model, ROWS)
+
+    proxy.set_facet("Queue")
+    assert _view(proxy) == ["10", "300"]
+
+    proxy.set_filter_text("plane")
+    assert _view(proxy) == ["300"]
+
+    proxy.set_facet(None)
+    proxy.set_filter_text("")
+    assert proxy.rowCount() == len(ROWS)
+
+    assert model.facet_counts() == {"Ready": 0, "Queue": 2, "Error": 1, "Complete": 1}
+    model.update(keys[1], status="Ready")
+    model.remove(keys[2])
+    assert model.facet_counts() == {"Ready": 1, "Queue": 1, "Error": 0, "Complete": 1}
+
+
+def test_search_follows_updated_fields(model, proxy):
+    keys = _fill(model, ROWS)
+    proxy.set_filter_text("yellow")
+    assert proxy.rowCount() == 0
+
+    model.update(keys[3], name="Yellow Boat")
+    proxy.invalidate()
+    assert _view(proxy) == ["42"]
+
+
+def test_sort_uses_raw_values(model, proxy):
+    _fill(model, ROWS)
+
+    proxy.sort(COL_SIZE, Qt.AscendingOrder)
+    assert _view(proxy) == ["9", "42", "10", "300"]  # bytes, not "2.0 KB" < "512 B"
+
+    proxy.sort(COL_ID, Qt.AscendingOrder)
+    assert _view(proxy) == ["9", "10", "42", "300"]  # numbers, not text
+
+    proxy.sort(COL_STATUS, Qt.DescendingOrder)
+    assert _view(proxy) == ["9", "42", "300", "10"]
+
+    proxy.sort(COL_NAME, Qt.AscendingOrder)
+    assert _view(proxy, COL_NAME) == ["Blue Plane", "Blue Tank", "Green Boat", "Red Tank"]
+
+
+def test_sorting_leaves_the_queue_order_alone(model, proxy):
+    _fill(model, ROWS)
+
+    proxy.sort(COL_SIZE, Qt.AscendingOrder)
+    assert [item.workshop_id for item in model.items()] == ["10", "9", "300", "42"]
+    # "No" is still the queue position of each row.
+    assert _view(proxy, COL_NO) == ["2", "4", "1", "3"]
+
+    proxy.sort(COL_NO, Qt.AscendingOrder)
+    assert _view(proxy) == ["10", "9", "300", "42"]
+
+
+def test_move_puts_the_row_at_the_given_position(model):
+    keys = _fill(model, ROWS)
+    seen = _changes(model)
+
+    model.move(keys[0], 2)
+    assert [item.workshop_id for item in model.items()] == ["9", "300", "10", "42"]
+    assert [model.row_of(key) for key in keys] == [2, 0, 1, 3]
+    assert seen == [(0, 2, COL_NO, COL_NO)]
+
+    model.move(keys[3], 0)
+    assert [item.workshop_id for item in model.items()] == ["42", "9", "300", "10"]
+
+    model.move(keys[1], 99)  # clamped to the end
+    assert model.row_of(keys[1]) == 3
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtGui import QImage  # noqa: E402
+
+from tab import Thumbnails  # noqa: E402
+from tab.Thumbnails import THUMB_SIZE, ThumbnailCache, _DiskCache, _png_bytes  # noqa: E402
+
+PREVIEW = "https://images.example/preview.jpg"
+
+
+@pytest.fixture
+def visible():
+    return {1, 2}
+
+
+@pytest.fixture
+def urls():
+    return {"111": PREVIEW, "222": ""}
+
+
+@pytest.fixture
+def thumbs(qapp, tmp_path, visible, urls):
+    cache = ThumbnailCache(urls.get, lambda: visible, cache_dir=tmp_path / "thumbs")
+    yield cache
+    cache.close()
+
+
+def _png(color=Qt.red):
+    image = QImage(THUMB_SIZE, THUMB_SIZE, QImage.Format_RGB32)
+    image.fill(color)
+    return _png_bytes(image)
+
+
+def test_disk_cache_round_trip_and_eviction(tmp_path):
+    disk = _DiskCache(tmp_path, budget=1000)
+    assert disk.read("a") is None
+
+    for i, name in enumerate("abc"):
+        disk.write(name, b"x" * 300)
+        os.utime(disk._file(name), (1000 + i, 1000 + i))
+    assert disk.read("a") is not None  # reading counts as a use
+
+    # Over budget: the least recently used go until 90% is left.
+    disk.write("d", b"x" * 300)
+    assert [disk.read(name) is not None for name in "abcd"] == [True, False, True, True]
+
+
+def test_visible_row_is_loaded_from_the_disk_cache(thumbs, tmp_path, wait_until):
+    _DiskCache(tmp_path / "thumbs", 10**6).write(PREVIEW, _png())
+    ready = []
+    thumbs.ready.connect(ready.append)
+
+    assert thumbs.get(1, "111") is None
+    assert wait_until(lambda: ready) == [1]
+
+    pixmap = thumbs.get(1, "111")
+    assert pixmap is not None and pixmap.width() == THUMB_SIZE
+
+
+def test_rows_scrolled_away_are_not_fetched(thumbs, visible, urls, wait_until):
+    asked = []
+    thumbs._url_for = lambda workshop_id: asked.append(workshop_id) or urls.get(workshop_id)
+
+    thumbs.get(5, "111")
+    assert not wait_until(lambda: asked, timeout=0.5)
+    assert not thumbs._wanted
+
+
+def test_item_without_preview_is_not_asked_again(thumbs, wait_until):
+    thumbs.get(2, "222")
+    assert wait_until(lambda: "222" in thumbs._missing)
+
+    thumbs.get(2, "222")
+    assert not thumbs._wanted
+
+
+def test_row_without_details_asks_again_later(thumbs, urls, wait_until):
+    thumbs.get(1, "333")
+    assert wait_until(lambda: not thumbs._wanted)
+    assert "333" not in thumbs._missing
+
+    thumbs.get(1, "333")
+    assert "333" in thumbs._wanted
+
+
+def test_failed_load_is_retried_after_a_delay(thumbs, urls, monkeypatch, wait_until):
+    monkeypatch.setattr(Thumbnails, "RETRY_DELAY_SECONDS", 0.2)
+    urls["111"] = "http://127.0.0.1:9/preview.jpg"  # nothing listens there
+    ready = []
+    thumbs.ready.connect(ready.append)
+
+    thumbs.get(1, "111")
+    assert wait_until(lambda: "111" in thumbs._failed)
+    thumbs.get(1, "111")
+    assert "111" not in thumbs._wanted  # still backing off
+
+    assert wait_until(lambda: ready) == [1]
+    thumbs.get(1, "111")
+    assert "111" in thumbs._wanted
@@ -0,0 +1,89 @@
+import json
+import threading
+
+import pytest
+
+from utils import tracing
+
+
+@pytest.fixture
+def trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    path = tmp_path / "trace.json"
+    tracing.enable(path)
+    return path
+
+
+def _events(path):
+    tracing.flush()
+    return json.loads(path.read_text())["traceEvents"]
+
+
+def test_disabled_calls_are_no_ops(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.delenv(tracing.ENV_VAR, raising=False)
+
+    with tracing.span("work") as span:
+        span.end(extra=1)
+    tracing.instant("tick")
+    tracing.begin_async("wait", "1")
+    tracing.flush()
+    assert not tracing.enabled()
+
+
+def test_spans_and_instants_are_recorded(trace):
+    with tracing.span("verify", "disk", item="1"):
+        pass
+    span = tracing.span("download", "net").start()
+    span.end(ok=True)
+    with pytest.raises(RuntimeError):
+        with tracing.span("boom"):
+            raise RuntimeError("no")
+    tracing.instant("scheduler.hold", "scheduler", key=3)
+
+    events = [e for e in _events(trace) if e["ph"] != "M"]
+    assert [(e["name"], e["ph"]) for e in events] == [
+        ("verify", "X"), ("download", "X"), ("boom", "X"), ("scheduler.hold", "i"),
+    ]
+    assert events[0]["args"] == {"item": "1"} and events[0]["dur"] >= 0
+    assert events[1]["args"] == {"ok": True}
+    assert "RuntimeError" in events[2]["args"]["error"]
+
+
+def test_async_spans_pair_up_across_threads(trace):
+    tracing.begin_async("queue.wait", "7", "scheduler")
+    thread = threading.Thread(target=tracing.end_async, args=("queue.wait", "7", "scheduler"), name="worker")
+    thread.start()
+    thread.join()
+
+    events = _events(trace)
+    waits = [e for e in events if e["name"] == "queue.wait"]
+    assert [(e["ph"], e["id"]) for e in waits] == [("b", "7"), ("e", "7")]
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert {"MainThread", "worker"} <= names
+
+
+def test_configure_reads_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setenv(tracing.ENV_VAR, str(tmp_path / "env.json"))
+
+    assert tracing.configure()
+    tracing.instant("x")
+    tracing.flush()
+    assert (tmp_path / "env.json").is_file()
+
+
+def test_events_from_many_threads_survive_concurrent_flushes(trace):
+    def emit():
+        for i in range(2000):
+            tracing.instant("tick", n=i)
+
+    threads = [threading.Thread(target=emit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        tracing.flush()
+    for thread in threads:
+        thread.join()
+
+    assert sum(e["name"] == "tick" for e in _events(trace)) == 8 * 2000
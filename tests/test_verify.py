@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from utils.verify import HashIndex, verify_item
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = HashIndex(tmp_path / "hashes.db")
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "item"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "a.txt").write_text("one")
+    (folder / "sub" / "b.txt").write_text("two")
+    return folder
+
+
+def _rewrite(path, text):
+    st = path.stat()
+    path.write_text(text)
+    # Make sure the mtime moves even on coarse filesystem clocks.
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_unchanged_files_are_not_hashed_again(index, folder):
+    first = verify_item("1", folder, index, record=True)
+    assert (first.files, first.hashed) == (2, 2)
+
+    second = verify_item("1", folder, index)
+    assert second.ok
+    assert (second.files, second.hashed) == (2, 0)
+
+
+def test_changed_content_is_reported_and_not_recorded(index, folder):
+    verify_item("1", folder, index, record=True)
+    before = index.content_hash("1")
+
+    _rewrite(folder / "a.txt", "ONE")
+    result = verify_item("1", folder, index)
+
+    assert result.hashed == 1
+    assert result.changed == ["a.txt"]
+    assert not result.ok
+    assert index.content_hash("1") == before
+
+
+def test_touched_but_identical_file_is_ok(index, folder):
+    verify_item("1", folder, index, record=True)
+    _rewrite(folder / "a.txt", "one")
+
+    result = verify_item("1", folder, index)
+    assert result.ok and result.hashed == 1
+    assert verify_item("1", folder, index).hashed == 0
+
+
+def test_missing_file_is_reported(index, folder):
+    verify_item("1", folder, index, record=True)
+    (folder / "sub" / "b.txt").unlink()
+
+    result = verify_item("1", folder, index)
+    assert result.missing == ["sub/b.txt"]
+    assert not result.ok
+
+
+def test_record_accepts_new_content(index, folder):
+    verify_item("1", folder, index, record=True)
+    before = index.content_hash("1")
+
+    _rewrite(folder / "a.txt", "ONE")
+    result = verify_item("1", folder, index, record=True)
+
+    assert result.ok and result.hashed == 1
+    assert index.content_hash("1") != before
+
+
+def test_depot_downloader_folder_is_ignored(index, folder):
+    (folder / ".DepotDownloader").mkdir()
+    (folder / ".DepotDownloader" / "manifest").write_text("x")
+
+    assert verify_item("1", folder, index, record=True).files == 2
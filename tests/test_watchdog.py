@@ -0,0 +1,77 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.watchdog import StallWatchdog, folder_activity
+
+
+@pytest.fixture
+def proc():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield proc
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+
+
+def _run_for(watchdog, seconds, tick=None):
+    deadline = time.monotonic() + seconds
+    with watchdog:
+        while time.monotonic() < deadline and watchdog.proc.poll() is None:
+            if tick is not None:
+                tick()
+            time.sleep(0.05)
+
+
+def test_silent_process_is_killed(proc, tmp_path):
+    watchdog = StallWatchdog(proc, tmp_path, output_timeout=0.4, growth_timeout=60)
+    _run_for(watchdog, 5)
+
+    assert watchdog.stalled.startswith("no output or disk activity")
+    assert proc.wait(timeout=10) is not None
+
+
+def test_silent_but_writing_is_not_a_stall(proc, tmp_path):
+    watchdog = StallWatchdog(proc, tmp_path, output_timeout=0.4, growth_timeout=60)
+    target = tmp_path / "big.bin"
+
+    def write():
+        with target.open("ab") as f:
+            f.write(b"x" * 8192)
+
+    _run_for(watchdog, 1.5, tick=write)
+    assert watchdog.stalled is None
+    assert proc.poll() is None
+
+
+def test_output_without_disk_growth_is_a_stall(proc, tmp_path):
+    watchdog = StallWatchdog(proc, tmp_path, output_timeout=60, growth_timeout=0.4)
+    _run_for(watchdog, 5, tick=watchdog.touch)
+
+    assert watchdog.stalled.startswith("no disk activity")
+    assert proc.wait(timeout=10) is not None
+
+
+def test_hold_keeps_a_paused_process_alive(proc, tmp_path):
+    watchdog = StallWatchdog(proc, tmp_path, output_timeout=0.4, growth_timeout=0.4)
+    _run_for(watchdog, 1.5, tick=lambda: watchdog.touch(hold=True))
+
+    assert watchdog.stalled is None
+    assert proc.poll() is None
+
+
+def test_finished_process_is_left_alone(tmp_path):
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    watchdog = StallWatchdog(proc, tmp_path, output_timeout=0.1, growth_timeout=0.1)
+    _run_for(watchdog, 0.5)
+    assert watchdog.stalled is None
+
+
+def test_folder_activity_sees_new_files(tmp_path):
+    before = folder_activity(tmp_path)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "f.bin").write_bytes(b"x" * 10000)
+    assert folder_activity(tmp_path) != before
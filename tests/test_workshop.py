@@ -0,0 +1,19 @@
+import pytest
+
+from utils.workshop import parse_workshop_id
+
+
+@pytest.mark.parametrize(("text", "expected"), [
+    ("2503622437", "2503622437"),
+    ("  2503622437\n", "2503622437"),
+    ("https://steamcommunity.com/sharedfiles/filedetails/?id=2503622437", "2503622437"),
+    ("https://steamcommunity.com/sharedfiles/filedetails/?l=english&id=2503622437&searchtext=", "2503622437"),
+    ("https://steamcommunity.com/workshop/filedetails/?ID=123456789", "123456789"),
+    ("steam://url/CommunityFilePage/123456789", "123456789"),
+    ("", None),
+    ("12a4", None),
+    ("https://steamcommunity.com/app/294100/workshop/", None),
+    ("https://example.com/?uid=5", None),
+])
+def test_parse_workshop_id(text, expected):
+    assert parse_workshop_id(text) == expected
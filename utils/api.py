@@ -0,0 +1,375 @@
+"""Local HTTP/JSON API for automation and monitoring.
+
+The server runs its own asyncio loop in a background thread, so neither
+the Qt event loop nor a slow client can block the other. Reads come from
+a :class:`Snapshot` that the GUI thread keeps up to date. Commands are
+handed to an ``execute(name, args)`` callback that must return a
+``concurrent.futures.Future`` completed on the GUI thread.
+
+Every request needs the token, as ``Authorization: Bearer <token>``, an
+``X-PyShopDL-Token`` header, or a ``?token=`` query parameter (the only
+option for ``EventSource`` clients).
+
+Endpoints::
+
+    GET    /api/status              counts, paused flag, running item
+    GET    /api/queue[?status=...]  rows in queue order
+    POST   /api/queue               {"ids": [...]} add workshop IDs
+    GET    /api/items/{key}         one row
+    DELETE /api/items/{key}         remove a row
+    POST   /api/items/{key}/top     move a row to the top
+    POST   /api/items/{key}/move    {"index": n} move a row to position n
+    POST   /api/items/{key}/retry   retry a failed row
+    POST   /api/items/{key}/cancel  stop or unqueue a row
+    POST   /api/start               queue every Ready/Error row and start
+    POST   /api/pause               pause the queue and the running download
+    POST   /api/resume              resume it
+    GET    /api/completed           completed rows
+    GET    /api/events              NDJSON stream (SSE with
+                                    ``Accept: text/event-stream``)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable
+
+from aiohttp import web
+
+from . import downloader as depot_downloader
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+TOKEN_FILE_NAME = "api_token"
+
+# Events buffered per client; a client that falls further behind loses
+# the oldest ones instead of growing memory.
+EVENT_QUEUE_SIZE = 1000
+HEARTBEAT_SECONDS = 15
+
+Execute = Callable[[str, dict], Future]
+
+
+def load_token(token: str | None = None) -> str:
+    """Return ``token``, or the one stored in ``cache/api_token``.
+
+    A random token is created on first use.
+    """
+
+    if token:
+        return token
+
+    path = depot_downloader.get_cache_dir() / TOKEN_FILE_NAME
+    try:
+        stored = path.read_text(encoding="utf-8").strip()
+        if stored:
+            return stored
+    except OSError:
+        pass
+
+    token = secrets.token_urlsafe(24)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(token, encoding="utf-8")
+    try:
+        os.chmod(path, 0o600)
+    except OSError:
+        pass
+    return token
+
+
+class Snapshot:
+    """Thread-safe copy of the queue for readers off the GUI thread.
+
+    Rows are replaced, never mutated, so a reader can keep using the dicts
+    it got after the lock is released.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows: dict[int, dict] = {}
+        self._order: list[int] = []
+        self._state: dict = {"paused": False, "current": None}
+
+    def put(self, key: int, row: dict) -> None:
+        with self._lock:
+            if key not in self._rows:
+                self._order.append(key)
+            self._rows[key] = row
+
+    def remove(self, key: int) -> None:
+        with self._lock:
+            if self._rows.pop(key, None) is not None:
+                self._order.remove(key)
+
+    def set_order(self, keys: list[int]) -> None:
+        with self._lock:
+            self._order = [key for key in keys if key in self._rows]
+
+    def set_state(self, **state) -> None:
+        with self._lock:
+            self._state.update(state)
+
+    def get(self, key: int) -> dict | None:
+        with self._lock:
+            return self._rows.get(key)
+
+    def rows(self, statuses: set[str] | None = None) -> list[dict]:
+        with self._lock:
+            rows = [self._rows[key] for key in self._order]
+        if statuses:
+            rows = [row for row in rows if row["status"] in statuses]
+        return rows
+
+    def status(self) -> dict:
+        with self._lock:
+            counts = Counter(row["status"] for row in self._rows.values())
+            state = dict(self._state)
+        return {"total": sum(counts.values()), "counts": dict(counts), **state}
+
+
+class EventHub:
+    """Fans events out from any thread to the subscribers of one loop."""
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+        self._seq = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def publish(self, event: str, **data) -> None:
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+
+        self._seq += 1
+        message = {"event": event, "seq": self._seq, "time": time.time(), **data}
+        try:
+            loop.call_soon_threadsafe(self._dispatch, message)
+        except RuntimeError:  # loop already closed
+            pass
+
+    def _dispatch(self, message: dict) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+
+class ApiServer:
+    def __init__(
+        self,
+        execute: Execute,
+        snapshot: Snapshot,
+        hub: EventHub,
+        token: str,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        self._execute = execute
+        self.snapshot = snapshot
+        self.hub = hub
+        self.token = token
+        self.host = host
+        self.port = port
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+
+    # ---- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        """Start serving in a background thread; raise if binding failed."""
+
+        self._thread = threading.Thread(target=self._serve, name="api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _serve(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self.hub.attach(loop)
+
+        runner = web.AppRunner(self._make_app())
+        try:
+            loop.run_until_complete(runner.setup())
+            site = web.TCPSite(runner, self.host, self.port)
+            loop.run_until_complete(site.start())
+            # Port 0 binds a free port; report the real one.
+            self.port = runner.addresses[0][1]
+        except BaseException as e:  # noqa: BLE001
+            self._error = e
+            self._ready.set()
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+
+    # ---- routing -----------------------------------------------------------
+
+    def _make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._auth])
+        app.add_routes([
+            web.get("/api/status", self._status),
+            web.get("/api/queue", self._queue),
+            web.post("/api/queue", self._add),
+            web.get("/api/items/{key}", self._item),
+            web.delete("/api/items/{key}", self._command("remove")),
+            web.post("/api/items/{key}/top", self._command("top")),
+            web.post("/api/items/{key}/move", self._move),
+            web.post("/api/items/{key}/retry", self._command("retry")),
+            web.post("/api/items/{key}/cancel", self._command("cancel")),
+            web.post("/api/start", self._command("start")),
+            web.post("/api/pause", self._command("pause")),
+            web.post("/api/resume", self._command("resume")),
+            web.get("/api/completed", self._completed),
+            web.get("/api/events", self._events),
+        ])
+        return app
+
+    @web.middleware
+    async def _auth(self, request: web.Request, handler):
+        header = request.headers.get("Authorization", "")
+        supplied = (
+            header[7:] if header.startswith("Bearer ") else
+            request.headers.get("X-PyShopDL-Token") or request.query.get("token", "")
+        )
+        if not hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8")):
+            return web.json_response({"error": "invalid token"}, status=401)
+        return await handler(request)
+
+    async def _run(self, name: str, args: dict) -> web.Response:
+        try:
+            result = await asyncio.wrap_future(self._execute(name, args))
+        except KeyError as e:
+            return web.json_response({"error": f"unknown item {e}"}, status=404)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(result if result is not None else {"ok": True})
+
+    def _command(self, name: str):
+        async def handler(request: web.Request) -> web.Response:
+            args = {}
+            if "key" in request.match_info:
+                try:
+                    args["key"] = int(request.match_info["key"])
+                except ValueError:
+                    return web.json_response({"error": "invalid key"}, status=400)
+            return await self._run(name, args)
+
+        return handler
+
+    # ---- handlers ----------------------------------------------------------
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot.status())
+
+    async def _queue(self, request: web.Request) -> web.Response:
+        statuses = set(filter(None, request.query.get("status", "").split(",")))
+        return web.json_response(self.snapshot.rows(statuses or None))
+
+    async def _completed(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot.rows({"Complete"}))
+
+    async def _item(self, request: web.Request) -> web.Response:
+        try:
+            row = self.snapshot.get(int(request.match_info["key"]))
+        except ValueError:
+            row = None
+        if row is None:
+            return web.json_response({"error": "unknown item"}, status=404)
+        return web.json_response(row)
+
+    async def _add(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+
+        ids = body.get("ids") if isinstance(body, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return web.json_response({"error": "expected {\"ids\": [...]}"}, status=400)
+        return await self._run("add", {"ids": [str(i) for i in ids]})
+
+    async def _move(self, request: web.Request) -> web.Response:
+        try:
+            key = int(request.match_info["key"])
+        except ValueError:
+            return web.json_response({"error": "invalid key"}, status=400)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+
+        index = body.get("index") if isinstance(body, dict) else None
+        if not isinstance(index, int) or isinstance(index, bool):
+            return web.json_response({"error": "expected {\"index\": n}"}, status=400)
+        return await self._run("move", {"key": key, "index": index})
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        sse = "text/event-stream" in request.headers.get("Accept", "") or request.query.get("format") == "sse"
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream" if sse else "application/x-ndjson",
+            "Cache-Control": "no-cache",
+        })
+        await response.prepare(request)
+
+        queue = self.hub.subscribe()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b": ping\n\n" if sse else b"\n")
+                    continue
+
+                data = json.dumps(message)
+                if sse:
+                    chunk = f"event: {message['event']}\ndata: {data}\n\n"
+                else:
+                    chunk = data + "\n"
+                await response.write(chunk.encode("utf-8"))
+        except ConnectionResetError:
+            pass
+        finally:
+            # Also on cancellation (client gone, server stopping), which
+            # must propagate so the handler really ends.
+            self.hub.unsubscribe(queue)
+        return response
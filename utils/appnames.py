@@ -0,0 +1,128 @@
+"""Local Steam app ID -> game name index.
+
+The whole Steam app list is downloaded in one request and stored in
+``cache/apps.db``. Lookups only read that file (plus an in-memory memo),
+so resolving the game of a queue row never waits on the network; a
+missing or stale list is refreshed in the background instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable
+
+import aiohttp
+
+from . import downloader as depot_downloader
+from utils import tracing
+
+APP_LIST_URL = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
+INDEX_FILE_NAME = "apps.db"
+
+# The app list changes slowly; refresh it about once a week.
+MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+def safe_folder_name(name: str) -> str:
+    """Return ``name`` usable as a single folder name on every platform."""
+
+    return _UNSAFE_CHARS.sub("_", name).strip(" .") or "_"
+
+
+class AppNameIndex:
+    """Persistent ``app id -> name`` table with an in-memory lookup memo."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path or depot_downloader.get_cache_dir() / INDEX_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        # Readers keep working while a refresh replaces the table.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS apps (app_id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._memo: dict[str, str] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def lookup(self, app_id: str) -> str:
+        """Return the game name of ``app_id`` or ``""`` if it is unknown."""
+
+        name = self._memo.get(app_id)
+        if name is None:
+            row = None
+            if app_id.isdigit():
+                row = self._conn.execute(
+                    "SELECT name FROM apps WHERE app_id = ?", (int(app_id),)
+                ).fetchone()
+            name = row[0] if row else ""
+            self._memo[app_id] = name
+        return name
+
+    def invalidate(self) -> None:
+        """Forget memoized lookups, e.g. after another thread refreshed."""
+
+        self._memo.clear()
+
+    def fetched_at(self) -> float:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'fetched_at'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at() > MAX_AGE_SECONDS
+
+    def store(self, apps: Iterable[tuple[int, str]]) -> int:
+        """Replace the whole table with ``apps``; return the number stored."""
+
+        with self._conn:
+            self._conn.execute("DELETE FROM apps")
+            cursor = self._conn.executemany(
+                "INSERT OR REPLACE INTO apps (app_id, name) VALUES (?, ?)", apps
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)",
+                (str(time.time()),),
+            )
+        self._memo.clear()
+        return cursor.rowcount
+
+
+async def fetch_app_list() -> list[tuple[int, str]]:
+    """Download the full Steam app list as ``(app id, name)`` pairs."""
+
+    timeout = aiohttp.ClientTimeout(total=120)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get(APP_LIST_URL) as response:
+            response.raise_for_status()
+            result = await response.json(content_type=None)
+
+    try:
+        apps = result["applist"]["apps"]
+    except (KeyError, TypeError):
+        raise Exception("Invalid response structure")
+
+    return [(int(app["appid"]), app["name"]) for app in apps if app.get("name")]
+
+
+def refresh(index: AppNameIndex | None = None) -> int:
+    """Download the app list into ``index`` (a fresh one if omitted)."""
+
+    own = index is None
+    index = index or AppNameIndex()
+    try:
+        with tracing.span("appnames.refresh", "metadata"):
+            return index.store(asyncio.run(fetch_app_list()))
+    finally:
+        if own:
+            index.close()
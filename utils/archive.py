@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import tarfile
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from utils import profiling
+from utils.governor import DiskSlot
+from utils.verify import HashIndex, content_digest, iter_files, scan_folder
+
+try:  # optional, only used for .tar.zst
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+ARCHIVE_FORMATS = ("zip", "tar")
+HASH_SUFFIX = ".sha256"
+
+
+def archive_path(folder: Path, fmt: str) -> Path:
+    """Return the archive written next to ``folder`` for format ``fmt``."""
+
+    if fmt == "zip":
+        suffix = ".zip"
+    elif zstandard is not None:
+        suffix = ".tar.zst"
+    else:
+        suffix = ".tar.gz"
+    return folder.with_name(folder.name + suffix)
+
+
+def _write_zip(folder: Path, target: Path) -> None:
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for rel, _ in sorted(iter_files(folder)):
+            zf.write(folder / rel, f"{folder.name}/{rel}")
+
+
+def _write_tar(folder: Path, target: Path) -> None:
+    with target.open("wb") as raw:
+        if zstandard is not None:
+            with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as zst:
+                with tarfile.open(fileobj=zst, mode="w|") as tf:
+                    _add_tar_members(tf, folder)
+        else:
+            with tarfile.open(fileobj=raw, mode="w|gz") as tf:
+                _add_tar_members(tf, folder)
+
+
+def _add_tar_members(tf: tarfile.TarFile, folder: Path) -> None:
+    for rel, _ in sorted(iter_files(folder)):
+        tf.add(folder / rel, arcname=f"{folder.name}/{rel}", recursive=False)
+
+
+@profiling.profiled("archive")
+def pack_folder(item: str, folder: Path, fmt: str = "zip") -> Path | None:
+    """Pack ``folder`` into an archive beside it; return None if unchanged.
+
+    The archive is written to a temporary name and renamed into place, so
+    a half-written archive is never visible. The item's content hash is
+    stored next to the archive and packing is skipped while it matches.
+    The hash is taken from the folder as it is now (only files changed
+    since the last verify are re-hashed), so edits are never mistaken for
+    a match; the verify index itself is only read, never updated.
+    """
+
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown archive format: {fmt}")
+
+    target = archive_path(folder, fmt)
+    hash_file = target.with_name(target.name + HASH_SUFFIX)
+
+    index = HashIndex()
+    try:
+        known = index.entries(item)
+    finally:
+        index.close()
+    current, _ = scan_folder(folder, known, workers=1)
+    content_hash = content_digest((rel, entry[2]) for rel, entry in current.items())
+
+    if content_hash is not None and target.is_file() and hash_file.is_file():
+        if hash_file.read_text(encoding="utf-8").strip() == content_hash:
+            return None
+
+    tmp = target.with_name(target.name + ".part")
+    try:
+        if fmt == "zip":
+            _write_zip(folder, tmp)
+        else:
+            _write_tar(folder, tmp)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    if content_hash is not None:
+        hash_file.write_text(content_hash, encoding="utf-8")
+    return target
+
+
+def _pack_in_slot(item: str, folder: Path, fmt: str) -> Path | None:
+    # Packing reads and writes the whole item: a disk-heavy phase.
+    with DiskSlot():
+        return pack_folder(item, folder, fmt)
+
+
+class ArchiveStage:
+    """Packs completed items on a bounded thread pool.
+
+    ``submit`` returns immediately, so packing runs next to the following
+    downloads instead of holding up the queue.
+    """
+
+    def __init__(self, max_workers: int = 2, fmt: str = "zip") -> None:
+        self.fmt = fmt
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(int(max_workers), 1),
+            thread_name_prefix="archive",
+        )
+
+    def submit(self, item: str, folder: Path) -> Future:
+        return self._pool.submit(_pack_in_slot, item, Path(folder), self.fmt)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection
+
+from . import downloader as depot_downloader
+from utils.governor import DiskSlot
+from utils.verify import hash_paths, iter_files
+
+INDEX_FILE_NAME = "dedupe.db"
+
+# Linking tiny files saves almost nothing and costs an index row each.
+MIN_FILE_SIZE = 64 * 1024
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# One pass at a time; both the index and the files are shared state.
+_PASS_LOCK = threading.Lock()
+
+
+@dataclass
+class DedupeResult:
+    scanned: int = 0
+    hashed: int = 0
+    linked: int = 0
+    saved_bytes: int = 0
+
+
+class DedupeIndex:
+    """Persistent ``path -> (size, mtime, digest)`` index of ``depots/``.
+
+    Paths are relative to the depots root. ``digest`` stays NULL until a
+    file shares its size with another one, so most files are never hashed.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path or depot_downloader.get_cache_dir() / INDEX_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files (size)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def sync_folder(self, root: Path, folder: str) -> tuple[int, set[int]]:
+        """Bring the entries under ``folder`` in line with the disk.
+
+        Returns the number of files seen and the sizes of new or changed
+        files, which are the only sizes that can produce new duplicates.
+        """
+
+        prefix = folder.rstrip("/") + "/"
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._conn.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE path >= ? AND path < ?",
+                (prefix, prefix[:-1] + "0"),
+            )
+        }
+
+        seen = 0
+        touched: set[int] = set()
+        upserts = []
+        for rel, st in iter_files(root / folder):
+            seen += 1
+            path = prefix + rel
+            if known.pop(path, None) != (st.st_size, st.st_mtime_ns):
+                upserts.append((path, st.st_size, st.st_mtime_ns))
+                if st.st_size >= MIN_FILE_SIZE:
+                    touched.add(st.st_size)
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, NULL)",
+                upserts,
+            )
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in known])
+
+        return seen, touched
+
+    def prune_folders(self, folders: set[str]) -> None:
+        """Drop entries of top-level folders that no longer exist."""
+
+        rows = self._conn.execute("SELECT DISTINCT substr(path, 1, instr(path, '/') - 1) FROM files")
+        gone = [name for (name,) in rows if name not in folders]
+        with self._conn:
+            for name in gone:
+                prefix = name + "/"
+                self._conn.execute(
+                    "DELETE FROM files WHERE path >= ? AND path < ?",
+                    (prefix, name + "0"),
+                )
+
+    def duplicate_sizes(self, sizes: set[int] | None = None) -> list[int]:
+        rows = self._conn.execute(
+            "SELECT size FROM files WHERE size >= ? GROUP BY size HAVING COUNT(*) > 1",
+            (MIN_FILE_SIZE,),
+        )
+        return [size for (size,) in rows if sizes is None or size in sizes]
+
+    def files_with_size(self, size: int) -> list[tuple[str, int, str | None]]:
+        return self._conn.execute(
+            "SELECT path, mtime_ns, digest FROM files WHERE size = ? ORDER BY path", (size,)
+        ).fetchall()
+
+    def set_digests(self, digests: list[tuple[str, str]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE files SET digest = ? WHERE path = ?",
+                [(digest, path) for path, digest in digests],
+            )
+
+    def set_mtime(self, path: str, mtime_ns: int) -> None:
+        with self._conn:
+            self._conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (mtime_ns, path))
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone ``src`` to ``dst`` sharing extents; False if unsupported."""
+
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    try:
+        with src.open("rb") as s, dst.open("wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def _replace_with_link(canonical: Path, duplicate: Path, mode: str) -> bool:
+    tmp = duplicate.with_name(duplicate.name + ".dedupe")
+    tmp.unlink(missing_ok=True)
+
+    linked = False
+    if mode in ("auto", "reflink"):
+        linked = _reflink(canonical, tmp)
+    if not linked and mode in ("auto", "hardlink"):
+        try:
+            os.link(canonical, tmp)
+            linked = True
+        except OSError:
+            linked = False
+
+    if not linked:
+        return False
+
+    try:
+        os.replace(tmp, duplicate)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+    return True
+
+
+def dedupe(
+    root: Path | None = None,
+    folders: list[str] | None = None,
+    mode: str = "auto",
+    index: DedupeIndex | None = None,
+    slot: DiskSlot | None = None,
+    busy: Callable[[], Collection[str]] = frozenset,
+) -> DedupeResult:
+    """Replace identical files under ``root`` with links to one copy.
+
+    With ``folders`` only those top-level folders are rescanned (e.g. the
+    one that was just downloaded) and compared against the indexed rest of
+    the library. Candidates are grouped by size first; only files sharing
+    a size are hashed.
+
+    ``mode`` is ``"auto"`` (reflink, falling back to hardlink),
+    ``"reflink"`` or ``"hardlink"``. Hardlinked files share their data, so
+    an in-place write to one copy shows up in all of them; call
+    :func:`unshare` on a folder before downloading into it again.
+
+    ``slot`` is taken around each folder scan and each size group and
+    released in between, so downloads waiting for it get their turn
+    during a long pass.
+
+    ``busy`` returns the top-level folders being written right now (a
+    running download); it is asked again before every scan and link, and
+    those folders are left alone. Files are also re-checked against the
+    index right before linking, so a file that changed since it was hashed
+    is never linked to, or replaced by, a stale copy.
+    """
+
+    root = Path(root or depot_downloader.get_depots_dir())
+    result = DedupeResult()
+    if not root.is_dir():
+        return result
+
+    with _PASS_LOCK:
+        own_index = index is None
+        index = index or DedupeIndex()
+        try:
+            present = {entry.name for entry in os.scandir(root) if entry.is_dir()}
+            if folders is None:
+                index.prune_folders(present)
+                targets = sorted(present)
+            else:
+                targets = [f for f in folders if f in present]
+
+            touched: set[int] = set()
+            for folder in targets:
+                if folder in busy():
+                    continue
+                with slot or nullcontext():
+                    seen, sizes = index.sync_folder(root, folder)
+                result.scanned += seen
+                touched |= sizes
+
+            for size in index.duplicate_sizes(None if folders is None else touched):
+                with slot or nullcontext():
+                    _dedupe_size(root, index, size, mode, result, busy)
+        finally:
+            if own_index:
+                index.close()
+
+    return result
+
+
+def _top(path: str) -> str:
+    return path.split("/", 1)[0]
+
+
+def _unchanged(root: Path, path: str, size: int, mtime_ns: int) -> bool:
+    """True if ``path`` still has the size and mtime recorded in the index."""
+
+    try:
+        st = (root / path).stat()
+    except OSError:
+        return False
+    return (st.st_size, st.st_mtime_ns) == (size, mtime_ns)
+
+
+def _dedupe_size(root: Path, index: DedupeIndex, size: int, mode: str, result: DedupeResult,
+                 busy: Callable[[], Collection[str]] = frozenset) -> None:
+    writing = busy()
+    entries = [entry for entry in index.files_with_size(size) if _top(entry[0]) not in writing]
+    missing = [
+        path for path, mtime_ns, digest in entries
+        if digest is None and _unchanged(root, path, size, mtime_ns)
+    ]
+    if missing:
+        try:
+            digests = hash_paths([str(root / path) for path in missing])
+        except OSError:
+            return  # a file went away or is locked; the next pass retries
+        index.set_digests(list(zip(missing, digests)))
+        result.hashed += len(missing)
+        entries = [entry for entry in index.files_with_size(size) if _top(entry[0]) not in writing]
+
+    groups: dict[str, list[tuple[str, int]]] = defaultdict(list)
+    for path, mtime_ns, digest in entries:
+        if digest is not None:
+            groups[digest].append((path, mtime_ns))
+
+    for rows in groups.values():
+        if len(rows) < 2:
+            continue
+
+        canonical: tuple[str, int] | None = None
+        for path, mtime_ns in rows:
+            # Both files are checked again right before linking: a download
+            # may have started writing to them since they were hashed.
+            writing = busy()
+            if _top(path) in writing or not _unchanged(root, path, size, mtime_ns):
+                continue
+            if (canonical is None or _top(canonical[0]) in writing
+                    or not _unchanged(root, canonical[0], size, canonical[1])):
+                canonical = (path, mtime_ns)
+                continue
+
+            source, duplicate = root / canonical[0], root / path
+            try:
+                if os.path.samefile(source, duplicate):
+                    continue  # already the same file
+                if not _replace_with_link(source, duplicate, mode):
+                    continue
+                index.set_mtime(path, duplicate.stat().st_mtime_ns)
+            except OSError:
+                continue  # e.g. the file is open elsewhere on Windows
+            result.linked += 1
+            result.saved_bytes += size
+
+
+def unshare(folder: Path) -> int:
+    """Give every hardlinked file under ``folder`` its own private copy."""
+
+    count = 0
+    for rel, st in iter_files(folder):
+        if st.st_nlink < 2:
+            continue
+
+        path = folder / rel
+        tmp = path.with_name(path.name + ".dedupe")
+        shutil.copy2(path, tmp)
+        os.replace(tmp, path)
+        count += 1
+    return count
@@ -0,0 +1,137 @@
+"""Transitive resolution of required Workshop items.
+
+``GetCollectionDetails`` lists the children of any published file: for a
+mod these are the items it requires, for a collection its members. The
+dependency graph is walked breadth first, one batched call per level (per
+:data:`BATCH_SIZE` items), so a whole modpack resolves in a handful of
+requests. The result lists the new items dependencies first, so they can
+be queued ahead of whatever needs them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import aiohttp
+
+from utils import tracing
+
+COLLECTION_DETAILS_URL = "https://api.steampowered.com/ISteamRemoteStorage/GetCollectionDetails/v1/"
+BATCH_SIZE = 100
+# Guards against runaway graphs (e.g. a huge collection of collections).
+MAX_ITEMS = 5000
+
+
+@dataclass
+class Resolution:
+    # Required items not known before, dependencies before dependents.
+    order: list[str] = field(default_factory=list)
+    # workshop id -> ids it requires, for every item that was looked up.
+    requires: dict[str, list[str]] = field(default_factory=dict)
+    # Each cycle once, as the ids along it (first id repeated at the end).
+    cycles: list[list[str]] = field(default_factory=list)
+    requests: int = 0
+
+    def required_by(self, workshop_id: str) -> list[str]:
+        return [parent for parent, children in self.requires.items() if workshop_id in children]
+
+
+async def fetch_children(session: aiohttp.ClientSession, ids: list[str]) -> dict[str, list[str]]:
+    """Children of each of ``ids`` (at most :data:`BATCH_SIZE`) in one call."""
+
+    data = {"collectioncount": len(ids)}
+    for i, workshop_id in enumerate(ids):
+        data[f"publishedfileids[{i}]"] = workshop_id
+
+    with tracing.span("dependencies.fetch", "metadata", count=len(ids)):
+        async with session.post(COLLECTION_DETAILS_URL, data=data) as response:
+            response.raise_for_status()
+            result = await response.json()
+
+    children: dict[str, list[str]] = {}
+    for entry in result.get("response", {}).get("collectiondetails", []):
+        if entry.get("result") != 1:
+            continue
+        kids = sorted(entry.get("children") or [], key=lambda child: child.get("sortorder", 0))
+        children[str(entry.get("publishedfileid"))] = [
+            str(child["publishedfileid"]) for child in kids if child.get("publishedfileid")
+        ]
+    return children
+
+
+async def resolve(roots: Iterable[str], known: Iterable[str] = ()) -> Resolution:
+    """Expand ``roots`` to everything they require, transitively.
+
+    ``known`` items (e.g. already in the queue) are still walked, so
+    their own requirements are found, but are not part of ``order``.
+    """
+
+    roots = list(dict.fromkeys(roots))
+    known = set(known) | set(roots)
+    resolution = Resolution()
+    seen = set(roots)
+    frontier = roots
+
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        while frontier and len(seen) <= MAX_ITEMS:
+            next_frontier: list[str] = []
+            for start in range(0, len(frontier), BATCH_SIZE):
+                batch = frontier[start:start + BATCH_SIZE]
+                children = await fetch_children(session, batch)
+                resolution.requests += 1
+                for workshop_id in batch:
+                    kids = [kid for kid in children.get(workshop_id, []) if kid != workshop_id]
+                    resolution.requires[workshop_id] = kids
+                    for kid in kids:
+                        if kid not in seen:
+                            seen.add(kid)
+                            next_frontier.append(kid)
+            frontier = next_frontier
+
+    resolution.order, resolution.cycles = _dependency_order(roots, resolution.requires)
+    resolution.order = [workshop_id for workshop_id in resolution.order if workshop_id not in known]
+    return resolution
+
+
+def _dependency_order(roots: list[str], requires: dict[str, list[str]]) -> tuple[list[str], list[list[str]]]:
+    """Post-order walk: every item after the items it requires.
+
+    A cycle cannot be ordered; the edge that closes it is skipped and the
+    cycle reported.
+    """
+
+    order: list[str] = []
+    cycles: list[list[str]] = []
+    done: set[str] = set()
+    on_path: dict[str, int] = {}
+    path: list[str] = []
+
+    for root in roots:
+        if root in done:
+            continue
+        # Iterative DFS: (node, iterator over its children).
+        stack = [(root, iter(requires.get(root, [])))]
+        on_path[root] = 0
+        path.append(root)
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child in done:
+                    continue
+                if child in on_path:
+                    cycles.append(path[on_path[child]:] + [child])
+                    continue
+                on_path[child] = len(path)
+                path.append(child)
+                stack.append((child, iter(requires.get(child, []))))
+                break
+            else:
+                stack.pop()
+                path.pop()
+                del on_path[node]
+                done.add(node)
+                order.append(node)
+
+    return order, cycles
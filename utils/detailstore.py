@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import atexit
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from . import downloader as depot_downloader
+
+STORE_FILE_NAME = "details.db"
+
+# Recently used entries kept decoded in memory.
+MEMO_SIZE = 256
+
+# Retention: entries not fetched again for this long are dropped, and the
+# store keeps at most this many of the most recently fetched ones.
+MAX_AGE_SECONDS = 180 * 24 * 3600
+MAX_ENTRIES = 20000
+
+
+class DetailStore:
+    """Raw ``GetPublishedFileDetails`` entries, kept on disk.
+
+    Queue rows only hold the few fields the table shows; the full
+    metadata (descriptions, tags, preview URLs...) can be several KB per
+    item, so it is stored here compressed and read back when needed.
+
+    :meth:`put` only keeps the entry in memory; :meth:`flush` compresses
+    and writes everything put since the last flush in one transaction, so
+    the caller decides how often to pay for a commit. Pending entries are
+    also flushed on :meth:`close` and at interpreter exit.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        if path is None:
+            path = depot_downloader.get_cache_dir() / STORE_FILE_NAME
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS details ("
+            " workshop_id TEXT PRIMARY KEY,"
+            " fetched_at REAL NOT NULL,"
+            " data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS details_fetched ON details (fetched_at)")
+        self._conn.commit()
+        self._memo: OrderedDict[str, dict] = OrderedDict()
+        self._pending: dict[str, tuple[float, dict]] = {}
+        atexit.register(self.flush)
+
+    def close(self) -> None:
+        atexit.unregister(self.flush)
+        self.flush()
+        self._conn.close()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def put(self, workshop_id: str, details: dict) -> None:
+        self._pending[workshop_id] = (time.time(), details)
+        self._remember(workshop_id, details)
+
+    def flush(self) -> int:
+        """Write the pending entries; returns how many were written."""
+
+        if not self._pending:
+            return 0
+        rows = [
+            (workshop_id, fetched_at, zlib.compress(json.dumps(details, separators=(",", ":")).encode("utf-8")))
+            for workshop_id, (fetched_at, details) in self._pending.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO details (workshop_id, fetched_at, data) VALUES (?, ?, ?)",
+                rows,
+            )
+        self._pending.clear()
+        return len(rows)
+
+    def prune(self, max_age: float = MAX_AGE_SECONDS, max_entries: int = MAX_ENTRIES) -> int:
+        """Drop entries fetched more than ``max_age`` seconds ago and all but
+        the ``max_entries`` most recently fetched; returns how many."""
+
+        with self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM details WHERE fetched_at < ?", (time.time() - max_age,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM details WHERE workshop_id NOT IN"
+                " (SELECT workshop_id FROM details ORDER BY fetched_at DESC LIMIT ?)",
+                (max_entries,),
+            ).rowcount
+        self._memo.clear()
+        return removed
+
+    def get(self, workshop_id: str) -> dict | None:
+        details = self._memo.get(workshop_id)
+        if details is not None:
+            self._memo.move_to_end(workshop_id)
+            return details
+        if workshop_id in self._pending:
+            details = self._pending[workshop_id][1]
+            self._remember(workshop_id, details)
+            return details
+
+        row = self._conn.execute(
+            "SELECT data FROM details WHERE workshop_id = ?", (workshop_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            details = json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError):
+            return None
+        self._remember(workshop_id, details)
+        return details
+
+    def _remember(self, workshop_id: str, details: dict) -> None:
+        self._memo[workshop_id] = details
+        self._memo.move_to_end(workshop_id)
+        while len(self._memo) > MEMO_SIZE:
+            self._memo.popitem(last=False)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Hashable
+
+
+class DiskAdmission:
+    """Decide whether a download still fits on the depots volume.
+
+    The free space reported by the OS does not include what in-flight
+    downloads are still going to write, so every started job reserves its
+    full ``file_size`` until it finishes. A job is admitted only when its
+    size plus all reservations plus a safety margin fits in the free space.
+    """
+
+    def __init__(self, path: Path, margin_bytes: int = 0) -> None:
+        self.path = Path(path)
+        self.margin_bytes = max(int(margin_bytes), 0)
+        self._reserved: dict[Hashable, int] = {}
+
+    def free_bytes(self) -> int:
+        """Free bytes on the volume holding ``path`` (or its nearest parent)."""
+        probe = self.path
+        while not probe.exists() and probe.parent != probe:
+            probe = probe.parent
+
+        try:
+            return shutil.disk_usage(probe).free
+        except OSError:
+            return 0
+
+    def reserved_bytes(self) -> int:
+        return sum(self._reserved.values())
+
+    def available_bytes(self) -> int:
+        """Free bytes left for new jobs after reservations and margin."""
+        return max(self.free_bytes() - self.reserved_bytes() - self.margin_bytes, 0)
+
+    def fits(self, size_bytes: int) -> bool:
+        return max(int(size_bytes), 0) <= self.available_bytes()
+
+    def reserve(self, key: Hashable, size_bytes: int) -> bool:
+        """Reserve ``size_bytes`` for ``key`` if it fits; return whether it did."""
+        if not self.fits(size_bytes):
+            return False
+
+        self._reserved[key] = max(int(size_bytes), 0)
+        return True
+
+    def release(self, key: Hashable) -> None:
+        self._reserved.pop(key, None)
+
+    def projected_usage(self, pending_bytes: int) -> tuple[int, int]:
+        """Return ``(bytes still to be written, free bytes)`` for the queue.
+
+        ``pending_bytes`` is the total size of queued jobs that have not
+        started yet; in-flight jobs are added from their reservations.
+        """
+        return max(int(pending_bytes), 0) + self.reserved_bytes(), self.free_bytes()
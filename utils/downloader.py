@@ -32,7 +32,12 @@ def get_install_dir() -> Path:
     return _get_app_root() / INSTALL_DIR_NAME
 
 
-def _get_cache_dir() -> Path:
+def get_depots_dir() -> Path:
+    """Return the folder DepotDownloaderMod writes ``-dir depots/...`` into."""
+    return get_install_dir() / "depots"
+
+
+def get_cache_dir() -> Path:
     return _get_app_root() / "cache"
 
 
@@ -65,7 +70,7 @@ async def download_file(
                 file.write(chunk)
 
 async def download_release_rar(cache_dir: Path | None = None) -> tuple[Path, str]:
-    cache_dir = cache_dir or _get_cache_dir()
+    cache_dir = cache_dir or get_cache_dir()
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     async with aiohttp.ClientSession() as session:
@@ -144,7 +149,7 @@ def install_from_rar(
         raise FileNotFoundError(f"RAR file not found: {rar_path}")
 
     install_dir = get_install_dir()
-    extract_dir = _get_cache_dir() / "_extracted"
+    extract_dir = get_cache_dir() / "_extracted"
 
     extract_rar(rar_path, extract_dir)
 
@@ -165,7 +170,7 @@ async def download_and_install() -> Path:
 
     installed_version = read_installed_version(install_dir)
 
-    cache_dir = _get_cache_dir()
+    cache_dir = get_cache_dir()
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     async with aiohttp.ClientSession() as session:
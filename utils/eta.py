@@ -0,0 +1,173 @@
+"""Download time predictions from the history of completed jobs.
+
+Each finished download is recorded with its size, wall time and setup
+overhead (start-up, login and manifest work before the first progress
+line). Per app, a job is then predicted to take::
+
+    overhead + size / throughput
+
+where ``overhead`` is the median recorded overhead and ``throughput``
+the byte-weighted transfer rate of recent runs. Apps with fewer than
+:data:`MIN_APP_SAMPLES` runs use the figures of all apps together, and a
+fresh install starts from conservative defaults.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from . import downloader as depot_downloader
+
+STORE_FILE_NAME = "history.db"
+
+DEFAULT_OVERHEAD_SECONDS = 20.0
+DEFAULT_BYTES_PER_SECOND = 5 * 1024 * 1024
+
+MIN_APP_SAMPLES = 3
+# Runs per app (and overall) that feed the model; older ones age out.
+RECENT_SAMPLES = 50
+# Below this much progress the live rate is too noisy to trust.
+MIN_LIVE_PERCENT = 2.0
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(max(seconds, 0)))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+class HistoryStore:
+    """Completed download runs in ``cache/history.db``."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        if path is None:
+            path = depot_downloader.get_cache_dir() / STORE_FILE_NAME
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " workshop_id TEXT NOT NULL,"
+            " app_id TEXT NOT NULL,"
+            " size_bytes INTEGER NOT NULL,"
+            " wall_seconds REAL NOT NULL,"
+            " overhead_seconds REAL NOT NULL,"
+            " finished_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_app ON runs (app_id, id)")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record(self, workshop_id: str, app_id: str, size_bytes: int,
+               wall_seconds: float, overhead_seconds: float) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (workshop_id, app_id, size_bytes, wall_seconds,"
+                " overhead_seconds, finished_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (workshop_id, app_id, int(size_bytes), wall_seconds, overhead_seconds, time.time()),
+            )
+
+    def recent(self, app_id: str | None = None, limit: int = RECENT_SAMPLES) -> list[tuple[int, float, float]]:
+        """``(size, wall, overhead)`` of the latest runs, newest first."""
+
+        if app_id is None:
+            rows = self._conn.execute(
+                "SELECT size_bytes, wall_seconds, overhead_seconds FROM runs ORDER BY id DESC LIMIT ?",
+                (limit,),
+            )
+        else:
+            rows = self._conn.execute(
+                "SELECT size_bytes, wall_seconds, overhead_seconds FROM runs"
+                " WHERE app_id = ? ORDER BY id DESC LIMIT ?",
+                (app_id, limit),
+            )
+        return rows.fetchall()
+
+    def app_ids(self) -> list[str]:
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT app_id FROM runs")]
+
+
+def _fit(samples: list[tuple[int, float, float]]) -> tuple[float, float] | None:
+    """Return ``(overhead seconds, bytes per second)`` for ``samples``."""
+
+    if not samples:
+        return None
+    overhead = statistics.median(max(o, 0.0) for _, _, o in samples)
+    transfer_bytes = sum(s for s, _, _ in samples)
+    transfer_seconds = sum(max(w - o, 0.0) for _, w, o in samples)
+    if transfer_bytes <= 0 or transfer_seconds <= 0:
+        return overhead, DEFAULT_BYTES_PER_SECOND
+    return overhead, transfer_bytes / transfer_seconds
+
+
+class EtaModel:
+    """Per-app throughput/overhead model fitted from a :class:`HistoryStore`."""
+
+    def __init__(self, store: HistoryStore) -> None:
+        self.store = store
+        # Bumped on every refit so callers can tell predictions changed.
+        self.version = 0
+        self._global = (DEFAULT_OVERHEAD_SECONDS, DEFAULT_BYTES_PER_SECOND)
+        self._apps: dict[str, tuple[float, float]] = {}
+        self._refit_global()
+        for app_id in self.store.app_ids():
+            self._refit_app(app_id)
+
+    def record(self, workshop_id: str, app_id: str, size_bytes: int,
+               wall_seconds: float, overhead_seconds: float) -> None:
+        self.store.record(workshop_id, app_id, size_bytes, wall_seconds, overhead_seconds)
+        self._refit_global()
+        self._refit_app(app_id)
+        self.version += 1
+
+    def _refit_global(self) -> None:
+        self._global = _fit(self.store.recent()) or (DEFAULT_OVERHEAD_SECONDS, DEFAULT_BYTES_PER_SECOND)
+
+    def _refit_app(self, app_id: str) -> None:
+        samples = self.store.recent(app_id)
+        if len(samples) >= MIN_APP_SAMPLES:
+            self._apps[app_id] = _fit(samples)
+        else:
+            self._apps.pop(app_id, None)
+
+    def parameters(self, app_id: str) -> tuple[float, float]:
+        """``(overhead seconds, bytes per second)`` used for ``app_id``."""
+
+        return self._apps.get(app_id, self._global)
+
+    def predict(self, app_id: str, size_bytes: int) -> float:
+        """Expected wall time of a whole download, in seconds."""
+
+        overhead, rate = self.parameters(app_id)
+        return overhead + max(size_bytes, 0) / rate
+
+    def remaining(self, app_id: str, size_bytes: int, percent: float,
+                  elapsed: float, transferring: float) -> float:
+        """Seconds left for a running download.
+
+        ``elapsed`` counts from the start of the job, ``transferring``
+        from its first progress line. The estimate starts from the
+        prediction and moves towards the rate actually seen as progress
+        comes in.
+        """
+
+        predicted = max(self.predict(app_id, size_bytes) - elapsed, 0.0)
+        if percent < MIN_LIVE_PERCENT or transferring <= 0:
+            return predicted
+
+        done = min(percent, 100.0) / 100.0
+        live = transferring * (1.0 - done) / done
+        return (1.0 - done) * predicted + done * live
@@ -0,0 +1,386 @@
+"""Resource limits for the DepotDownloaderMod processes we spawn.
+
+Config keys:
+
+* ``process_priority``: ``normal`` (default), ``low`` or ``idle``; the
+  CPU niceness (or Windows priority class) of each download process.
+* ``io_priority``: the same scale for disk I/O; defaults to
+  ``process_priority``.
+* ``cpu_affinity``: CPUs the processes may run on, e.g. ``"0-3,6"``;
+  empty for no restriction.
+* ``max_disk_heavy``: how many disk-heavy phases (file pre-allocation,
+  hashing, archiving, dedupe) may run at once on this machine. The cap is
+  held in lock files under ``cache/governor``, so it also covers cluster
+  workers and other instances.
+* ``max_disk_wait_seconds``: how long a download process is held paused,
+  or a verify/archive/dedupe step waits, for a disk-heavy slot; after
+  that it carries on without one.
+
+``psutil`` is optional. Without it niceness and affinity still work on
+POSIX, the priority class on Windows; I/O priority, pausing a process on
+Windows and CPU/RSS sampling need it.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from . import downloader as depot_downloader
+from utils.config import Config
+
+try:  # optional, see the module docstring
+    import psutil
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+    import signal
+
+PRIORITIES = ("normal", "low", "idle")
+DEFAULT_PRIORITY = "normal"
+DEFAULT_DISK_SLOTS = 1
+SLOT_DIR_NAME = "governor"
+SLOT_POLL_SECONDS = 0.25
+DEFAULT_DISK_WAIT_SECONDS = 300.0
+SAMPLE_INTERVAL_SECONDS = 2.0
+
+# Phases from utils.workshop.detect_phase that mostly hit the disk.
+DISK_HEAVY_PHASES = {"allocate"}
+
+_NICE = {"normal": 0, "low": 10, "idle": 19}
+_WINDOWS_CLASS = {
+    "normal": getattr(subprocess, "NORMAL_PRIORITY_CLASS", 0),
+    "low": getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0),
+    "idle": getattr(subprocess, "IDLE_PRIORITY_CLASS", 0),
+}
+
+
+@dataclass
+class Limits:
+    priority: str = DEFAULT_PRIORITY
+    io_priority: str = DEFAULT_PRIORITY
+    affinity: list[int] | None = None
+    disk_slots: int = DEFAULT_DISK_SLOTS
+    disk_wait: float = DEFAULT_DISK_WAIT_SECONDS
+
+    @classmethod
+    def from_config(cls) -> "Limits":
+        config = Config()
+        priority = _priority(config.get("process_priority", DEFAULT_PRIORITY))
+        try:
+            disk_slots = max(int(config.get("max_disk_heavy", DEFAULT_DISK_SLOTS)), 1)
+        except (TypeError, ValueError):
+            disk_slots = DEFAULT_DISK_SLOTS
+        try:
+            disk_wait = max(float(config.get("max_disk_wait_seconds", DEFAULT_DISK_WAIT_SECONDS)), 0.0)
+        except (TypeError, ValueError):
+            disk_wait = DEFAULT_DISK_WAIT_SECONDS
+        return cls(
+            priority=priority,
+            io_priority=_priority(config.get("io_priority", priority)),
+            affinity=parse_cpu_list(config.get("cpu_affinity", "")),
+            disk_slots=disk_slots,
+            disk_wait=disk_wait,
+        )
+
+
+def _priority(value) -> str:
+    value = str(value or "").lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+
+def parse_cpu_list(text) -> list[int] | None:
+    """``"0-3,6"`` -> ``[0, 1, 2, 3, 6]``; None for empty or invalid text."""
+
+    if isinstance(text, list):
+        text = ",".join(str(cpu) for cpu in text)
+    cpus: set[int] = set()
+    for part in str(text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        try:
+            cpus.update(range(int(start), int(end or start) + 1))
+        except ValueError:
+            return None
+    return sorted(cpus) or None
+
+
+def creation_flags(limits: Limits) -> int:
+    """``Popen`` flags; on Windows the priority class is set at creation."""
+
+    if sys.platform == "win32":
+        return _WINDOWS_CLASS[limits.priority]
+    return 0
+
+
+def apply(pid: int, limits: Limits) -> list[str]:
+    """Apply ``limits`` to a started process; return what could not be."""
+
+    skipped = []
+    process = None
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+        except psutil.Error as e:  # e.g. it already exited
+            return [f"all limits ({e})"]
+
+    if sys.platform != "win32" and limits.priority != "normal":
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, _NICE[limits.priority])
+        except OSError as e:
+            skipped.append(f"priority ({e})")
+
+    if limits.io_priority != "normal":
+        if process is None or not hasattr(process, "ionice"):
+            skipped.append("I/O priority (needs psutil)")
+        else:
+            try:
+                if sys.platform == "win32":
+                    level = psutil.IOPRIO_LOW if limits.io_priority == "low" else psutil.IOPRIO_VERYLOW
+                    process.ionice(level)
+                elif limits.io_priority == "low":
+                    process.ionice(psutil.IOPRIO_CLASS_BE, 7)
+                else:
+                    process.ionice(psutil.IOPRIO_CLASS_IDLE)
+            except (psutil.Error, OSError) as e:
+                skipped.append(f"I/O priority ({e})")
+
+    if limits.affinity:
+        try:
+            if process is not None and hasattr(process, "cpu_affinity"):
+                process.cpu_affinity(limits.affinity)
+            elif hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(pid, limits.affinity)
+            else:
+                skipped.append("CPU affinity (needs psutil)")
+        except Exception as e:  # noqa: BLE001 - psutil.Error or OSError/ValueError
+            skipped.append(f"CPU affinity ({e})")
+
+    return skipped
+
+
+def suspend(pid: int) -> bool:
+    try:
+        if psutil is not None:
+            psutil.Process(pid).suspend()
+        elif sys.platform != "win32":
+            os.kill(pid, signal.SIGSTOP)
+        else:
+            return False
+    except Exception:  # noqa: BLE001 - the process may be gone
+        return False
+    return True
+
+
+def resume(pid: int) -> None:
+    try:
+        if psutil is not None:
+            psutil.Process(pid).resume()
+        elif sys.platform != "win32":
+            os.kill(pid, signal.SIGCONT)
+    except Exception:  # noqa: BLE001
+        pass
+
+
+class DiskSlot:
+    """One of ``slots`` machine-wide places for a disk-heavy phase.
+
+    Each place is a lock file; holding its lock holds the place, and the
+    OS drops it if the holder dies. A holder that hangs instead would
+    block everyone, so ``with DiskSlot()`` waits at most ``timeout``
+    seconds (``max_disk_wait_seconds`` by default) and then runs the
+    block without a place; :attr:`held` tells which happened.
+    """
+
+    def __init__(self, slots: int | None = None, directory: Path | None = None,
+                 timeout: float | None = None) -> None:
+        limits = Limits.from_config() if slots is None or timeout is None else None
+        self.slots = max(int(slots if slots is not None else limits.disk_slots), 1)
+        self.timeout = timeout if timeout is not None else limits.disk_wait
+        self.directory = Path(directory or depot_downloader.get_cache_dir() / SLOT_DIR_NAME)
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for index in range(self.slots):
+            f = open(self.directory / f"slot{index}.lock", "a+b")
+            if _try_lock(f):
+                self._file = f
+                return True
+            f.close()
+        return False
+
+    def acquire(self, keep_waiting: Callable[[], bool] = lambda: True) -> bool:
+        """Wait for a place; False if ``keep_waiting`` gave up first."""
+
+        while not self.try_acquire():
+            if not keep_waiting():
+                return False
+            time.sleep(SLOT_POLL_SECONDS)
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            _unlock(self._file)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "DiskSlot":
+        deadline = time.monotonic() + self.timeout
+        self.acquire(lambda: time.monotonic() < deadline)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _try_lock(f) -> bool:
+    try:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(f) -> None:
+    try:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+class PhaseGate:
+    """Holds a download process at the start of a disk-heavy phase until a
+    :class:`DiskSlot` is free, and frees the slot when the phase ends.
+
+    The process is paused (not killed) while it waits; ``on_wait`` is
+    called on every poll, e.g. to keep a stall watchdog quiet. After
+    ``max_wait`` seconds the process is resumed without a slot, so a slot
+    held by a long job elsewhere only slows the download down instead of
+    blocking it; :attr:`unthrottled` counts how often that happened.
+    """
+
+    def __init__(self, proc: subprocess.Popen, slot: DiskSlot,
+                 on_wait: Callable[[], None] = lambda: None,
+                 should_stop: Callable[[], bool] = lambda: False,
+                 max_wait: float | None = None) -> None:
+        self.proc = proc
+        self.slot = slot
+        self.on_wait = on_wait
+        self.should_stop = should_stop
+        self.max_wait = max_wait if max_wait is not None else Limits.from_config().disk_wait
+        self.waited = 0.0
+        self.unthrottled = 0
+
+    def phase(self, name: str) -> None:
+        if name not in DISK_HEAVY_PHASES:
+            self.slot.release()
+            return
+        if self.slot.try_acquire():
+            return
+
+        started = time.monotonic()
+        paused = suspend(self.proc.pid)
+
+        def keep_waiting() -> bool:
+            self.on_wait()
+            if time.monotonic() - started >= self.max_wait:
+                return False
+            return self.proc.poll() is None and not self.should_stop()
+
+        try:
+            if not self.slot.acquire(keep_waiting) and time.monotonic() - started >= self.max_wait:
+                self.unthrottled += 1
+        finally:
+            if paused:
+                resume(self.proc.pid)
+            self.waited += time.monotonic() - started
+
+    def close(self) -> None:
+        self.slot.release()
+
+
+class ProcessSampler:
+    """Samples CPU percent and RSS of a process on a background thread.
+
+    ``callback(cpu_percent, rss_bytes)`` runs on that thread. Does
+    nothing without psutil (:attr:`available` is False).
+    """
+
+    def __init__(self, pid: int, callback: Callable[[float, int], None] | None = None,
+                 interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        self.pid = pid
+        self.callback = callback
+        self.interval = interval
+        self.available = psutil is not None
+        self.peak_cpu = 0.0
+        self.peak_rss = 0
+        self.samples = 0
+        self._cpu_total = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="process-sampler", daemon=True)
+
+    @property
+    def mean_cpu(self) -> float:
+        return self._cpu_total / self.samples if self.samples else 0.0
+
+    def __enter__(self) -> "ProcessSampler":
+        if self.available:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _sample(self) -> None:
+        try:
+            process = psutil.Process(self.pid)
+            process.cpu_percent(None)  # first call only sets the baseline
+            while not self._stop.wait(self.interval):
+                with process.oneshot():
+                    cpu = process.cpu_percent(None)
+                    rss = process.memory_info().rss
+                self.samples += 1
+                self._cpu_total += cpu
+                self.peak_cpu = max(self.peak_cpu, cpu)
+                self.peak_rss = max(self.peak_rss, rss)
+                if self.callback is not None:
+                    self.callback(cpu, rss)
+        except psutil.Error:
+            return
+
+    def summary(self) -> str:
+        if not self.samples:
+            return ""
+        return (
+            f"CPU {self.mean_cpu:.0f}% avg / {self.peak_cpu:.0f}% peak, "
+            f"RSS {self.peak_rss / (1024 * 1024):.0f} MB peak"
+        )
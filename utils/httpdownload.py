@@ -0,0 +1,337 @@
+"""Direct HTTP downloads for Workshop items that expose a ``file_url``.
+
+Some items (mostly older, single-file ones) are published with a plain
+download URL in ``GetPublishedFileDetails``. They need neither a Steam
+login nor DepotDownloaderMod, so they are fetched here instead: split
+into parallel ``Range`` segments, resumable from a ``.part`` file, and
+checked against ``file_size`` before being renamed into place.
+
+All downloads share one aiohttp session (and so one connection pool) on a
+background event loop; callers block on :meth:`HttpDownloader.download`
+from their own worker thread. Each file gets its own writer thread for
+the ``.part`` data and resume state, so a slow disk never holds up the
+loop and the other downloads on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlsplit
+
+import aiohttp
+
+from utils import tracing
+from utils.appnames import safe_folder_name
+
+# Files smaller than two of these are fetched in one piece.
+SEGMENT_MIN_BYTES = 8 * 1024 * 1024
+MAX_SEGMENTS = 4
+POOL_LIMIT = 16
+CHUNK_BYTES = 256 * 1024
+SEGMENT_RETRIES = 3
+# The resume state is written at most this often.
+STATE_INTERVAL_SECONDS = 1.0
+
+Progress = Callable[[int, int], None]  # bytes done, total bytes
+
+
+class DownloadStopped(Exception):
+    """Raised when the caller's stop event was set."""
+
+
+class _RangeIgnored(Exception):
+    """The server answered a Range request with the whole file."""
+
+
+@dataclass
+class DirectFile:
+    url: str
+    size: int
+    filename: str
+
+    @classmethod
+    def from_details(cls, details: dict | None) -> "DirectFile | None":
+        """Return the direct file of a ``GetPublishedFileDetails`` entry, if any."""
+
+        url = str((details or {}).get("file_url") or "").strip()
+        if not url.lower().startswith(("http://", "https://")):
+            return None
+
+        name = Path(str(details.get("filename") or "").replace("\\", "/")).name
+        if not name:
+            name = Path(unquote(urlsplit(url).path)).name
+        name = safe_folder_name(name) or str(details.get("publishedfileid") or "download")
+        try:
+            size = int(details.get("file_size") or 0)
+        except (TypeError, ValueError):
+            size = 0
+        return cls(url=url, size=size, filename=name)
+
+
+def plan_segments(size: int) -> list[list[int]]:
+    """Split ``size`` bytes into ``[start, end, done]`` segments (end exclusive)."""
+
+    if size < 2 * SEGMENT_MIN_BYTES:
+        return [[0, size, 0]]
+    count = min(MAX_SEGMENTS, size // SEGMENT_MIN_BYTES)
+    step = -(-size // count)
+    return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+
+class HttpDownloader:
+    """Segmented, resumable HTTP downloads over a shared connection pool."""
+
+    _shared: "HttpDownloader | None" = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "HttpDownloader":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __init__(self, pool_limit: int = POOL_LIMIT) -> None:
+        self.pool_limit = pool_limit
+        self._loop = asyncio.new_event_loop()
+        self._session: aiohttp.ClientSession | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http-download", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def download(
+        self,
+        file: DirectFile,
+        folder: Path,
+        progress: Progress | None = None,
+        stop: threading.Event | None = None,
+    ) -> Path:
+        """Download ``file`` into ``folder`` and return the final path.
+
+        Blocks the calling thread. Raises :class:`DownloadStopped` when
+        ``stop`` is set; the ``.part`` file is kept so the next call
+        resumes where this one ended.
+        """
+
+        stop = stop or threading.Event()
+        future = asyncio.run_coroutine_threadsafe(self._download(file, Path(folder), progress, stop), self._loop)
+        return future.result()
+
+    def fetch_bytes(self, url: str, max_bytes: int, timeout: float = 30.0) -> Future:
+        """Fetch a small resource into memory; the future holds the bytes.
+
+        Larger responses fail instead of being buffered.
+        """
+
+        return asyncio.run_coroutine_threadsafe(self._fetch_bytes(url, max_bytes, timeout), self._loop)
+
+    async def _fetch_bytes(self, url: str, max_bytes: int, timeout: float) -> bytes:
+        session = await self._get_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            if (response.content_length or 0) > max_bytes:
+                raise ValueError(f"{url} is larger than {max_bytes} bytes")
+            chunks = []
+            received = 0
+            async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise ValueError(f"{url} is larger than {max_bytes} bytes")
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_limit),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60),
+            )
+        return self._session
+
+    async def _download(self, file: DirectFile, folder: Path, progress: Progress | None,
+                        stop: threading.Event) -> Path:
+        folder.mkdir(parents=True, exist_ok=True)
+        target = folder / file.filename
+        if file.size and target.is_file() and target.stat().st_size == file.size:
+            return target
+
+        part = target.with_name(target.name + ".part")
+        state_path = target.with_name(target.name + ".part.json")
+        segments = self._load_state(state_path, part, file) or plan_segments(file.size)
+        if not part.exists():
+            part.touch()
+
+        session = await self._get_session()
+        job = _SegmentedJob(session, file, part, state_path, segments, progress, stop)
+        with tracing.span("http.download", "download", url=file.url, size=file.size, segments=len(segments)):
+            try:
+                await job.run()
+            except _RangeIgnored:
+                # Start over as a single stream.
+                job.segments = [[0, file.size, 0]]
+                await job.run()
+
+        # The part file is pre-sized, so count what was actually received.
+        received = job.done_bytes
+        if file.size and (received != file.size or part.stat().st_size != file.size):
+            raise RuntimeError(f"Size mismatch: got {received} bytes, expected {file.size}")
+        os.replace(part, target)
+        state_path.unlink(missing_ok=True)
+        return target
+
+    @staticmethod
+    def _load_state(state_path: Path, part: Path, file: DirectFile) -> list[list[int]] | None:
+        if not file.size or not part.exists():
+            return None
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != file.url or state.get("size") != file.size:
+            return None
+        segments = state.get("segments")
+        if not isinstance(segments, list) or not segments:
+            return None
+        return [[int(start), int(end), int(done)] for start, end, done in segments]
+
+
+class _SegmentedJob:
+    """One file being fetched by concurrent segment tasks."""
+
+    def __init__(self, session: aiohttp.ClientSession, file: DirectFile, part: Path, state_path: Path,
+                 segments: list[list[int]], progress: Progress | None, stop: threading.Event) -> None:
+        self.session = session
+        self.file = file
+        self.part = part
+        self.state_path = state_path
+        self.segments = segments
+        self.progress = progress
+        self.stop = stop
+        self._saved_at = 0.0
+        self._file = None
+        self._writer: ThreadPoolExecutor | None = None
+
+    @property
+    def done_bytes(self) -> int:
+        return sum(segment[2] for segment in self.segments)
+
+    async def run(self) -> None:
+        # One thread owns the part file and the state file: writes happen in
+        # the order they were queued, so the saved state never runs ahead
+        # of the data before it.
+        loop = asyncio.get_running_loop()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-write")
+        try:
+            await loop.run_in_executor(self._writer, self._open)
+            await self._run_segments()
+        finally:
+            await loop.run_in_executor(self._writer, self._close)
+            self._writer.shutdown(wait=False)
+            self._writer = None
+
+    async def _run_segments(self) -> None:
+        tasks = [
+            asyncio.ensure_future(self._segment(segment))
+            for segment in self.segments
+            if not self.file.size or segment[2] < segment[1] - segment[0]
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One segment failed: stop the others before giving up.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self._save_state(force=True)
+
+    def _open(self) -> None:
+        # Unbuffered, so the saved state never runs ahead of the file.
+        self._file = self.part.open("r+b", buffering=0)
+        if self.file.size:
+            self._file.truncate(self.file.size)
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_at(self, offset: int, chunk: bytes) -> None:
+        self._file.seek(offset)
+        self._file.write(chunk)
+
+    async def _segment(self, segment: list[int]) -> None:
+        for attempt in range(SEGMENT_RETRIES + 1):
+            try:
+                await self._fetch(segment)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == SEGMENT_RETRIES:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _fetch(self, segment: list[int]) -> None:
+        start, end, done = segment
+        headers = {}
+        ranged = bool(self.file.size) and (done > 0 or len(self.segments) > 1)
+        if ranged:
+            headers["Range"] = f"bytes={start + done}-{end - 1}"
+
+        async with self.session.get(self.file.url, headers=headers) as response:
+            response.raise_for_status()
+            if ranged and response.status != 206:
+                raise _RangeIgnored()
+            loop = asyncio.get_running_loop()
+            if not ranged:
+                segment[2] = done = 0
+                if not self.file.size:
+                    # Nothing to check the result against: drop whatever a
+                    # previous attempt left in the part file.
+                    await loop.run_in_executor(self._writer, self._file.truncate, 0)
+
+            async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                if self.stop.is_set():
+                    raise DownloadStopped()
+                if self.file.size and segment[2] + len(chunk) > end - start:
+                    raise RuntimeError("Server sent more data than file_size")
+                # Awaited, so each segment has at most one chunk in flight.
+                await loop.run_in_executor(self._writer, self._write_at, start + segment[2], chunk)
+                segment[2] += len(chunk)
+                if self.progress is not None:
+                    self.progress(self.done_bytes, self.file.size)
+                self._save_state()
+
+        # A connection closed early without an error; retried from here.
+        if self.file.size and segment[2] < end - start:
+            raise aiohttp.ClientPayloadError(f"segment ended at {start + segment[2]} of {end}")
+
+    def _save_state(self, force: bool = False) -> None:
+        if not self.file.size:
+            return
+        now = time.monotonic()
+        if not force and now - self._saved_at < STATE_INTERVAL_SECONDS:
+            return
+        self._saved_at = now
+        state = {"url": self.file.url, "size": self.file.size, "segments": self.segments}
+        # Queued behind the data writes it describes; not waited for.
+        self._writer.submit(self._write_state, json.dumps(state))
+
+    def _write_state(self, text: str) -> None:
+        try:
+            self.state_path.write_text(text, encoding="utf-8")
+        except OSError:
+            pass
@@ -0,0 +1,139 @@
+"""Single-instance guard and local IPC between PyShopDL launches.
+
+The first instance listens on a ``QLocalServer`` (a named pipe on
+Windows, a Unix socket elsewhere). A later launch connects to it, sends
+the workshop IDs it was started with and exits, so scripts and browser
+helpers can enqueue items without starting a second window.
+
+Messages are JSON objects, one per line: ``{"add": ["123", "456"]}``.
+"""
+
+from __future__ import annotations
+
+import getpass
+import hashlib
+import json
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from . import downloader as depot_downloader
+
+CONNECT_TIMEOUT_MS = 500
+
+# Forwarded IDs arriving within this window are added as one batch.
+COALESCE_MS = 100
+
+
+def server_name() -> str:
+    """Per-user, per-install name, so separate copies do not collide."""
+
+    try:
+        user = getpass.getuser()
+    except Exception:  # noqa: BLE001
+        user = ""
+    digest = hashlib.sha1(f"{user}\0{depot_downloader._get_app_root()}".encode("utf-8"))
+    return "PyShopDL-" + digest.hexdigest()[:12]
+
+
+def send_to_running(ids: list[str], name: str | None = None) -> bool:
+    """Hand ``ids`` to a running instance; False if none is listening."""
+
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+
+    socket.write((json.dumps({"add": list(ids)}) + "\n").encode("utf-8"))
+    socket.flush()
+    socket.waitForBytesWritten(CONNECT_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.UnconnectedState:
+        socket.waitForDisconnected(CONNECT_TIMEOUT_MS)
+    return True
+
+
+class InstanceServer(QObject):
+    """Receives IDs from later launches and emits them in batches."""
+
+    received = Signal(list)  # workshop ids (may be empty: just activate)
+
+    def __init__(self, name: str | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.name = name or server_name()
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._accept)
+        self._buffers: dict[QLocalSocket, bytes] = {}
+        self._pending: list[str] = []
+        self._activate = False
+
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(COALESCE_MS)
+        self._batch_timer.timeout.connect(self._emit_batch)
+
+    def listen(self) -> bool:
+        """Start listening; False if another live instance owns the name."""
+
+        if self._server.listen(self.name):
+            return True
+
+        # A crashed instance can leave its socket file behind. Only remove
+        # it when nobody answers, or we would steal a live instance's name.
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.abort()
+            return False
+
+        QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _accept(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._read(s))
+            # Queued: readAll() may emit ``disconnected`` synchronously,
+            # which must not drop the socket while _read is running.
+            socket.disconnected.connect(lambda s=socket: self._drop(s), Qt.QueuedConnection)
+
+    def _read(self, socket: QLocalSocket) -> None:
+        if socket not in self._buffers:
+            return
+
+        data = self._buffers[socket] + bytes(socket.readAll())
+        *lines, rest = data.split(b"\n")
+        self._buffers[socket] = rest
+
+        for line in lines:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+
+            ids = message.get("add") or []
+            self._pending.extend(str(i).strip() for i in ids if str(i).strip())
+            self._activate = True
+            if not self._batch_timer.isActive():
+                self._batch_timer.start()
+
+    def _drop(self, socket: QLocalSocket) -> None:
+        # ``disconnected`` can be emitted more than once per socket.
+        if socket not in self._buffers:
+            return
+        if socket.bytesAvailable():
+            self._read(socket)
+        del self._buffers[socket]
+        socket.deleteLater()
+
+    def _emit_batch(self) -> None:
+        ids, self._pending = self._pending, []
+        if self._activate:
+            self._activate = False
+            self.received.emit(ids)
@@ -0,0 +1,197 @@
+"""Bounded capture of download job output.
+
+Each job keeps its latest :data:`RING_LINES` lines in memory for live
+viewing and streams every line to ``cache/logs/<workshop id>.log``. A log
+file that grows past :data:`MAX_FILE_BYTES` is rotated to ``.log.1``
+(up to :data:`BACKUP_COUNT` backups), and old logs are pruned by age and
+by the total size of the folder, so neither memory nor disk grows with
+the length of a job's output.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from . import downloader as depot_downloader
+
+LOG_DIR_NAME = "logs"
+
+RING_LINES = 2000
+MAX_FILE_BYTES = 1024 * 1024
+BACKUP_COUNT = 2
+# Retention of the whole log folder.
+MAX_AGE_SECONDS = 14 * 24 * 3600
+MAX_TOTAL_BYTES = 100 * 1024 * 1024
+# Read back from disk when a log is viewed after its ring is gone.
+TAIL_BYTES = 256 * 1024
+
+
+# Paths of logs that are open for writing, with how many JobLogs hold each.
+_open_paths: dict[Path, int] = {}
+_open_lock = threading.Lock()
+
+
+def log_dir() -> Path:
+    return depot_downloader.get_cache_dir() / LOG_DIR_NAME
+
+
+def log_path(workshop_id: str, directory: Path | None = None) -> Path:
+    return (directory or log_dir()) / f"{workshop_id}.log"
+
+
+class JobLog:
+    """Output of one download job: a ring buffer plus a rotating file.
+
+    :meth:`write` is called from the worker thread; :meth:`lines_since`
+    from the GUI thread while the log is being viewed.
+    """
+
+    def __init__(self, workshop_id: str, directory: Path | None = None) -> None:
+        self.workshop_id = workshop_id
+        self.path = log_path(workshop_id, directory)
+        self._ring: deque[str] = deque(maxlen=RING_LINES)
+        self._count = 0  # lines written so far, including dropped ones
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_bytes = 0
+        self._last = ""
+
+    def open(self) -> None:
+        """Start a new run: open the file and write a header line."""
+
+        with self._lock:
+            if self._file is None:
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", errors="replace")
+                    self._file_bytes = self._file.tell()
+                except OSError:
+                    self._file = None
+                else:
+                    with _open_lock:
+                        key = self.path.resolve()
+                        _open_paths[key] = _open_paths.get(key, 0) + 1
+        self.write(f"==== {time.strftime('%Y-%m-%d %H:%M:%S')} run of {self.workshop_id} ====")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                with _open_lock:
+                    key = self.path.resolve()
+                    if _open_paths.get(key, 0) > 1:
+                        _open_paths[key] -= 1
+                    else:
+                        _open_paths.pop(key, None)
+
+    def write(self, line: str) -> None:
+        line = line.rstrip("\r\n")
+        with self._lock:
+            self._ring.append(line)
+            self._count += 1
+            if line.strip():
+                self._last = line.strip()
+            if self._file is None:
+                return
+            try:
+                self._file.write(line + "\n")
+                self._file_bytes += len(line.encode("utf-8", errors="replace")) + 1
+                if self._file_bytes > MAX_FILE_BYTES:
+                    self._rotate()
+            except OSError:
+                self._file = None
+
+    @property
+    def last_line(self) -> str:
+        """The latest non-blank line, for error messages."""
+
+        return self._last
+
+    def lines_since(self, count: int) -> tuple[list[str], int]:
+        """Lines after the first ``count`` written, and the new count.
+
+        Lines that already dropped out of the ring are skipped.
+        """
+
+        with self._lock:
+            new = min(self._count - count, len(self._ring))
+            lines = list(self._ring)[len(self._ring) - new:] if new > 0 else []
+            return lines, self._count
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                except OSError:
+                    pass
+
+    def _rotate(self) -> None:
+        # Called with the lock held.
+        self._file.close()
+        for index in range(BACKUP_COUNT, 0, -1):
+            source = self.path if index == 1 else self.path.with_name(f"{self.path.name}.{index - 1}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index}"))
+        self._file = open(self.path, "w", encoding="utf-8", errors="replace")
+        self._file_bytes = 0
+
+
+def read_tail(path: Path, max_bytes: int = TAIL_BYTES) -> list[str]:
+    """The last lines of a log file, reading at most ``max_bytes``."""
+
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - max_bytes, 0))
+            data = f.read()
+    except OSError:
+        return []
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    if size > max_bytes and lines:
+        lines = lines[1:]  # starts mid-line
+    return lines[-RING_LINES:]
+
+
+def prune(directory: Path | None = None, max_age: float = MAX_AGE_SECONDS,
+          max_total: int = MAX_TOTAL_BYTES) -> int:
+    """Delete logs older than ``max_age`` and the oldest beyond ``max_total``.
+
+    Logs of jobs running right now (an open :class:`JobLog`) and their
+    backups are kept. Returns the number of files removed.
+    """
+
+    directory = Path(directory or log_dir())
+    with _open_lock:
+        busy = {path.name for path in _open_paths if path.parent == directory.resolve()}
+    try:
+        with os.scandir(directory) as it:
+            files = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path,
+                 entry.name.partition(".log")[0] + ".log" in busy)
+                for entry in it
+                if entry.is_file() and ".log" in entry.name
+            ]
+    except OSError:
+        return 0
+
+    files.sort(reverse=True)  # newest first
+    cutoff = time.time() - max_age
+    total = removed = 0
+    for mtime, size, path, in_use in files:
+        total += size
+        if in_use:
+            continue
+        if mtime < cutoff or total > max_total:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
@@ -0,0 +1,263 @@
+"""Incremental index of what is already downloaded under ``depots/``.
+
+Every directory is stored in ``cache/library.db`` with its mtime and the
+size, count and newest mtime of the files directly inside it. A rescan
+stats each known directory and only lists the ones whose mtime changed
+(a file or folder was added, removed or renamed); unchanged directories
+reuse their stored totals and child list. Item totals are then summed
+from the directory rows, so opening the library never walks the disk.
+
+Item folders are mapped back to Workshop IDs: folders named by ID map
+directly, renamed ones through the folder recorded when the download
+completed.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import downloader as depot_downloader
+from utils.verify import IGNORED_DIRS
+
+INDEX_FILE_NAME = "library.db"
+
+
+@dataclass
+class LibraryEntry:
+    folder: str  # relative to depots/, posix separators
+    workshop_id: str
+    game: str  # group folder when downloads are grouped by game
+    files: int
+    size_bytes: int
+    modified: float
+
+
+@dataclass
+class ScanResult:
+    directories: int = 0
+    listed: int = 0  # directories whose mtime changed and were read again
+    removed: int = 0
+
+
+class LibraryIndex:
+    """Persistent per-directory totals of the depots folder."""
+
+    def __init__(self, path: Path | None = None, root: Path | None = None) -> None:
+        self.path = Path(path or depot_downloader.get_cache_dir() / INDEX_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.root = Path(root or depot_downloader.get_depots_dir())
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            " path TEXT PRIMARY KEY,"
+            " parent TEXT,"
+            " mtime_ns INTEGER NOT NULL,"
+            " files INTEGER NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " newest REAL NOT NULL,"
+            " has_files INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " folder TEXT PRIMARY KEY,"
+            " workshop_id TEXT NOT NULL,"
+            " game TEXT NOT NULL,"
+            " files INTEGER NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " modified REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS folders (folder TEXT PRIMARY KEY, workshop_id TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record_folder(self, folder: str | Path, workshop_id: str) -> None:
+        """Remember which item a (possibly renamed) download folder holds."""
+
+        rel = self._relative(folder)
+        if not rel:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO folders (folder, workshop_id) VALUES (?, ?)",
+                (rel, workshop_id),
+            )
+            # Files may have been rewritten in place, which leaves the
+            # directory mtimes alone; make the next scan read them again.
+            self._conn.execute(
+                "UPDATE dirs SET mtime_ns = -1 WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                (rel, _like_prefix(rel)),
+            )
+
+    def entries(self) -> list[LibraryEntry]:
+        """Items as of the last scan, without touching the disk."""
+
+        rows = self._conn.execute(
+            "SELECT folder, workshop_id, game, files, bytes, modified FROM items ORDER BY folder"
+        )
+        return [LibraryEntry(*row) for row in rows]
+
+    def scan(self, full: bool = False) -> ScanResult:
+        """Bring the index in line with the disk.
+
+        ``full`` lists every directory again instead of trusting mtimes.
+        """
+
+        result = ScanResult()
+        stored = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                "SELECT path, mtime_ns, files, bytes, newest, has_files FROM dirs"
+            )
+        }
+        children: dict[str, list[str]] = {}
+        for path, parent in self._conn.execute("SELECT path, parent FROM dirs WHERE parent IS NOT NULL"):
+            children.setdefault(parent, []).append(path)
+
+        seen: set[str] = set()
+        updates: list[tuple] = []
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            absolute = self.root / rel if rel else self.root
+            try:
+                mtime_ns = os.stat(absolute).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(rel)
+            result.directories += 1
+
+            previous = stored.get(rel)
+            if not full and previous is not None and previous[0] == mtime_ns:
+                stack.extend(children.get(rel, ()))
+                continue
+
+            result.listed += 1
+            files = size = 0
+            newest = 0.0
+            subdirs = []
+            try:
+                with os.scandir(absolute) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in IGNORED_DIRS:
+                                    subdirs.append(f"{rel}/{entry.name}" if rel else entry.name)
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                files += 1
+                                size += st.st_size
+                                newest = max(newest, st.st_mtime)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+            parent = rel.rpartition("/")[0] if rel else None
+            updates.append((rel, parent, mtime_ns, files, size, newest, int(files > 0)))
+            stack.extend(subdirs)
+
+        gone = [path for path in stored if path not in seen]
+        result.removed = len(gone)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns, files, bytes, newest, has_files)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                updates,
+            )
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", ((path,) for path in gone))
+            if updates or gone:
+                self._rebuild_items()
+        return result
+
+    def _rebuild_items(self) -> None:
+        """Sum the directory rows into one row per item folder."""
+
+        rows = self._conn.execute("SELECT path, files, bytes, newest, has_files FROM dirs WHERE path != ''").fetchall()
+        mapped = dict(self._conn.execute("SELECT folder, workshop_id FROM folders"))
+
+        tops: dict[str, list[str]] = {}
+        top_files: dict[str, bool] = {}
+        for path, _, _, _, has_files in rows:
+            top, _, rest = path.partition("/")
+            if not rest:
+                top_files[top] = bool(has_files) or _has_depot_dir(self.root / top)
+            elif "/" not in rest:
+                tops.setdefault(top, []).append(path)
+
+        # A top-level folder is an item unless it only holds item folders,
+        # as the game folders of grouped downloads do.
+        items: dict[str, str] = {}  # item folder -> game
+        for top, has_files in top_files.items():
+            if has_files or top in mapped or top.isdigit() or not tops.get(top):
+                items[top] = ""
+            else:
+                for sub in tops[top]:
+                    items[sub] = top
+
+        totals = {folder: [0, 0, 0.0] for folder in items}
+        for path, files, size, newest, _ in rows:
+            top, _, rest = path.partition("/")
+            if top in totals:
+                owner = top
+            else:
+                second = rest.partition("/")[0]
+                owner = f"{top}/{second}" if second else None
+            if owner not in totals:
+                continue
+            total = totals[owner]
+            total[0] += files
+            total[1] += size
+            total[2] = max(total[2], newest)
+
+        self._conn.execute("DELETE FROM items")
+        self._conn.executemany(
+            "INSERT INTO items (folder, workshop_id, game, files, bytes, modified) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (folder, _workshop_id(folder, mapped), game, *totals[folder])
+                for folder, game in items.items()
+            ),
+        )
+
+    def _relative(self, folder: str | Path) -> str:
+        folder = Path(folder)
+        if not folder.is_absolute():
+            return folder.as_posix().strip("/")
+        try:
+            return folder.relative_to(self.root).as_posix()
+        except ValueError:
+            return ""
+
+
+def _workshop_id(folder: str, mapped: dict[str, str]) -> str:
+    if folder in mapped:
+        return mapped[folder]
+    name = folder.rpartition("/")[2]
+    return name if name.isdigit() else ""
+
+
+def _has_depot_dir(path: Path) -> bool:
+    return any((path / name).is_dir() for name in IGNORED_DIRS)
+
+
+def _like_prefix(rel: str) -> str:
+    escaped = rel.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "/%"
+
+
+def scan(path: Path | None = None, root: Path | None = None, full: bool = False) -> tuple[ScanResult, list[LibraryEntry]]:
+    """Scan on a connection of the calling thread; returns the entries too."""
+
+    index = LibraryIndex(path, root)
+    try:
+        return index.scan(full=full), index.entries()
+    finally:
+        index.close()
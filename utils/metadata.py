@@ -1,5 +1,7 @@
 import aiohttp
 
+from utils import tracing
+
 
 class Metadata:
     BASE_URL = "https://api.steampowered.com/ISteamRemoteStorage/GetPublishedFileDetails/v1/"
@@ -13,6 +15,10 @@ class Metadata:
         pass
 
     async def _fetch(self, workshop_id: str) -> dict:
+        with tracing.span("metadata.fetch", "metadata", workshop_id=workshop_id):
+            return await self._fetch_details(workshop_id)
+
+    async def _fetch_details(self, workshop_id: str) -> dict:
         await self.on_process(workshop_id)
 
         data = {
@@ -42,10 +48,15 @@ class Metadata:
 
     async def getData(self, workshop_id: str) -> tuple[str, str, str]:
         details = await self.get(workshop_id)
+        return self.describe(details)
+
+    @staticmethod
+    def format_size(size_bytes: float) -> str:
+        return f"{size_bytes / (1024 * 1024):.1f}MB"
 
-        size_bytes = float(details.get("file_size", 0))
-        size_mb = size_bytes / (1024 * 1024)
-        size_text = f"{size_mb:.1f}MB"
+    def describe(self, details: dict) -> tuple[str, str, str]:
+        """Return the display texts (name, size, app id) for raw details."""
+        size_text = self.format_size(float(details.get("file_size", 0)))
 
         name_text = details.get("title", "")
         app_id_value = details.get("consumer_app_id", "")
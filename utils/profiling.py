@@ -0,0 +1,243 @@
+"""Opt-in profiling of the GUI thread, worker threads and their event loops.
+
+Turn it on with ``PYSHOPDL_PROFILE`` or ``--profile`` (``deterministic``,
+the default, or ``sampling``). Deterministic mode runs one cProfile per
+thread: the main thread is profiled for the whole session and worker
+slots wrapped in :func:`profiled` get their own profile per thread role,
+which also covers the asyncio loops they run. Python 3.12+ allows only
+one active cProfile per process, so there worker threads cannot get
+their own profile while the main thread is profiled; the summary lists
+the roles that were skipped. Sampling mode walks
+``sys._current_frames()`` from a background thread and needs no hooks.
+
+Stats are written to ``profiles/`` on exit or on demand via :func:`dump`:
+one ``.prof`` file per thread (deterministic) and a ``summary.txt`` with
+the hottest functions.
+"""
+
+from __future__ import annotations
+
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from . import downloader as depot_downloader
+
+ENV_VAR = "PYSHOPDL_PROFILE"
+DIR_ENV_VAR = "PYSHOPDL_PROFILE_DIR"
+MODES = ("deterministic", "sampling")
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+
+F = TypeVar("F", bound=Callable)
+
+
+def _frame_key(code) -> str:
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+class Profiler:
+    def __init__(self, mode: str, out_dir: Path) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+
+        self.mode = mode
+        self.out_dir = Path(out_dir)
+        self._lock = threading.Lock()
+        self._main_profile: cProfile.Profile | None = None
+        self._stats: dict[str, pstats.Stats] = {}
+        self._self_samples: dict[str, Counter] = defaultdict(Counter)
+        self._total_samples: dict[str, Counter] = defaultdict(Counter)
+        self._sample_counts: Counter = Counter()
+        self._thread_roles: dict[int, str] = {}
+        self._profiled_threads: set[int] = set()
+        self._skipped: Counter = Counter()  # role -> calls not profiled
+        self._stop = threading.Event()
+
+    # ---- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        if self.mode == "deterministic":
+            self._main_profile = cProfile.Profile()
+            self._main_profile.enable()
+            self._profiled_threads.add(threading.get_ident())
+        else:
+            threading.Thread(target=self._sample_loop, name="profiler", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._main_profile is not None:
+            self._main_profile.disable()
+
+    # ---- deterministic -----------------------------------------------------
+
+    def run_profiled(self, role: str, fn: Callable, *args, **kwargs):
+        ident = threading.get_ident()
+        self._thread_roles[ident] = role
+        if self.mode != "deterministic" or ident in self._profiled_threads:
+            # Already covered (e.g. called on the main thread).
+            return fn(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows only one active cProfile per interpreter.
+            with self._lock:
+                self._skipped[role] += 1
+            return fn(*args, **kwargs)
+
+        self._profiled_threads.add(ident)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            self._profiled_threads.discard(ident)
+            self._merge(role, profile)
+
+    def _merge(self, role: str, profile: cProfile.Profile) -> None:
+        with self._lock:
+            stats = self._stats.get(role)
+            if stats is None:
+                self._stats[role] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+    # ---- sampling ----------------------------------------------------------
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            # dump() reads the counters from another thread.
+            with self._lock:
+                for ident, frame in frames.items():
+                    if ident == own:
+                        continue
+
+                    role = "main" if ident == main else self._thread_roles.get(ident) or names.get(ident, f"thread-{ident}")
+                    self._sample_counts[role] += 1
+                    self._self_samples[role][_frame_key(frame.f_code)] += 1
+
+                    seen = set()
+                    while frame is not None:
+                        key = _frame_key(frame.f_code)
+                        if key not in seen:
+                            seen.add(key)
+                            self._total_samples[role][key] += 1
+                        frame = frame.f_back
+
+    # ---- output ------------------------------------------------------------
+
+    def dump(self) -> Path:
+        """Write per-thread stats and a summary; return the summary path."""
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        summary = io.StringIO()
+        summary.write(f"PyShopDL profile ({self.mode}) {stamp}\n")
+
+        if self.mode == "deterministic":
+            if self._main_profile is not None:
+                self._main_profile.disable()
+                self._merge("main", self._main_profile)
+                self._main_profile = cProfile.Profile()
+                self._main_profile.enable()
+
+            with self._lock:
+                for role, stats in sorted(self._stats.items()):
+                    stats.dump_stats(str(self.out_dir / f"{stamp}-{role}.prof"))
+                    summary.write(f"\n=== {role} ===\n")
+                    stats.stream = summary
+                    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+                skipped = dict(self._skipped)
+            if skipped:
+                summary.write(
+                    "\n=== not profiled ===\n"
+                    "Another cProfile was active (Python 3.12+ allows one per process);\n"
+                    "use --profile sampling to see these threads:\n"
+                )
+                for role, calls in sorted(skipped.items()):
+                    summary.write(f"  {role}: {calls} call(s)\n")
+        else:
+            with self._lock:
+                counts = dict(self._sample_counts)
+                top = {
+                    role: [
+                        (key, count, self._total_samples[role][key])
+                        for key, count in self._self_samples[role].most_common(TOP_FUNCTIONS)
+                    ]
+                    for role in counts
+                }
+            for role in sorted(counts):
+                total = counts[role]
+                summary.write(f"\n=== {role} ({total} samples) ===\n")
+                summary.write(f"{'self%':>7} {'total%':>7}  function\n")
+                for key, count, cumulative in top[role]:
+                    summary.write(f"{100 * count / total:7.1f} {100 * cumulative / total:7.1f}  {key}\n")
+
+        path = self.out_dir / f"{stamp}-summary.txt"
+        path.write_text(summary.getvalue(), encoding="utf-8")
+        return path
+
+
+_profiler: Profiler | None = None
+
+
+def _default_dir() -> Path:
+    return depot_downloader._get_app_root() / "profiles"
+
+
+def enable(mode: str = "deterministic", out_dir: str | Path | None = None) -> Profiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(mode, Path(out_dir or os.environ.get(DIR_ENV_VAR) or _default_dir()))
+        _profiler.start()
+        atexit.register(dump)
+    return _profiler
+
+
+def configure(mode: str | None = None) -> bool:
+    """Enable profiling from ``--profile`` (``mode``) or ``PYSHOPDL_PROFILE``."""
+
+    mode = mode or os.environ.get(ENV_VAR)
+    if mode:
+        enable("deterministic" if mode in ("1", "true", "on") else mode)
+    return _profiler is not None
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def dump() -> Path | None:
+    if _profiler is None:
+        return None
+    return _profiler.dump()
+
+
+def profiled(role: str) -> Callable[[F], F]:
+    """Profile each call of the wrapped worker entry point as ``role``."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return fn(*args, **kwargs)
+            return _profiler.run_profiled(role, fn, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
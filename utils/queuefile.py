@@ -0,0 +1,143 @@
+"""Streaming export and import of the download queue.
+
+Two formats are supported, picked by file extension: JSON lines
+(``.jsonl``, one object per line) and CSV. Both are written and read one
+row at a time, so a queue file of any length never has to fit in memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Iterable, Iterator
+
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+# Metadata older than this is fetched again after an import.
+METADATA_MAX_AGE_SECONDS = 24 * 3600
+
+
+@dataclass
+class QueueRecord:
+    """One exported queue row; ``priority`` is its position (0 = top).
+
+    Import orders rows by ``priority``; rows without one keep file order.
+    """
+
+    workshop_id: str
+    name: str = ""
+    size_bytes: int = 0
+    app_id: str = ""
+    app_name: str = ""
+    status: str = ""
+    priority: int = 0
+    fetched_at: float = 0.0
+
+    @property
+    def has_metadata(self) -> bool:
+        return bool(self.name and self.app_id.isdigit())
+
+    def is_stale(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.fetched_at > METADATA_MAX_AGE_SECONDS
+
+
+FIELD_NAMES = [f.name for f in fields(QueueRecord)]
+
+
+def format_of(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower()
+    try:
+        return FORMATS[suffix]
+    except KeyError:
+        raise ValueError(f"Unsupported queue file type: {suffix or path}") from None
+
+
+def _record(raw: dict) -> QueueRecord | None:
+    workshop_id = str(raw.get("workshop_id") or "").strip()
+    if not workshop_id.isdigit():
+        return None
+
+    try:
+        return QueueRecord(
+            workshop_id=workshop_id,
+            name=str(raw.get("name") or ""),
+            size_bytes=int(raw.get("size_bytes") or 0),
+            app_id=str(raw.get("app_id") or ""),
+            app_name=str(raw.get("app_name") or ""),
+            status=str(raw.get("status") or ""),
+            priority=int(raw.get("priority") or 0),
+            fetched_at=float(raw.get("fetched_at") or 0.0),
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def write_records(path: str | Path, records: Iterable[QueueRecord]) -> int:
+    """Write ``records`` to ``path``; return how many were written.
+
+    The file is written under a temporary name and renamed into place.
+    """
+
+    path = Path(path)
+    fmt = format_of(path)
+    tmp = path.with_name(path.name + ".part")
+    written = 0
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                writer = csv.DictWriter(f, fieldnames=FIELD_NAMES)
+                writer.writeheader()
+                for record in records:
+                    writer.writerow(asdict(record))
+                    written += 1
+            else:
+                for record in records:
+                    f.write(json.dumps(asdict(record), ensure_ascii=False))
+                    f.write("\n")
+                    written += 1
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return written
+
+
+def iter_records(path: str | Path) -> Iterator[QueueRecord]:
+    """Yield the rows of a queue file one at a time.
+
+    Lines that are not valid JSON, or rows without a numeric workshop id,
+    are skipped. Plain ID lists (one ID per line) are read as well.
+    """
+
+    path = Path(path)
+    fmt = format_of(path)
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            rows: Iterable[dict] = csv.DictReader(f)
+        else:
+            rows = _iter_json_lines(f)
+
+        for raw in rows:
+            record = _record(raw)
+            if record is not None:
+                yield record
+
+
+def _iter_json_lines(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.isdigit():
+            yield {"workshop_id": line}
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(raw, dict):
+            yield raw
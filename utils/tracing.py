@@ -0,0 +1,208 @@
+"""Opt-in span tracing written as Chrome trace-event JSON.
+
+Enable with the ``PYSHOPDL_TRACE`` environment variable (or the
+``trace_file`` config key) set to an output path. The file can be opened
+in ``chrome://tracing`` or https://ui.perfetto.dev. While disabled every
+call returns a shared no-op object, so instrumented code pays one global
+lookup and a function call.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+ENV_VAR = "PYSHOPDL_TRACE"
+
+# Drop events beyond this so a forgotten trace cannot eat all memory.
+MAX_EVENTS = 1_000_000
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def start(self) -> "_NullSpan":
+        return self
+
+    def end(self, **args: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A complete ("X") event; usable as a context manager or start/end."""
+
+    __slots__ = ("_tracer", "name", "cat", "args", "_start", "_tid")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._start = 0.0
+        self._tid = 0
+
+    def start(self) -> "Span":
+        self._start = _now_us()
+        self._tid = threading.get_ident()
+        return self
+
+    def end(self, **args: Any) -> None:
+        if args:
+            self.args.update(args)
+        self._tracer._add({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": self._start,
+            "dur": _now_us() - self._start,
+            "pid": self._tracer.pid,
+            "tid": self._tid,
+            "args": self.args,
+        })
+
+    def __enter__(self) -> "Span":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        self.end()
+
+
+class Tracer:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.pid = os.getpid()
+        self._events: list[dict] = []
+        self._thread_names: dict[int, str] = {}
+        # Events come from every thread; the lock guards the list and the
+        # name map, the write lock keeps two flushes off the same file.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _add(self, event: dict) -> None:
+        with self._lock:
+            tid = event["tid"]
+            if tid not in self._thread_names:
+                self._thread_names[tid] = threading.current_thread().name
+            if len(self._events) < MAX_EVENTS:
+                self._events.append(event)
+
+    def instant(self, name: str, cat: str, args: dict) -> None:
+        self._add({
+            "name": name,
+            "cat": cat,
+            "ph": "i",
+            "s": "t",
+            "ts": _now_us(),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def async_event(self, phase: str, name: str, cat: str, span_id: str, args: dict) -> None:
+        self._add({
+            "name": name,
+            "cat": cat,
+            "ph": phase,
+            "id": span_id,
+            "ts": _now_us(),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def write(self) -> None:
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        with self._write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump({"traceEvents": names + events, "displayTimeUnit": "ms"}, f)
+            os.replace(tmp, self.path)
+
+
+_tracer: Tracer | None = None
+
+
+def enable(path: str | Path) -> Tracer:
+    """Start recording; the trace is written at exit (or via :func:`flush`)."""
+
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(Path(path))
+        atexit.register(flush)
+    return _tracer
+
+
+def configure(config_path: str | None = None) -> bool:
+    """Enable tracing from ``PYSHOPDL_TRACE`` or the ``trace_file`` config."""
+
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        try:
+            from utils.config import Config
+
+            path = Config(config_path).get("trace_file")
+        except Exception:  # noqa: BLE001
+            path = None
+
+    if path:
+        enable(path)
+    return _tracer is not None
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def flush() -> None:
+    if _tracer is not None:
+        _tracer.write()
+
+
+def span(name: str, cat: str = "app", **args: Any):
+    """Return a span for ``with`` or ``start()``/``end()``; no-op when off."""
+
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, cat, args)
+
+
+def instant(name: str, cat: str = "app", **args: Any) -> None:
+    if _tracer is not None:
+        _tracer.instant(name, cat, args)
+
+
+def begin_async(name: str, span_id: str, cat: str = "app", **args: Any) -> None:
+    """Open a span that ends on another thread or callback (e.g. queue wait)."""
+
+    if _tracer is not None:
+        _tracer.async_event("b", name, cat, span_id, args)
+
+
+def end_async(name: str, span_id: str, cat: str = "app", **args: Any) -> None:
+    if _tracer is not None:
+        _tracer.async_event("e", name, cat, span_id, args)
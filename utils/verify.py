@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import downloader as depot_downloader
+
+# Files at least this big are hashed through mmap instead of buffered reads.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Below this many files the process pool costs more than it saves.
+POOL_MIN_FILES = 4
+
+# DepotDownloaderMod keeps its own manifests/staging here; never hash it.
+IGNORED_DIRS = {".DepotDownloader"}
+
+INDEX_FILE_NAME = "hashes.db"
+
+
+def hash_file(path: str) -> str:
+    """Return the sha256 hex digest of ``path``.
+
+    Module-level so it can be pickled into a process pool.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_files(root: Path):
+    """Yield ``(relative posix path, os.stat_result)`` for files under root."""
+
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in IGNORED_DIRS:
+                    stack.append(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                rel = Path(entry.path).relative_to(root).as_posix()
+                yield rel, entry.stat(follow_symlinks=False)
+
+
+def hash_paths(paths: list[str], workers: int | None = None) -> list[str]:
+    """Hash ``paths`` in a process pool, keeping the input order."""
+
+    if len(paths) < POOL_MIN_FILES:
+        return [hash_file(p) for p in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_file, paths, chunksize=8))
+
+
+class HashIndex:
+    """Persistent ``(item, relative path) -> (size, mtime, sha256)`` index."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path or depot_downloader.get_cache_dir() / INDEX_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " item TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " PRIMARY KEY (item, path))"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def entries(self, item: str) -> dict[str, tuple[int, int, str]]:
+        rows = self._conn.execute(
+            "SELECT path, size, mtime_ns, digest FROM files WHERE item = ?",
+            (item,),
+        )
+        return {path: (size, mtime_ns, digest) for path, size, mtime_ns, digest in rows}
+
+    def replace(self, item: str, entries: dict[str, tuple[int, int, str]]) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM files WHERE item = ?", (item,))
+            self._conn.executemany(
+                "INSERT INTO files (item, path, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)",
+                [(item, path, *entry) for path, entry in entries.items()],
+            )
+
+    def content_hash(self, item: str) -> str | None:
+        """Digest over all file digests of an item, or None if not indexed."""
+
+        rows = self._conn.execute(
+            "SELECT path, digest FROM files WHERE item = ?",
+            (item,),
+        ).fetchall()
+        return content_digest(rows)
+
+
+def content_digest(files) -> str | None:
+    """Digest over ``(relative path, sha256)`` pairs; None if there are none."""
+
+    rows = sorted(files)
+    if not rows:
+        return None
+
+    digest = hashlib.sha256()
+    for path, file_digest in rows:
+        digest.update(f"{path}\0{file_digest}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def scan_folder(
+    folder: Path,
+    known: dict[str, tuple[int, int, str]],
+    workers: int | None = None,
+) -> tuple[dict[str, tuple[int, int, str]], int]:
+    """Return the current entries of ``folder`` and how many were hashed.
+
+    Digests in ``known`` are reused for files whose size and mtime still
+    match; only the others are hashed.
+    """
+
+    files: list[tuple[str, os.stat_result]] = []
+    pending: list[str] = []
+    if folder.is_dir():
+        for rel, st in iter_files(folder):
+            files.append((rel, st))
+            entry = known.get(rel)
+            if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+                pending.append(rel)
+
+    digests = dict(zip(pending, hash_paths([str(folder / rel) for rel in pending], workers)))
+    current = {
+        rel: (st.st_size, st.st_mtime_ns, digests[rel]) if rel in digests else known[rel]
+        for rel, st in files
+    }
+    return current, len(pending)
+
+
+@dataclass
+class VerifyResult:
+    item: str
+    files: int = 0
+    hashed: int = 0
+    missing: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.files > 0 and not self.missing and not self.changed
+
+
+def verify_item(
+    item: str,
+    folder: Path,
+    index: HashIndex,
+    record: bool = False,
+    workers: int | None = None,
+) -> VerifyResult:
+    """Hash ``folder`` into the index entry for ``item``.
+
+    Only files whose size or mtime differ from the index are re-hashed.
+    With ``record=True`` (right after a download) the new digests are
+    accepted as the reference. Otherwise a file that is missing, or whose
+    content no longer matches its recorded digest, is reported as a
+    mismatch and the index is left untouched.
+    """
+
+    result = VerifyResult(item=item)
+    known = index.entries(item)
+    current, result.hashed = scan_folder(folder, known, workers)
+    result.files = len(current)
+
+    if not record:
+        result.changed = [
+            rel for rel, entry in current.items()
+            if rel in known and known[rel][2] != entry[2]
+        ]
+        result.missing = sorted(set(known) - set(current))
+
+    if record or result.ok:
+        index.replace(item, current)
+
+    return result
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from utils import tracing
+from utils.workshop import terminate_process
+
+# Defaults for the ``stall_timeout_seconds`` / ``stall_growth_seconds``
+# config keys.
+DEFAULT_OUTPUT_TIMEOUT = 600.0
+DEFAULT_GROWTH_TIMEOUT = 1200.0
+
+MAX_CHECK_INTERVAL = 10.0
+
+
+def folder_activity(folder: Path) -> tuple[int, int]:
+    """Return ``(bytes on disk, newest mtime_ns)`` of everything below ``folder``.
+
+    Allocated blocks are used where available: DepotDownloaderMod
+    pre-allocates files at full size, so ``st_size`` alone would not move
+    while chunks are written. The newest mtime catches writes into such
+    files on platforms without ``st_blocks``.
+    """
+
+    total = 0
+    newest = 0
+    stack = [str(folder)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                blocks = getattr(st, "st_blocks", None)
+                total += blocks * 512 if blocks is not None else st.st_size
+                newest = max(newest, st.st_mtime_ns)
+    return total, newest
+
+
+class StallWatchdog:
+    """Kills a DepotDownloaderMod process that has stopped making progress.
+
+    Two clocks are kept: time since the last output line (:meth:`touch`)
+    and time since the target folder last changed on disk. The process is
+    considered stalled when
+
+    * it printed nothing *and* wrote nothing for ``output_timeout``
+      seconds, or
+    * the folder did not change for ``growth_timeout`` seconds even
+      though output keeps coming (e.g. a CDN reconnect loop).
+
+    A big file being written without output is not a stall, and neither is
+    a long manifest phase that keeps logging, until the growth timeout.
+    """
+
+    def __init__(
+        self,
+        proc: subprocess.Popen,
+        folder: Path,
+        output_timeout: float = DEFAULT_OUTPUT_TIMEOUT,
+        growth_timeout: float = DEFAULT_GROWTH_TIMEOUT,
+    ) -> None:
+        self.proc = proc
+        self.folder = Path(folder)
+        self.output_timeout = float(output_timeout)
+        self.growth_timeout = float(growth_timeout)
+        self.interval = min(MAX_CHECK_INTERVAL, self.output_timeout / 4, self.growth_timeout / 4)
+        self.stalled: str | None = None
+
+        now = time.monotonic()
+        self._last_output = now
+        self._last_growth = now
+        self._activity = folder_activity(self.folder)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+
+    def __enter__(self) -> "StallWatchdog":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def touch(self, hold: bool = False) -> None:
+        """Record an output line; called from the reading thread.
+
+        ``hold`` also resets the disk clock, for a process that is paused
+        on purpose (see :class:`utils.governor.PhaseGate`).
+        """
+
+        now = time.monotonic()
+        self._last_output = now
+        if hold:
+            self._last_growth = now
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.proc.poll() is not None:
+                return
+
+            activity = folder_activity(self.folder)
+            now = time.monotonic()
+            if activity != self._activity:
+                self._activity = activity
+                self._last_growth = now
+
+            silent = now - self._last_output
+            flat = now - self._last_growth
+            if silent >= self.output_timeout and flat >= self.output_timeout:
+                self.stalled = f"no output or disk activity for {int(silent)} s"
+            elif flat >= self.growth_timeout:
+                self.stalled = f"no disk activity for {int(flat)} s"
+            else:
+                continue
+
+            tracing.instant("download.stall", "download", reason=self.stalled)
+            terminate_process(self.proc)
+            return
@@ -3,12 +3,97 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
+import re
 import subprocess
+import threading
 
 from . import downloader as depot_downloader
+from utils import governor, tracing
+from utils.appnames import safe_folder_name
 from utils.config import Config
 from utils.loader import loader
 
+# Substrings of DepotDownloaderMod output that mark the start of a phase,
+# checked in order.
+PHASE_MARKERS: list[tuple[str, str]] = [
+    ("Connecting to Steam3", "connect"),
+    ("Logging", "login"),
+    ("Processing depot", "manifest"),
+    ("Downloading depot", "manifest"),
+    ("Pre-allocating", "allocate"),
+    ("%", "download"),
+    ("Total downloaded:", "finish"),
+    ("Disconnected from Steam", "finish"),
+]
+
+
+# How long a stopped DepotDownloaderMod gets to exit before it is killed.
+STOP_GRACE_SECONDS = 5.0
+
+# Per-file progress lines look like " 42.17% depots/123/file.pak".
+_PROGRESS_RE = re.compile(r"^\s*(\d{1,3}(?:\.\d+)?)%")
+
+# Shortest text taken for a complete Workshop ID while typing; real IDs
+# are 9-10 digits, so shorter prefixes are not looked up yet.
+MIN_ID_DIGITS = 6
+
+# "...sharedfiles/filedetails/?id=123", "...workshop/filedetails/?id=123"
+# and "steam://url/CommunityFilePage/123".
+_ID_IN_URL_RE = re.compile(r"(?:[?&]id=|CommunityFilePage/)(\d+)", re.IGNORECASE)
+
+
+def parse_workshop_id(text: str) -> Optional[str]:
+    """Return the Workshop ID in ``text`` (an ID or item URL), or None."""
+
+    text = text.strip()
+    if text.isdigit():
+        return text
+    match = _ID_IN_URL_RE.search(text)
+    return match.group(1) if match else None
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """Return the overall percentage from a progress line, if it is one."""
+    match = _PROGRESS_RE.match(line)
+    if match is None:
+        return None
+    return min(float(match.group(1)), 100.0)
+
+
+def terminate_process(proc: subprocess.Popen) -> None:
+    """Ask ``proc`` to exit and kill it if it is still running after
+    :data:`STOP_GRACE_SECONDS`. Returns immediately.
+
+    DepotDownloaderMod checks the chunks it already has on the next run,
+    so a stopped download resumes instead of starting over.
+    """
+    if proc.poll() is not None:
+        return
+
+    proc.terminate()
+
+    def _kill() -> None:
+        if proc.poll() is None:
+            proc.kill()
+
+    timer = threading.Timer(STOP_GRACE_SECONDS, _kill)
+    timer.daemon = True
+    timer.start()
+
+
+def is_completion_line(line: str) -> bool:
+    """Heuristic: the download is complete once Steam disconnects or the
+    total downloaded line appears, whatever the exit code."""
+    return "Disconnected from Steam" in line or line.startswith("Total downloaded:")
+
+
+def detect_phase(line: str) -> Optional[str]:
+    """Return the phase a DepotDownloaderMod output line starts, if any."""
+    for marker, phase in PHASE_MARKERS:
+        if marker in line:
+            return phase
+    return None
+
 @dataclass
 class WorkshopJob:
     """Represents a single Workshop download request."""
@@ -16,6 +101,8 @@ class WorkshopJob:
     app_id: str
     app_name: str
     pubfile_id: str
+    validate: bool = False
+    game_name: str = ""
 
 
 class WorkshopDownloader:
@@ -32,60 +119,71 @@ class WorkshopDownloader:
 
         self.exe_dir = exe_dir
         self.exe_path = self.exe_dir / depot_downloader.EXE_NAME
+        # Limits the last run_job could not apply (see utils.governor).
+        self.skipped_limits: list[str] = []
+
+    def target_dir(self, job: WorkshopJob) -> str:
+        """Return the ``-dir`` folder of a job, relative to ``exe_dir``.
+
+        With ``group_by_game`` the item folder is nested in a folder named
+        after the game, when the game name is known.
+        """
+        auto_rename = Config().get("auto_rename", False)
+        username = Config().get("account", "Anonymous")
+        if (username and username.lower() != "anonymous") or auto_rename:
+            folder = job.app_name
+        else:
+            folder = job.pubfile_id
+
+        if job.game_name and Config().get("group_by_game", False):
+            return "depots/" + safe_folder_name(job.game_name) + "/" + folder
+        return "depots/" + folder
 
     def build_command(self, job: WorkshopJob) -> list[str]:
         """Build the command-line for DepotDownloaderMod for a given job."""
-        auto_rename = Config().get("auto_rename", False)
         username = Config().get("account", "Anonymous")
-        if username and username.lower() != "anonymous":
-            return [
-                str(self.exe_path),
-                "-app",
-                job.app_id,
-                "-pubfile",
-                job.pubfile_id,
-                "-dir",
-                "depots/" + job.app_name,
-                "-username " + username,
-                "-password " + loader().getPassword(username),
-            ]
-        
-        if auto_rename:
-            return [
-                str(self.exe_path),
-                "-app",
-                job.app_id,
-                "-pubfile",
-                job.pubfile_id,
-                "-dir",
-                "depots/" + job.app_name,
-            ]
-            
-        return [
+        cmd = [
             str(self.exe_path),
             "-app",
             job.app_id,
             "-pubfile",
             job.pubfile_id,
-            "-dir", "depots/" + job.pubfile_id,
+            "-dir",
+            self.target_dir(job),
         ]
 
+        if username and username.lower() != "anonymous":
+            cmd += [
+                "-username " + username,
+                "-password " + loader().getPassword(username),
+            ]
+
+        if job.validate:
+            cmd.append("-validate")
+
+        return cmd
+
     def run_job(self, job: WorkshopJob) -> subprocess.Popen:
         """Start DepotDownloaderMod for the given job and return the process.
 
         The caller is responsible for reading stdout/stderr and waiting for
-        completion.
+        completion. The process runs under the configured
+        :class:`utils.governor.Limits`.
         """
 
         cmd = self.build_command(job)
+        limits = governor.Limits.from_config()
 
-        proc = subprocess.Popen(
-            cmd,
-            cwd=self.exe_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-        )
+        with tracing.span("process.spawn", "download", pubfile_id=job.pubfile_id):
+            proc = subprocess.Popen(
+                cmd,
+                cwd=self.exe_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                creationflags=governor.creation_flags(limits),
+            )
+            self.skipped_limits = governor.apply(proc.pid, limits)
 
         return proc
\ No newline at end of file